@@ -0,0 +1,155 @@
+"""Baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18
+
+Creates the schema as the application used it before migrations (what
+Base.metadata.create_all() built at startup). A database that already has
+these tables is adopted with `alembic stamp 0001_baseline` followed by
+`alembic upgrade head`; everything added since lives in later revisions.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("user_id", sa.String(100), primary_key=True),
+        sa.Column("user_name", sa.String(40), nullable=False),
+        sa.Column("user_email", sa.String(70), nullable=False),
+        sa.Column("user_password", sa.String(255), nullable=False),
+        sa.Column("user_role", sa.Enum("Principal", "Teacher", "Student"), nullable=False),
+        sa.Column("totp_secret", sa.String(32), nullable=True),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+    )
+    op.create_index("ix_users_user_id", "users", ["user_id"])
+    op.create_index("ix_users_user_email", "users", ["user_email"], unique=True)
+
+    op.create_table(
+        "students",
+        sa.Column(
+            "user_id",
+            sa.String(100),
+            sa.ForeignKey("users.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("student_name", sa.String(50), nullable=False),
+        sa.Column("student_email", sa.String(100), nullable=False, unique=True),
+        sa.Column("student_image_url", sa.Text()),
+        sa.Column("student_class_name", sa.String(20), nullable=False),
+        sa.Column("student_gender", sa.Enum("Male", "Female", "Other")),
+        sa.Column("student_date_of_birth", sa.Date()),
+        sa.Column("student_roll_no", sa.Integer()),
+        sa.Column("student_age", sa.Integer()),
+        sa.Column("student_father_name", sa.String(50)),
+        sa.Column("student_mother_name", sa.String(50)),
+        sa.Column("student_father_mobile_number", sa.String(15)),
+        sa.Column("student_mother_mobile_number", sa.String(15)),
+        sa.Column("student_address", sa.Text()),
+        sa.Column("student_admission_date", sa.Date()),
+    )
+
+    op.create_table(
+        "teachers",
+        sa.Column(
+            "user_id",
+            sa.String(100),
+            sa.ForeignKey("users.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("teacher_name", sa.String(50), nullable=False),
+        sa.Column("teacher_email", sa.String(100), nullable=False, unique=True),
+        sa.Column("teacher_image_url", sa.Text()),
+        sa.Column("teacher_gender", sa.Enum("Male", "Female", "Other")),
+        sa.Column("teacher_qualification", sa.String(30)),
+        sa.Column("teacher_age", sa.Integer()),
+        sa.Column("teacher_year_of_experience", sa.Integer()),
+        sa.Column("teacher_subject_specialization", sa.String(50)),
+        sa.Column("teacher_salary_package", sa.DECIMAL(10, 2)),
+        sa.Column("teacher_mobile_number", sa.String(15)),
+        sa.Column("teacher_address", sa.Text()),
+        sa.Column("teacher_bank_account_id", sa.String(30)),
+        sa.Column("teacher_class_ids", sa.String(100)),
+    )
+
+    op.create_table(
+        "principals",
+        sa.Column("principal_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "user_id",
+            sa.String(100),
+            sa.ForeignKey("users.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("principal_name", sa.String(100), nullable=False),
+        sa.Column("principal_email", sa.String(100), nullable=False, unique=True),
+        sa.Column("principal_phone", sa.String(15)),
+        sa.Column("principal_hire_date", sa.Date(), nullable=False),
+        sa.Column("principal_qualification", sa.String(150)),
+        sa.Column("principal_experience_years", sa.Integer()),
+        sa.Column("principal_address", sa.String(255)),
+        sa.Column("principal_status", sa.Enum("Active", "Inactive")),
+    )
+
+    op.create_table(
+        "students_attendance_table",
+        sa.Column(
+            "user_id",
+            sa.String(100),
+            sa.ForeignKey("students.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("attendance_date", sa.Date(), primary_key=True),
+        sa.Column("student_name", sa.String(100), nullable=False),
+        sa.Column("attendance_status", sa.Enum("Present", "Absent", name="attendancestatus"), nullable=False),
+    )
+
+    op.create_table(
+        "exam_table",
+        sa.Column("s_no", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("exam_name", sa.String(30), nullable=False),
+        sa.Column("exam_code", sa.String(30), nullable=False, unique=True),
+        sa.Column("class_name", sa.String(30), nullable=False),
+    )
+
+    op.create_table(
+        "exam_subjects_table",
+        sa.Column("s_no", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "exam_code",
+            sa.String(30),
+            sa.ForeignKey("exam_table.exam_code", ondelete="CASCADE", onupdate="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("subject_name", sa.String(30), nullable=False),
+        sa.Column("exam_date", sa.Date(), nullable=False),
+        sa.Column("start_time", sa.Time(), nullable=False),
+        sa.Column("end_time", sa.Time(), nullable=False),
+        sa.Column("marks", sa.Integer(), nullable=False),
+    )
+
+    op.create_table(
+        "subjects_table",
+        sa.Column("ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("subject_name", sa.String(30), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("subjects_table")
+    op.drop_table("exam_subjects_table")
+    op.drop_table("exam_table")
+    op.drop_table("students_attendance_table")
+    op.drop_table("principals")
+    op.drop_table("teachers")
+    op.drop_table("students")
+    op.drop_table("users")
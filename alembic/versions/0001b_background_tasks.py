@@ -0,0 +1,39 @@
+"""Background task queue
+
+Revision ID: 0001b_background_tasks
+Revises: 0001_baseline
+Create Date: 2026-10-18
+
+Durable queue for email side work, polled by scripts/run_task_worker.py.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001b_background_tasks"
+down_revision = "0001_baseline"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "background_tasks",
+        sa.Column("task_id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("task_name", sa.String(100), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.Enum("Queued", "Running", "Done", "Dead"), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(), nullable=False),
+        sa.Column("locked_at", sa.DateTime()),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.current_timestamp()),
+    )
+    op.create_index("ix_background_tasks_status_run_after", "background_tasks", ["status", "run_after"])
+
+
+def downgrade():
+    op.drop_index("ix_background_tasks_status_run_after", table_name="background_tasks")
+    op.drop_table("background_tasks")
@@ -0,0 +1,26 @@
+"""Indexes for the keyset-paginated student listing
+
+Revision ID: 0001c_student_list_indexes
+Revises: 0001b_background_tasks
+Create Date: 2026-10-18
+
+(student_class_name, user_id) serves the class filter with the user_id
+cursor; student_admission_date serves the admitted_from / admitted_to range.
+"""
+from alembic import op
+
+
+revision = "0001c_student_list_indexes"
+down_revision = "0001b_background_tasks"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_students_class_name_user_id", "students", ["student_class_name", "user_id"])
+    op.create_index("ix_students_admission_date", "students", ["student_admission_date"])
+
+
+def downgrade():
+    op.drop_index("ix_students_admission_date", table_name="students")
+    op.drop_index("ix_students_class_name_user_id", table_name="students")
@@ -0,0 +1,25 @@
+"""Size variants of the student image
+
+Revision ID: 0001d_student_image_urls
+Revises: 0001c_student_list_indexes
+Create Date: 2026-10-18
+
+students.student_image_urls holds the blob key and URL of each resized
+variant written by the image pipeline.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001d_student_image_urls"
+down_revision = "0001c_student_list_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("students", sa.Column("student_image_urls", sa.JSON()))
+
+
+def downgrade():
+    op.drop_column("students", "student_image_urls")
@@ -0,0 +1,44 @@
+"""Indexes for the hot repository queries
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001d_student_image_urls
+Create Date: 2026-10-18
+
+- users.user_role: role lookups compare the exact enum value now instead
+  of func.lower(user_role), so this index is usable.
+- students_attendance_table (attendance_date, user_id): whole-day reads and
+  the attendance upsert pre-check; the primary key leads with user_id.
+- exam_table.class_name and exam_subjects_table (exam_code, exam_date):
+  the exam schedule / calendar feed of a class.
+
+Checked with: python -m scripts.check_query_plans
+"""
+from alembic import op
+
+
+revision = "0002_hot_query_indexes"
+down_revision = "0001d_student_image_urls"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_users_user_role", "users", ["user_role"])
+    op.create_index(
+        "ix_students_attendance_date_user_id",
+        "students_attendance_table",
+        ["attendance_date", "user_id"],
+    )
+    op.create_index("ix_exam_table_class_name", "exam_table", ["class_name"])
+    op.create_index(
+        "ix_exam_subjects_exam_code_exam_date",
+        "exam_subjects_table",
+        ["exam_code", "exam_date"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_exam_subjects_exam_code_exam_date", table_name="exam_subjects_table")
+    op.drop_index("ix_exam_table_class_name", table_name="exam_table")
+    op.drop_index("ix_students_attendance_date_user_id", table_name="students_attendance_table")
+    op.drop_index("ix_users_user_role", table_name="users")
@@ -0,0 +1,36 @@
+"""Change counters for conditional GETs
+
+Revision ID: 0003_collection_versions
+Revises: 0002_hot_query_indexes
+Create Date: 2026-10-18
+
+ETags were derived from count(*) + max(users.updated_at): a scan of users
+on every conditional GET, one-second resolution, and blind to edits of
+student / teacher columns. collection_versions holds one counter per read
+collection, bumped by every write in the writing transaction and read by
+primary key.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_collection_versions"
+down_revision = "0002_hot_query_indexes"
+branch_labels = None
+depends_on = None
+
+COLLECTIONS = ["principal_profile", "students", "teachers"]
+
+
+def upgrade():
+    table = op.create_table(
+        "collection_versions",
+        sa.Column("name", sa.String(length=50), primary_key=True),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=True),
+    )
+    op.bulk_insert(table, [{"name": name, "version": 0, "changed_at": None} for name in COLLECTIONS])
+
+
+def downgrade():
+    op.drop_table("collection_versions")
@@ -0,0 +1,25 @@
+"""Index principals.user_id
+
+Revision ID: 0004_principals_user_id_index
+Revises: 0003_collection_versions
+Create Date: 2026-10-18
+
+The profile read (principals by user_id) and the identity lookup
+(users LEFT JOIN principals) scanned principals. Found once
+scripts/check_query_plans.py EXPLAINed the repositories' own statements.
+"""
+from alembic import op
+
+
+revision = "0004_principals_user_id_index"
+down_revision = "0003_collection_versions"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_principals_user_id", "principals", ["user_id"])
+
+
+def downgrade():
+    op.drop_index("ix_principals_user_id", table_name="principals")
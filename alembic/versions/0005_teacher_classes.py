@@ -0,0 +1,50 @@
+"""Teacher class membership table
+
+Revision ID: 0005_teacher_classes
+Revises: 0004_principals_user_id_index
+Create Date: 2026-10-18
+
+The teacher listing filtered by class with a LIKE over the comma separated
+teachers.teacher_class_ids, which no index can serve. teacher_classes holds
+one row per (class_name, teacher_id); the ORM keeps it in step with the
+column (models/teacher.py), this revision backfills the existing rows.
+"""
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0005_teacher_classes"
+down_revision = "0004_principals_user_id_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table = op.create_table(
+        "teacher_classes",
+        sa.Column("class_name", sa.String(20), primary_key=True),
+        sa.Column(
+            "teacher_id",
+            sa.String(100),
+            sa.ForeignKey("teachers.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    op.create_index("ix_teacher_classes_teacher_id", "teacher_classes", ["teacher_id"])
+
+    connection = op.get_bind()
+    teachers = connection.execute(
+        sa.text("SELECT user_id, teacher_class_ids FROM teachers WHERE teacher_class_ids IS NOT NULL")
+    )
+    rows = [
+        {"class_name": class_name, "teacher_id": user_id}
+        for user_id, class_ids in teachers
+        for class_name in dict.fromkeys(part.strip() for part in class_ids.split(",") if part.strip())
+    ]
+    if rows:
+        op.bulk_insert(table, rows)
+
+
+def downgrade():
+    op.drop_index("ix_teacher_classes_teacher_id", table_name="teacher_classes")
+    op.drop_table("teacher_classes")
@@ -0,0 +1,32 @@
+"""Change counter for exam schedules
+
+Revision ID: 0006_exams_collection_version
+Revises: 0005_teacher_classes
+Create Date: 2026-10-18
+
+The class exam feed was versioned by (count, max s_no) of its exam
+subjects, which misses edits to existing rows. Writes to exam_table and
+exam_subjects_table now bump an "exams" counter in collection_versions.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006_exams_collection_version"
+down_revision = "0005_teacher_classes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table = sa.table(
+        "collection_versions",
+        sa.column("name", sa.String),
+        sa.column("version", sa.BigInteger),
+        sa.column("changed_at", sa.DateTime),
+    )
+    op.bulk_insert(table, [{"name": "exams", "version": 0, "changed_at": None}])
+
+
+def downgrade():
+    op.execute("DELETE FROM collection_versions WHERE name = 'exams'")
@@ -0,0 +1,28 @@
+"""Revocable calendar feed URLs
+
+Revision ID: 0007_calendar_feed_version
+Revises: 0006_exams_collection_version
+Create Date: 2026-10-18
+
+Feed tokens carry users.calendar_feed_version, checked on each feed
+request; rotating it invalidates every feed URL issued to the user.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0007_calendar_feed_version"
+down_revision = "0006_exams_collection_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "users",
+        sa.Column("calendar_feed_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade():
+    op.drop_column("users", "calendar_feed_version")
@@ -1,18 +1,95 @@
 # app/config.py
+from datetime import date
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str | None = None    # default: DATABASE_URL with its asyncio driver
+    # Read replicas for GET requests, e.g. '["mysql+pymysql://reader@replica1/school"]'
+    # (locally: DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS='["sqlite:///replica.db"]')
+    DATABASE_REPLICA_URLS: list[str] = []
+    READ_YOUR_WRITES_WINDOW: int = 5          # seconds a client reads from the primary after a write
+
+    # Database connection pool (per engine, per worker process; see GET /internal/metrics)
+    DB_POOL_SIZE: int = 10                    # connections kept open
+    DB_MAX_OVERFLOW: int = 10                 # extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT: float = 30               # seconds to wait for a connection before failing
+    DB_POOL_RECYCLE: int = 1800               # replace connections older than this (below MySQL wait_timeout)
+    DB_POOL_PRE_PING: str = "idle"            # "always", "idle" (only after DB_POOL_PING_IDLE seconds unused) or "never"
+    DB_POOL_PING_IDLE: float = 60
+    DB_POOL_WARMUP: int = 2                   # connections opened at startup
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000      # verified JWTs kept in memory
+    TOKEN_CACHE_MAX_TTL: int = 300            # seconds, also bounds tokens without exp
+    IDENTITY_CACHE_TTL: int = 60              # seconds a resolved user is reused
+    IDENTITY_CACHE_MAX_ENTRIES: int = 10000
+    PREAUTH_TICKET_TTL: int = 300             # seconds to complete the OTP step after the password step
+    PREAUTH_MAX_OTP_ATTEMPTS: int = 3         # wrong codes before the ticket is revoked (login starts over)
+    RESET_PASSWORD_LINK_TTL: int = 30 * 60    # seconds a forgotten-password link stays valid
+    SET_PASSWORD_LINK_TTL: int = 7 * 24 * 3600  # seconds the set-password link in a welcome email stays valid
+
+    # Password hashing (tune with: python -m scripts.calibrate_password_hash)
+    PASSWORD_HASH_SCHEME: str = "bcrypt"      # "bcrypt" or "argon2"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536           # KiB
+    ARGON2_PARALLELISM: int = 1
+
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 2            # processes running bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 8        # queued + running hashes before rejecting
+    PASSWORD_HASH_QUEUE_TIMEOUT: float = 1.0  # seconds a caller waits for a slot before a 503
 
     # SMTP Email Settings
     SMTP_HOST: str = "smtp.gmail.com"       # default, can override in .env
     SMTP_PORT: int = 587                     # default TLS port
     SMTP_EMAIL: str                           # your sending email
     SMTP_PASSWORD: str                        # your email password / app password
+    SMTP_TIMEOUT: int = 30                    # seconds per SMTP socket operation
+    SMTP_STARTTLS: bool = True                # False only for a local relay / test server
+    SMTP_POOL_SIZE: int = 2                   # authenticated sessions kept open
+    SMTP_POOL_IDLE_TIMEOUT: int = 60          # drop sessions idle longer than this (seconds)
+    SMTP_POOL_MAX_MESSAGES: int = 100         # recycle a session after this many messages
 
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
+    FRONTEND_URL: str = "http://localhost:3000"
+    BACKEND_URL: str = "http://localhost:8000"  # public base URL used in email links
+
+    # TOTP enrolment
+    TOTP_ISSUER: str = "School Management System"
+    TOTP_QR_LINK_TTL: int = 7 * 24 * 3600     # seconds the emailed QR link stays valid
+
+    # Teacher assignments (append-only log, imported once from the legacy JSON file)
+    ASSIGNMENTS_LOG_PATH: str = "data/assignments.jsonl"
+    ASSIGNMENTS_LEGACY_PATH: str = "data/assignments.json"
+
+    # Teacher timetable, reloaded when the file changes
+    PERIODS_FILE_PATH: str = "data/periods.json"
+    TIMETABLE_ANCHOR_DATE: date = date(2025, 1, 6)  # a Monday; weekly calendar events start that week
+    CALENDAR_FEED_CACHE_MAX_ENTRIES: int = 512  # rendered .ics feeds kept in memory (least recently used dropped)
+
+    # Blob storage for uploads
+    BLOB_STORE_BACKEND: str = "cloudinary"    # "cloudinary" or "local"
+    BLOB_LOCAL_ROOT: str = "data/blobs"       # used by the local backend, served at /blobs
+
+    # Image ingestion before upload
+    IMAGE_PIPELINE_WORKERS: int = 2           # processes resizing / re-encoding uploads
+    IMAGE_MAX_UPLOAD_BYTES: int = 15 * 1024 * 1024
+    IMAGE_OUTPUT_FORMAT: str = "WEBP"         # "WEBP" or "JPEG"
+    IMAGE_QUALITY: int = 80
+
+    # Background task worker
+    TASK_WORKER_CONCURRENCY: int = 4          # tasks executed in parallel per worker
+    TASK_POLL_INTERVAL: float = 1.0           # seconds between polls when idle
+    TASK_MAX_ATTEMPTS: int = 5                # attempts before a task is dead-lettered
+    TASK_RETRY_BASE_DELAY: int = 10           # first retry delay, doubled per attempt (seconds)
+    TASK_RETRY_MAX_DELAY: int = 3600
+    TASK_LEASE_TIMEOUT: int = 600             # a Running task older than this is picked up again
+
+    # Listing pagination
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
 
     class Config:
         env_file = ".env"   # loads variables from .env
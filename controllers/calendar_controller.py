@@ -0,0 +1,93 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from core.conditional import etag_matches
+from core.dependencies import get_current_user
+from core.identity_cache import CurrentUser
+from database import get_db
+from repositories.teacher_respository import TeacherRepository
+from services.calendar_service import (
+    CalendarService,
+    class_exam_feed_name,
+    teacher_feed_name,
+)
+
+calendarController = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+
+
+def ics_response(request: Request, body: bytes, etag: str) -> Response:
+    """Full feed, or 304 when the calendar client already holds this version."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type=ICS_MEDIA_TYPE, headers=headers)
+
+
+def require_feed_token(service: CalendarService, token: str | None, feed: str):
+    if not service.feed_token_allows(token, feed):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or missing feed token",
+        )
+
+
+@calendarController.get("/feeds")
+def calendar_feed_links(user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Signed subscription URLs for the caller's timetable and class exam feeds"""
+    try:
+        return CalendarService(TeacherRepository(db)).feed_links(user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build feed links: {str(e)}",
+        )
+
+
+@calendarController.post("/feeds/rotate")
+def rotate_calendar_feed_links(user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    """Revoke the caller's feed URLs (e.g. one was shared by mistake) and return new ones"""
+    try:
+        return CalendarService(TeacherRepository(db)).rotate_feed_links(user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rotate feed links: {str(e)}",
+        )
+
+
+@calendarController.get("/teachers/{teacher_id}.ics")
+def teacher_timetable_feed(teacher_id: str, request: Request, token: str | None = None, db: Session = Depends(get_db)):
+    service = CalendarService(TeacherRepository(db))
+    require_feed_token(service, token, teacher_feed_name(teacher_id))
+    try:
+        body, etag = service.teacher_timetable_feed(teacher_id)
+        return ics_response(request, body, etag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build timetable feed: {str(e)}",
+        )
+
+
+@calendarController.get("/classes/{class_name}/exams.ics")
+def class_exam_feed(class_name: str, request: Request, token: str | None = None, db: Session = Depends(get_db)):
+    service = CalendarService(TeacherRepository(db))
+    require_feed_token(service, token, class_exam_feed_name(class_name))
+    try:
+        body, etag = service.class_exam_feed(class_name)
+        return ics_response(request, body, etag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build exam feed: {str(e)}",
+        )
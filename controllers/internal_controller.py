@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from core.db_pool import pool_metrics
+from core.dependencies import get_current_principal
+from core.hash_pool import hash_pool
+from core.identity_cache import identity_cache
+from core.security import token_cache
+
+internalController = APIRouter(
+    prefix="/internal",
+    tags=["Internal"],
+    dependencies=[Depends(get_current_principal)],
+)
+
+
+@internalController.get("/metrics")
+def get_metrics():
+    """
+    Live counters of this worker process: database pools (checked out / idle
+    connections, acquire wait, overflow and timeouts), the password hash
+    pool and the auth caches. Each worker reports its own pools.
+    """
+    return {
+        "db_pools": pool_metrics(),
+        "password_hash_pool": hash_pool.metrics(),
+        "token_cache": token_cache.stats(),
+        "identity_cache": identity_cache.stats(),
+    }
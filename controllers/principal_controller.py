@@ -1,32 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
 from schemas.principal_schema import (
     PrincipalLoginRequest,
+    PrincipalOtpVerifyRequest,
     PrincipalTokenResponse,
     PrincipalCreateRequest,
     PrincipalAddUserResponse,
     TeachersOut,
+    TeachersPage,
     StudentsOut,
+    StudentsPage,
+    Gender,
+    ExportFormat,
+    QrImageFormat,
     PrincipalOut,
     PrincipalUpdateRequest,
 )
-from database import get_db
+from config import settings
+from database import get_async_db
+from core.responses import fast_json_response
+from schemas.records import parse_fields
+from core.conditional import NotModified, is_not_modified, version_headers
+from core.dependencies import get_current_principal
+from core.identity_cache import CurrentUser
 from services.principal_service import PrincipalService
-from repositories.principal_repository import PrincipalRepository
+from repositories.principal_repository import AsyncPrincipalRepository
 
 principalController = APIRouter(prefix="/principal", tags=["Principal"])
 
 
+def sparse_fields(schema):
+    """
+    Dependency parsing ?fields= against the response schema. Returns None
+    when absent, so handlers fall back to the full record.
+    """
+    def dependency(
+        fields: str | None = Query(
+            None, description=f"Comma separated subset of: {', '.join(schema.model_fields)}"
+        ),
+    ):
+        try:
+            return parse_fields(schema.model_fields, fields)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    return dependency
+
+
+def conditional_read(collection: str):
+    """
+    Dependency answering 304 from the collection version alone, before the
+    handler loads any ORM rows. On a miss the validators are attached to
+    the full response by the add_validator_headers middleware.
+    """
+    async def dependency(
+        request: Request,
+        current_user: CurrentUser = Depends(get_current_principal),
+        db: AsyncSession = Depends(get_async_db),
+    ):
+        version = await AsyncPrincipalRepository(db).get_collection_version(collection)
+        last_modified = version[1]
+        variant = f"{current_user.user_id}|{request.url.query}"
+        headers = version_headers(collection, version, last_modified, variant)
+        if is_not_modified(request.headers, headers, last_modified):
+            raise NotModified(headers)
+        request.state.validator_headers = headers
+    return dependency
+
+
 @principalController.post(
     "/login", response_model=PrincipalTokenResponse, status_code=status.HTTP_200_OK
 )
-def admin_login(payload: PrincipalLoginRequest, db: Session = Depends(get_db)):
+async def admin_login(payload: PrincipalLoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Principal login endpoint with optional TOTP handling."""
-    repo = PrincipalRepository(db)
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
 
     try:
-        token_data = service.principal_login(
+        token_data = await service.principal_login(
             email=payload.principal_email,
             password=payload.principal_password,
             otp_code=payload.principal_otp,
@@ -43,12 +95,33 @@ def admin_login(payload: PrincipalLoginRequest, db: Session = Depends(get_db)):
         )
 
 
+@principalController.post(
+    "/login/verify_otp",
+    response_model=PrincipalTokenResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def admin_login_verify_otp(payload: PrincipalOtpVerifyRequest, db: AsyncSession = Depends(get_async_db)):
+    """Second login step: exchange a pre-auth ticket and OTP for an access token."""
+    repo = AsyncPrincipalRepository(db)
+    service = PrincipalService(repo)
+
+    try:
+        return await service.verify_login_otp(payload.preauth_ticket, payload.principal_otp)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to verify OTP: {str(e)}",
+        )
+
+
 @principalController.post("/forget_password", status_code=status.HTTP_200_OK)
-def forget_password(principal_email: str, db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+async def forget_password(principal_email: str, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        return service.send_forget_password_email(principal_email)
+        return await service.send_forget_password_email(principal_email)
     except HTTPException:
         raise
     except Exception as e:
@@ -59,11 +132,11 @@ def forget_password(principal_email: str, db: Session = Depends(get_db)):
 
 
 @principalController.post("/reset_password")
-def reset_password(token: str, new_password: str, db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_async_db)):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        return service.reset_password(token, new_password)
+        return await service.reset_password(token, new_password)
     except HTTPException:
         raise
     except Exception as e:
@@ -73,17 +146,29 @@ def reset_password(token: str, new_password: str, db: Session = Depends(get_db))
         )
 
 
-@principalController.get("/profile_details", response_model=PrincipalOut)
-def get_principal_profile(db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+@principalController.get(
+    "/profile_details",
+    response_model=PrincipalOut,
+    dependencies=[Depends(conditional_read("principal_profile"))],
+)
+async def get_principal_profile(
+    request: Request,
+    fields: tuple[str, ...] | None = Depends(sparse_fields(PrincipalOut)),
+    current_user: CurrentUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        principal_data = service.fetch_principal_profile(db)
+        principal_data = await service.fetch_principal_profile(current_user.user_id, fields)
         if not principal_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Principal profile not found",
             )
+        if fields:
+            # Partial object; response_model would fill the missing fields with nulls
+            return fast_json_response(request, principal_data)
         return principal_data
     except HTTPException:
         raise
@@ -94,6 +179,31 @@ def get_principal_profile(db: Session = Depends(get_db)):
         )
 
 
+@principalController.get("/totp_qr")
+async def get_totp_qr(
+    token: str,
+    request: Request,
+    image_format: QrImageFormat = Query(QrImageFormat.SVG, alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Authenticator QR code as SVG or PNG (for email clients), addressed by the signed link in the welcome email."""
+    repo = AsyncPrincipalRepository(db)
+    service = PrincipalService(repo)
+    try:
+        digest, image, media_type = await service.get_totp_qr(token, image_format.value)
+        headers = {"ETag": f'"{digest}-{image_format.value}"', "Cache-Control": "private, max-age=3600"}
+        if request.headers.get("if-none-match") == headers["ETag"]:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=image, media_type=media_type, headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to render QR code: {str(e)}",
+        )
+
+
 # @principalController.post("/add_student")
 # def add_student(payload: StudentCreateRequest, db: Session = Depends(get_db)):
 #     repo = PrincipalRepository(db)
@@ -129,13 +239,17 @@ def get_principal_profile(db: Session = Depends(get_db)):
 
 
 @principalController.post("/add_user", response_model=PrincipalAddUserResponse)
-def principal_add_user(payload: PrincipalCreateRequest, db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+async def principal_add_user(
+    payload: PrincipalCreateRequest,
+    current_user: CurrentUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        user = service.principal_add_user(payload)
+        user = await service.principal_add_user(payload)
         return {
-            "message": "User created successfully. Verification email sent.",
+            "message": "User created successfully. Welcome email queued.",
             "user_id": user.user_id,
             "user_email": user.user_email,
             "totp_secret": user.totp_secret,
@@ -149,17 +263,37 @@ def principal_add_user(payload: PrincipalCreateRequest, db: Session = Depends(ge
         )
 
 
-@principalController.get("/teachers", response_model=list[TeachersOut])
-def get_all_teachers(db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+@principalController.get(
+    "/teachers",
+    response_model=TeachersPage,
+    dependencies=[Depends(conditional_read("teachers"))],
+)
+async def get_all_teachers(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    class_name: str | None = None,
+    gender: Gender | None = None,
+    fields: tuple[str, ...] | None = Depends(sparse_fields(TeachersOut)),
+    current_user: CurrentUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        teachers = service.fetch_all_teachers()
-        if not teachers:
+        page = await service.fetch_teachers_page(
+            limit,
+            cursor,
+            class_name=class_name,
+            gender=gender.value if gender else None,
+            fields=fields,
+        )
+        if not page["items"] and cursor is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="No teachers found"
             )
-        return teachers
+        # Records are already in the TeachersPage shape; skip response_model validation
+        return fast_json_response(request, page)
     except HTTPException:
         raise
     except Exception as e:
@@ -169,17 +303,41 @@ def get_all_teachers(db: Session = Depends(get_db)):
         )
 
 
-@principalController.get("/students", response_model=list[StudentsOut])
-def get_all_students(db: Session = Depends(get_db)):
-    repo = PrincipalRepository(db)
+@principalController.get(
+    "/students",
+    response_model=StudentsPage,
+    dependencies=[Depends(conditional_read("students"))],
+)
+async def get_all_students(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    class_name: str | None = None,
+    gender: Gender | None = None,
+    admitted_from: date | None = None,
+    admitted_to: date | None = None,
+    fields: tuple[str, ...] | None = Depends(sparse_fields(StudentsOut)),
+    current_user: CurrentUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
+):
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        students = service.fetch_all_students()
-        if not students:
+        page = await service.fetch_students_page(
+            limit,
+            cursor,
+            class_name=class_name,
+            gender=gender.value if gender else None,
+            admitted_from=admitted_from,
+            admitted_to=admitted_to,
+            fields=fields,
+        )
+        if not page["items"] and cursor is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="No students found"
             )
-        return students
+        # Records are already in the StudentsPage shape; skip response_model validation
+        return fast_json_response(request, page)
     except HTTPException:
         raise
     except Exception as e:
@@ -189,14 +347,37 @@ def get_all_students(db: Session = Depends(get_db)):
         )
 
 
+@principalController.get("/students/export")
+async def export_students(
+    export_format: ExportFormat = Query(ExportFormat.NDJSON, alias="format"),
+    fields: tuple[str, ...] | None = Depends(sparse_fields(StudentsOut)),
+    current_user: CurrentUser = Depends(get_current_principal),
+):
+    """Stream the whole student register. The repository owns its session
+    because the body is sent after request dependencies have been closed."""
+    repo = AsyncPrincipalRepository(read_only=True)
+    service = PrincipalService(repo)
+    if export_format == ExportFormat.CSV:
+        media_type, filename = "text/csv", "students.csv"
+    else:
+        media_type, filename = "application/x-ndjson", "students.ndjson"
+    return StreamingResponse(
+        service.export_students(export_format, fields),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
 @principalController.put("/update_profile", response_model=PrincipalOut)
-def update_principal_profile(
-    payload: PrincipalUpdateRequest, db: Session = Depends(get_db)
+async def update_principal_profile(
+    payload: PrincipalUpdateRequest,
+    current_user: CurrentUser = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    repo = PrincipalRepository(db)
+    repo = AsyncPrincipalRepository(db)
     service = PrincipalService(repo)
     try:
-        principal_data = service.update_principal_profile(payload)
+        principal_data = await service.update_principal_profile(current_user.user_id, payload)
         if not principal_data:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
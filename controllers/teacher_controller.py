@@ -198,7 +198,7 @@
 #         if not data:
 #             raise HTTPException(status_code=400, detail="No data provided")
 
-#         result = service.add_assignment_into_json_file(data)
+#         result = service.add_assignment(data)
 
 #         if result.get("success"):
 #             return {"message": "Assignment added successfully"}
@@ -215,10 +215,16 @@
 
 # @teacherController.get("/get_assignments")
 # def get_assignments_for_current_working_teacher(
+#     class_name: str | None = None,
+#     due_from: datetime.date | None = None,
+#     due_to: datetime.date | None = None,
 #     service: TeacherService = Depends(get_teacher_service),
 # ):
 #     try:
-#         assignments = service.get_assignments_from_json_file()
+#         if due_from and due_to:
+#             assignments = service.get_assignments_due(due_from, due_to, class_name)
+#         else:
+#             assignments = service.get_assignments(class_name)
 #         return JSONResponse(
 #             content={"success": True, "assignments": assignments}, status_code=200
 #         )
@@ -227,12 +233,12 @@
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-# @teacherController.delete("/delete_assignment/{index_pos}")
+# @teacherController.delete("/delete_assignment/{assignment_id}")
 # def delete_assignment(
-#     index_pos: int, service: TeacherService = Depends(get_teacher_service)
+#     assignment_id: str, service: TeacherService = Depends(get_teacher_service)
 # ):
 #     try:
-#         result = service.delete_assignment_from_json_file(index_pos)
+#         result = service.delete_assignment(assignment_id)
 #         if result.get("success"):
 #             return {"message": "Assignment deleted successfully"}
 #         else:
@@ -243,18 +249,18 @@
 #         raise HTTPException(status_code=500, detail=str(e))
 
 
-# @teacherController.post("/update_assignment/{index}")
+# @teacherController.post("/update_assignment/{assignment_id}")
 # async def update_assignment(
-#     index_pos: int,
-#     response=Response,
+#     assignment_id: str,
+#     request: Request,
 #     service: TeacherService = Depends(get_teacher_service),
 # ):
 #     try:
-#         updated_data = await response.json()
+#         updated_data = await request.json()
 #         if not updated_data:
 #             raise HTTPException(status_code=400, detail="No data provided")
 
-#         result = service.update_assignments_in_json_file(index_pos, updated_data)
+#         result = service.update_assignment(assignment_id, updated_data)
 #         if result.get("success"):
 #             return {"message": "Assignment was Updated successfully"}
 #         else:
@@ -307,7 +313,7 @@
 # ):
 #     try:
 #         student_datas = json.loads(student_datas)  # convert back to dict
-#         result = service.add_student_via_teacher(student_datas, student_image_file)
+#         result = await service.add_student_via_teacher(student_datas, student_image_file)
 #         if result.get("success"):
 #             return {"message": "Student added successfully"}
 #         else:
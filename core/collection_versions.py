@@ -0,0 +1,62 @@
+# core/collection_versions.py
+import datetime
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+from models import CollectionVersion, Principal, Student, Teacher
+from models.education.exams import ExamSubjectsTable, ExamTable
+
+# Mapped class -> read collection whose ETag its rows feed
+TRACKED_COLLECTIONS = {
+    Teacher: "teachers",
+    Student: "students",
+    Principal: "principal_profile",
+    ExamTable: "exams",
+    ExamSubjectsTable: "exams",
+}
+
+
+def bump_statement(names):
+    return (
+        update(CollectionVersion)
+        .where(CollectionVersion.name.in_(sorted(names)))
+        .values(version=CollectionVersion.version + 1, changed_at=datetime.datetime.utcnow())
+    )
+
+
+def _touched_collections(session: Session) -> set[str]:
+    names = {TRACKED_COLLECTIONS.get(type(obj)) for obj in (*session.new, *session.deleted)}
+    names.update(
+        TRACKED_COLLECTIONS.get(type(obj))
+        for obj in session.dirty
+        if session.is_modified(obj, include_collections=False)
+    )
+    names.discard(None)
+    return names
+
+
+# Registered on the Session class, so sync sessions and the sessions behind
+# AsyncSession both bump versions. The bump is part of the writing
+# transaction: a rollback leaves the version untouched.
+@event.listens_for(Session, "before_flush")
+def _collect_touched_collections(session, flush_context, instances):
+    touched = _touched_collections(session)
+    if touched:
+        session.info.setdefault("touched_collections", set()).update(touched)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_touched_collections(session, flush_context):
+    touched = session.info.pop("touched_collections", None)
+    if touched:
+        session.connection().execute(bump_statement(touched))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_for_bulk_statements(orm_execute_state):
+    # insert(Model) / update(Model) / delete(Model) executed on a session skip the flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    name = TRACKED_COLLECTIONS.get(mapper.class_) if mapper is not None else None
+    if name:
+        orm_execute_state.session.connection().execute(bump_statement({name}))
@@ -0,0 +1,77 @@
+# core/conditional.py
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Request, Response
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True when an If-None-Match header covers the given ETag (weak comparison, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    plain = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == plain
+        for candidate in if_none_match.split(",")
+    )
+
+
+class NotModified(Exception):
+    """Raised by a conditional dependency to answer 304 before any rows are loaded."""
+
+    def __init__(self, headers: dict):
+        self.headers = headers
+
+
+def version_headers(name: str, version: tuple, last_modified: datetime | None, variant: str = "") -> dict:
+    """
+    Validators for a collection at a given data version. `variant` (the
+    query string) is part of the ETag because filters and pages change the body.
+    """
+    digest = hashlib.sha256(f"{name}|{version}|{variant}".encode()).hexdigest()[:32]
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request_headers, headers: dict, last_modified: datetime | None) -> bool:
+    if_none_match = request_headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence over If-Modified-Since
+        return etag_matches(if_none_match, headers["ETag"])
+    if_modified_since = request_headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def _as_utc(value: datetime) -> datetime:
+    # DB timestamps are naive and stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+async def not_modified_handler(request: Request, exc: NotModified) -> Response:
+    return Response(status_code=304, headers=exc.headers)
+
+
+async def add_validator_headers(request: Request, call_next):
+    """Copy validators a conditional dependency computed onto the full response."""
+    response = await call_next(request)
+    headers = getattr(request.state, "validator_headers", None)
+    if headers and response.status_code == 200:
+        for key, value in headers.items():
+            if key == "Vary" and "vary" in response.headers:
+                value = f"{response.headers['vary']}, {value}"
+            response.headers[key] = value
+    return response
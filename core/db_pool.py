@@ -0,0 +1,194 @@
+# core/db_pool.py
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from config import settings
+
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+
+
+class PoolMetrics:
+    """Counters for one engine's pool, updated from pool events and checkout timing."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def incr(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def snapshot(self, pool) -> dict:
+        stats = {}
+        if isinstance(pool, QueuePool):
+            stats = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            }
+        with self._lock:
+            return {
+                "pool": type(pool).__name__,
+                **stats,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "overflow_connects": self.overflow_connects,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "avg_wait_ms": round(self._wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self._wait_max * 1000, 3),
+            }
+
+
+class _InstrumentedPool:
+    """Times every checkout, including the wait for a free connection."""
+
+    metrics: PoolMetrics | None = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics:
+            self.metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a new pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+# name -> sync Engine (AsyncEngine.sync_engine for the async one)
+_engines = {}
+
+
+def pool_options(url: str, async_engine: bool = False) -> dict:
+    """create_engine() keyword arguments for the configured pool."""
+    if settings.DB_POOL_PRE_PING not in PRE_PING_STRATEGIES:
+        raise ValueError(f"DB_POOL_PRE_PING must be one of {', '.join(PRE_PING_STRATEGIES)}")
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite lives in one connection; keep SQLAlchemy's default pool
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_engine else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def _ping(dbapi_connection):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    finally:
+        cursor.close()
+
+
+def instrument_engine(name: str, engine):
+    """
+    Register an engine built with pool_options(): attach metrics and, for
+    the "idle" pre-ping strategy, ping only connections that sat unused
+    longer than DB_POOL_PING_IDLE instead of on every checkout.
+    """
+    metrics = PoolMetrics(name)
+    if isinstance(engine.pool, _InstrumentedPool):
+        engine.pool.metrics = metrics
+    _engines[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        metrics.incr("connects")
+        if isinstance(engine.pool, QueuePool) and engine.pool.overflow() > 0:
+            metrics.incr("overflow_connects")
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["returned_at"] = time.monotonic()
+
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.incr("invalidations")
+
+    if settings.DB_POOL_PRE_PING == "idle":
+        @event.listens_for(engine, "checkout")
+        def ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+            returned_at = connection_record.info.get("returned_at")
+            if returned_at is None or time.monotonic() - returned_at < settings.DB_POOL_PING_IDLE:
+                return
+            metrics.incr("pings")
+            try:
+                _ping(dbapi_connection)
+            except Exception as e:
+                metrics.incr("ping_failures")
+                # The pool discards this connection and checks out another one
+                raise exc.DisconnectionError(f"Idle connection failed ping: {e}") from e
+    return engine
+
+
+def pool_metrics() -> dict:
+    return {name: engine.pool.metrics.snapshot(engine.pool) if getattr(engine.pool, "metrics", None)
+            else {"pool": type(engine.pool).__name__, "status": engine.pool.status()}
+            for name, engine in _engines.items()}
+
+
+def warm_up_pool(engine, connections: int = settings.DB_POOL_WARMUP):
+    """Open pooled connections now rather than on the first requests."""
+    held = []
+    try:
+        for _ in range(min(connections, settings.DB_POOL_SIZE)):
+            held.append(engine.connect())
+    finally:
+        for connection in held:
+            connection.close()
+
+
+async def warm_up_async_pool(async_engine, connections: int = settings.DB_POOL_WARMUP):
+    held = []
+    try:
+        for _ in range(min(connections, settings.DB_POOL_SIZE)):
+            held.append(await async_engine.connect())
+    finally:
+        for connection in held:
+            await connection.close()
@@ -0,0 +1,57 @@
+# core/dependencies.py
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_async_db
+from core.identity_cache import CurrentUser, identity_cache, count_identity_db_lookup
+from core.security import decode_access_token
+from repositories.principal_repository import AsyncPrincipalRepository
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> CurrentUser:
+    """
+    Resolve the bearer token to the calling user. Claims come from the
+    verified-token cache and the user row from the identity cache, so a
+    warm request does no database work here.
+    """
+    unauthorized = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or missing access token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    if not credentials:
+        raise unauthorized
+    claims = decode_access_token(credentials.credentials)
+    # Pre-auth and reset tokens carry a purpose and are not access tokens
+    if not claims or claims.get("purpose") or not claims.get("sub"):
+        raise unauthorized
+
+    identity = identity_cache.get(claims["sub"])
+    if identity is None:
+        count_identity_db_lookup()
+        user = await AsyncPrincipalRepository(db).get_user_with_principal_by_email(claims["sub"])
+        if not user:
+            raise unauthorized
+        identity = CurrentUser(
+            user_id=user.user_id,
+            user_name=user.user_name,
+            user_email=user.user_email,
+            user_role=user.user_role,
+            principal_id=user.principal.principal_id if user.principal else None,
+        )
+        identity_cache.put(identity)
+    return identity
+
+
+def get_current_principal(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    if user.user_role.lower() != "principal":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Principal access required",
+        )
+    return user
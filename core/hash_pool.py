@@ -0,0 +1,153 @@
+# core/hash_pool.py
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from fastapi import HTTPException, status
+from config import settings
+
+
+class HashPoolBusy(HTTPException):
+    """Raised when the password hash queue is full; surfaces as 503."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordHashPool:
+    """
+    Runs password hashing on a small process pool so bcrypt does not hold
+    request threads (or the GIL) for its full cost. At most `max_pending`
+    hashes are queued or running; callers beyond that wait up to
+    `queue_timeout` seconds for a slot and are then rejected with 503, so a
+    login burst cannot starve the thread pool other endpoints rely on.
+
+    Async callers queue on an asyncio.Semaphore of the same size, so waiting
+    for a slot costs no thread. They only fall back to a thread when sync
+    callers hold the shared slots.
+    """
+
+    def __init__(self, workers: int, max_pending: int, queue_timeout: float):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.queue_timeout = queue_timeout
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._async_slots = weakref.WeakKeyDictionary()  # event loop -> asyncio.Semaphore
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            return self._executor
+
+    def _reject(self):
+        with self._lock:
+            self._rejected += 1
+        raise HashPoolBusy()
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._reject()
+
+    def _async_gate(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            gate = self._async_slots.get(loop)
+            if gate is None:
+                gate = self._async_slots[loop] = asyncio.Semaphore(self.max_pending)
+            return gate
+
+    async def _acquire_async(self, timeout: float):
+        """Take a shared slot, waiting on a thread only while sync callers hold them all."""
+        if self._slots.acquire(blocking=False):
+            return
+        waiter = asyncio.ensure_future(asyncio.to_thread(self._slots.acquire, True, max(timeout, 0)))
+        try:
+            acquired = await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            # The thread may still get the slot after we stopped waiting; give it back
+            waiter.add_done_callback(lambda done: done.result() and self._slots.release())
+            raise
+        if not acquired:
+            self._reject()
+
+    def _submit(self, func, *args) -> Future:
+        started = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def _done(_future):
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                self._total_seconds += time.perf_counter() - started
+            self._slots.release()
+
+        try:
+            future = self._get_executor().submit(func, *args)
+        except Exception:
+            _done(None)
+            raise
+        future.add_done_callback(_done)
+        return future
+
+    def run(self, func, *args):
+        """Run func(*args) in the pool, blocking the calling thread for the result."""
+        self._acquire()
+        return self._submit(func, *args).result()
+
+    async def run_async(self, func, *args):
+        """
+        Await func(*args) from the event loop without occupying a worker thread.
+        Waits up to queue_timeout for a slot before raising HashPoolBusy.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.queue_timeout
+        gate = self._async_gate()
+        try:
+            await asyncio.wait_for(gate.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject()
+        try:
+            await self._acquire_async(deadline - loop.time())
+            return await asyncio.wrap_future(self._submit(func, *args))
+        finally:
+            gate.release()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "queue_depth": max(self._pending - self.workers, 0),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_ms": round(self._total_seconds / self._completed * 1000, 2)
+                if self._completed
+                else 0.0,
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+
+hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    queue_timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,146 @@
+# core/ical.py
+import datetime
+import hashlib
+import threading
+from collections import OrderedDict
+from config import settings
+from core.conditional import strong_etag
+
+PRODID = "-//School Management System//Timetable//EN"
+
+
+def _escape(value) -> str:
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold content lines at 75 octets as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b""
+    for char in line:
+        char_bytes = char.encode()
+        if len(current) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(current.decode())
+            current = b""
+        current += char_bytes
+    parts.append(current.decode())
+    return "\r\n ".join(parts)
+
+
+def _local(value: datetime.datetime) -> str:
+    # Floating local time: the school's wall clock, whatever the device zone
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def _uid(*parts) -> str:
+    return hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest() + "@school-management"
+
+
+def render_calendar(name: str, events: list[dict], stamp: datetime.datetime) -> bytes:
+    """
+    events: [{"uid", "summary", "start", "end", "description"?, "location"?, "rrule"?}]
+    `stamp` is used for DTSTAMP so unchanged data renders byte-identical output.
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    dtstamp = stamp.astimezone(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event['uid']}",
+            f"DTSTAMP:{dtstamp}",
+            f"DTSTART:{_local(event['start'])}",
+            f"DTEND:{_local(event['end'])}",
+            f"SUMMARY:{_escape(event['summary'])}",
+        ]
+        if event.get("rrule"):
+            lines.append(f"RRULE:{event['rrule']}")
+        if event.get("location"):
+            lines.append(f"LOCATION:{_escape(event['location'])}")
+        if event.get("description"):
+            lines.append(f"DESCRIPTION:{_escape(event['description'])}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return ("\r\n".join(_fold(line) for line in lines) + "\r\n").encode()
+
+
+def timetable_events(periods, anchor_monday: datetime.date) -> list[dict]:
+    """Weekly recurring events for timetable periods, starting the week of `anchor_monday`."""
+    events = []
+    for period in periods:
+        day = anchor_monday + datetime.timedelta(days=period.weekday)
+        start = datetime.datetime.combine(day, datetime.time(period.start // 60, period.start % 60))
+        end = datetime.datetime.combine(day, datetime.time(period.end // 60, period.end % 60))
+        events.append({
+            "uid": _uid("period", period.teacher_id, period.class_name, period.weekday, period.start),
+            "summary": f"{period.subject} - {period.class_name}" if period.subject else period.class_name,
+            "start": start,
+            "end": end,
+            "rrule": "FREQ=WEEKLY",
+            "location": period.data.get("room"),
+        })
+    return events
+
+
+def exam_events(rows) -> list[dict]:
+    """One event per exam subject row (exam_name, exam_code, subject_name, exam_date, start_time, end_time, marks)."""
+    return [
+        {
+            "uid": _uid("exam", row.exam_code, row.subject_name, row.exam_date),
+            "summary": f"{row.exam_name}: {row.subject_name}",
+            "start": datetime.datetime.combine(row.exam_date, row.start_time),
+            "end": datetime.datetime.combine(row.exam_date, row.end_time),
+            "description": f"Exam code {row.exam_code}, {row.marks} marks",
+        }
+        for row in rows
+    ]
+
+
+class FeedCache:
+    """
+    Rendered feeds keyed by name, at most `max_entries` of them (least
+    recently used dropped). A feed is re-rendered only when the version of
+    its source data differs from the cached one; a None version (unknown)
+    is rendered without being cached.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._feeds = OrderedDict()  # key -> (version, body, etag)
+        self._lock = threading.Lock()
+
+    def get(self, key, version, render) -> tuple[bytes, str]:
+        with self._lock:
+            cached = self._feeds.get(key)
+            if cached and version is not None and cached[0] == version:
+                self._feeds.move_to_end(key)
+                return cached[1], cached[2]
+        body = render()
+        etag = strong_etag(body)
+        if version is None:
+            return body, etag
+        with self._lock:
+            self._feeds[key] = (version, body, etag)
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self.max_entries:
+                self._feeds.popitem(last=False)
+        return body, etag
+
+    def __len__(self):
+        return len(self._feeds)
+
+
+feed_cache = FeedCache(max_entries=settings.CALENDAR_FEED_CACHE_MAX_ENTRIES)
@@ -0,0 +1,86 @@
+# core/identity_cache.py
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """Identity of the authenticated caller, detached from any DB session."""
+    user_id: str
+    user_name: str
+    user_email: str
+    user_role: str
+    principal_id: int | None = None
+
+
+class IdentityCache:
+    """
+    TTL cache of resolved identities keyed by the token subject (email),
+    so authenticated requests skip the user lookup while an entry is fresh.
+    Writes that change a user call invalidate().
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}  # email -> (CurrentUser, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, email: str) -> CurrentUser | None:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._entries[email]
+            self.misses += 1
+            return None
+
+    def put(self, identity: CurrentUser):
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # Drop the entry closest to expiry
+                oldest = min(self._entries, key=lambda key: self._entries[key][1])
+                del self._entries[oldest]
+            self._entries[identity.user_email] = (identity, time.monotonic() + self.ttl)
+
+    def invalidate(self, user_id: str | None = None, email: str | None = None):
+        with self._lock:
+            if email:
+                self._entries.pop(email, None)
+            if user_id:
+                for key in [key for key, (identity, _) in self._entries.items() if identity.user_id == user_id]:
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+identity_cache = IdentityCache(
+    ttl=settings.IDENTITY_CACHE_TTL,
+    max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES,
+)
+
+
+# Per-request count of identity lookups that reached the database.
+_identity_db_lookups: ContextVar[list | None] = ContextVar("identity_db_lookups", default=None)
+
+
+def start_identity_lookup_counter() -> list:
+    """Called once per request; the returned list's single item is the count."""
+    counter = [0]
+    _identity_db_lookups.set(counter)
+    return counter
+
+
+def count_identity_db_lookup():
+    counter = _identity_db_lookups.get()
+    if counter is not None:
+        counter[0] += 1
@@ -1,17 +1,198 @@
 # core/mail.py
+import html
 import smtplib
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from email.message import EmailMessage
 from config import settings
-import io
-import qrcode
-import pyotp
+from core.tasks import task
 
 
-def send_email_smtp(
+@dataclass(frozen=True, slots=True)
+class SendResult:
+    message: EmailMessage
+    error: str | None = None   # None when the server accepted the message
+
+    @property
+    def sent(self) -> bool:
+        return self.error is None
+
+
+class SMTPConnectionPool:
+    """
+    Keeps authenticated SMTP sessions open so consecutive emails skip the
+    connect / STARTTLS / login handshake. Sessions idle for too long or that
+    have sent too many messages are replaced.
+
+    A message the server rejects (refused recipient, 5xx reply) fails on its
+    own and the session is kept. Only a dropped connection is reconnected,
+    once per message; if reconnecting fails the rest of the batch is
+    reported failed without further attempts.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        max_size: int = 2,
+        idle_timeout: float = 60,
+        max_messages: int = 100,
+        timeout: float = 30,
+        starttls: bool = True,
+    ):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self.starttls = starttls
+        self.connects = 0
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []  # [(server, last_used, messages_sent)]
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        with self._lock:
+            self.connects += 1
+        try:
+            if self.starttls:
+                server.starttls()
+            server.login(self.username, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        return server
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> tuple[smtplib.SMTP, int]:
+        while True:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                return self._connect(), 0
+            server, last_used, sent = entry
+            if time.monotonic() - last_used < self.idle_timeout:
+                return server, sent
+            self._discard(server)
+
+    def _checkin(self, server: smtplib.SMTP, sent: int):
+        if sent >= self.max_messages:
+            self._discard(server)
+            return
+        with self._lock:
+            self._idle.append((server, time.monotonic(), sent))
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow one authenticated session as {"server", "sent"}. A session that
+        raised is not reused; set "server" to None after discarding it yourself.
+        """
+        with self._slots:
+            server, sent = self._checkout()
+            session = {"server": server, "sent": sent}
+            try:
+                yield session
+            except Exception:
+                if session["server"] is not None:
+                    self._discard(session["server"])
+                raise
+            if session["server"] is not None:
+                self._checkin(session["server"], session["sent"])
+
+    def _send_one(self, session: dict, msg: EmailMessage) -> str | None:
+        """Send msg over the session, reconnecting once if it dropped. Returns the error, if any."""
+        for attempt in range(2):
+            if session["server"] is None:
+                session["server"], session["sent"] = self._connect(), 0
+            try:
+                session["server"].send_message(msg)
+                session["sent"] += 1
+                return None
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code != 421:
+                    # The server answered: this message is rejected, the session is fine
+                    return str(e)
+                error = e  # 421: the server is closing the session
+            except smtplib.SMTPRecipientsRefused as e:
+                return str(e)
+            except smtplib.SMTPServerDisconnected as e:
+                error = e
+            except smtplib.SMTPException as e:
+                return str(e)
+            except OSError as e:
+                error = e
+            # Connection lost: drop it and retry this message on a new one
+            self._discard(session["server"])
+            session["server"] = None
+        return str(error)
+
+    def send_messages(self, messages: list[EmailMessage]) -> list[SendResult]:
+        """
+        Send a batch over one session and report each message's outcome, in
+        order. Messages already accepted are never reported as failed.
+        """
+        results = []
+        try:
+            with self.connection() as session:
+                for msg in messages:
+                    error = self._send_one(session, msg)
+                    if error:
+                        print(f"Error sending email to {msg['To']}: {error}")
+                    results.append(SendResult(msg, error))
+        except (smtplib.SMTPException, OSError) as e:
+            # Could not (re)connect: the unsent rest of the batch fails
+            print(f"Error connecting to SMTP server {self.host}:{self.port}: {e}")
+            results.extend(SendResult(msg, str(e)) for msg in messages[len(results):])
+        return results
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _, _ in idle:
+            self._discard(server)
+
+
+_smtp_pool: SMTPConnectionPool | None = None
+_smtp_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    global _smtp_pool
+    with _smtp_pool_lock:
+        if _smtp_pool is None:
+            _smtp_pool = SMTPConnectionPool(
+                settings.SMTP_HOST,
+                settings.SMTP_PORT,
+                settings.SMTP_EMAIL,
+                settings.SMTP_PASSWORD,
+                max_size=settings.SMTP_POOL_SIZE,
+                idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT,
+                max_messages=settings.SMTP_POOL_MAX_MESSAGES,
+                timeout=settings.SMTP_TIMEOUT,
+                starttls=settings.SMTP_STARTTLS,
+            )
+        return _smtp_pool
+
+
+def build_email_message(
     to_email: str, subject: str, html_content: str, qr_code_bytes: bytes = None
-):
+) -> EmailMessage:
     """
-    Send an email using SMTP with optional QR code attachment (inline for HTML).
+    Build an HTML email with optional QR code attachment (inline for HTML).
     """
     msg = EmailMessage()
     msg["Subject"] = subject
@@ -25,64 +206,113 @@ def send_email_smtp(
         msg.get_payload()[1].add_related(
             qr_code_bytes, "image", "png", cid="totp_qr_code"
         )
+    return msg
 
-    try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_EMAIL, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-            print(f"Email sent successfully to {to_email}")
-    except Exception as e:
-        print(f"Error sending email to {to_email}: {e}")
+
+def send_bulk_emails(messages: list[EmailMessage]) -> list[SendResult]:
+    """
+    Send several emails over one pooled SMTP session. Returns one result per message.
+    """
+    return get_smtp_pool().send_messages(messages)
 
 
-def send_welcome_email(to_email: str, user_name: str, password: str, user_role: str):
+def send_email_smtp(
+    to_email: str, subject: str, html_content: str, qr_code_bytes: bytes = None
+):
     """
-    Send a standard welcome email for students or teachers.
+    Send an email using a pooled SMTP session with optional QR code attachment.
+    Raises when delivery fails so a queued task is retried.
     """
-    subject = f"Welcome to the School Management System, {user_role}!"
-    html_content = f"""
+    msg = build_email_message(to_email, subject, html_content, qr_code_bytes)
+    result = send_bulk_emails([msg])[0]
+    if not result.sent:
+        raise RuntimeError(f"Failed to send email to {to_email}: {result.error}")
+    print(f"Email sent successfully to {to_email}")
+
+
+def _welcome_user(email: str):
+    from database import SessionLocal
+    from repositories.principal_repository import PrincipalRepository
+
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.get_user_with_principal_by_email(email)
+    finally:
+        repo.db.close()
+    if user is None:
+        raise LookupError(f"No user with email {email} for the welcome email")
+    return user
+
+
+def _set_password_link(user_id: str, email: str) -> str:
+    from core.security import create_reset_password_token
+
+    token = create_reset_password_token(user_id, email, ttl=settings.SET_PASSWORD_LINK_TTL)
+    return f"{settings.FRONTEND_URL}/reset-password?token={token}"
+
+
+def _welcome_html(to_email: str, user_name: str, user_role: str, set_password_link: str) -> str:
+    return f"""
     <h1>Welcome, {user_name}!</h1>
     <p>Your account has been created with the role of <b>{user_role}</b>.</p>
-    <p>You can now login using:</p>
     <p><b>Email:</b> {to_email}</p>
-    <p><b>Password:</b> {password}</p>
+    <p>Sign in with the password given to you by your principal, or
+    <a href="{set_password_link}">choose your own password</a>.</p>
+    """
+
+
+# Tasks queued before the links were built at send time carry `password`
+# (and, for principals, totp_secret or totp_qr_url); they are accepted, the
+# password is never put in the email.
+@task("send_welcome_email")
+def send_welcome_email(
+    to_email: str, user_name: str, user_role: str, user_id: str | None = None, password: str | None = None
+):
+    """
+    Send a standard welcome email for students or teachers.
+    """
+    user_id = user_id or _welcome_user(to_email).user_id
+    subject = f"Welcome to the School Management System, {user_role}!"
+    html_content = _welcome_html(to_email, user_name, user_role, _set_password_link(user_id, to_email)) + """
     <p>Thank you for joining!</p>
     """
     send_email_smtp(to_email, subject, html_content)
 
 
+@task("send_principal_welcome_email")
 def send_principal_welcome_email(
-    to_email: str, user_name: str, password: str, user_role: str, totp_secret: str
+    to_email: str,
+    user_name: str,
+    user_role: str,
+    user_id: str | None = None,
+    password: str | None = None,
+    totp_qr_url: str | None = None,
+    totp_secret: str | None = None,
 ):
     """
-    Send a welcome email to a principal with TOTP QR code.
+    Send a welcome email to a principal with a set-password link and the
+    TOTP QR code. The image is a PNG (Gmail and Outlook do not display SVG)
+    rendered on first view by /principal/totp_qr.
     """
-    subject = f"Welcome to the School Management System, {user_role}!"
+    from core.totp_qr import build_totp_qr_link
 
-    # Generate QR code from TOTP secret
-    totp_uri = pyotp.TOTP(totp_secret).provisioning_uri(
-        name=to_email, issuer_name="School Management System"
-    )
-    qr = qrcode.make(totp_uri)
-    buf = io.BytesIO()
-    qr.save(buf, format="PNG")
-    qr_code_bytes = buf.getvalue()
+    user = _welcome_user(to_email)
+    if totp_qr_url is None:
+        totp_qr_url = build_totp_qr_link(user, "png")
+    totp_qr_url = html.escape(totp_qr_url)
+    subject = f"Welcome to the School Management System, {user_role}!"
 
-    html_content = f"""
-    <h1>Welcome, {user_name}!</h1>
-    <p>Your account has been created with the role of <b>{user_role}</b>.</p>
-    <p>You can now login using:</p>
-    <p><b>Email:</b> {to_email}</p>
-    <p><b>Password:</b> {password}</p>
+    html_content = _welcome_html(to_email, user_name, user_role, _set_password_link(user.user_id, to_email)) + f"""
     <p>Scan this QR code in your Authenticator app to enable 2FA:</p>
-    <img src="cid:totp_qr_code">
+    <img src="{totp_qr_url}" alt="TOTP QR code" width="200" height="200">
+    <p>If the image does not load, <a href="{totp_qr_url}">open the QR code</a>.</p>
     <p>Thank you for joining!</p>
     """
 
-    send_email_smtp(to_email, subject, html_content, qr_code_bytes)
+    send_email_smtp(to_email, subject, html_content)
 
 
+@task("send_reset_password_email")
 def send_reset_password_email(
     to_email: str, reset_token: str, otp_code: str | None = None
 ):
@@ -0,0 +1,54 @@
+# core/otp_replay.py
+import threading
+import time
+
+
+class UsedOtpCache:
+    """
+    Remembers TOTP codes that were already accepted so a code cannot be
+    replayed while it is still valid. Codes are grouped in buckets of one
+    TOTP time step; only the buckets a code can still be valid in are kept,
+    so memory is bounded by the logins of the last few steps.
+    """
+
+    def __init__(self, step: int = 30, valid_window: int = 1):
+        self.step = step
+        # A code accepted now stays valid for up to 2 * valid_window more steps
+        self.retained_steps = 2 * valid_window + 1
+        self._buckets = {}  # time step -> {(user_id, code)}
+        self._lock = threading.Lock()
+
+    def mark_used(self, user_id: str, code: str) -> bool:
+        """Record the code; returns False when it was already used."""
+        current = int(time.time() // self.step)
+        key = (user_id, code)
+        with self._lock:
+            for bucket_step in list(self._buckets):
+                if bucket_step <= current - self.retained_steps:
+                    del self._buckets[bucket_step]
+            if any(key in bucket for bucket in self._buckets.values()):
+                return False
+            self._buckets.setdefault(current, set()).add(key)
+            return True
+
+
+class FailedAttemptCounter:
+    """
+    Wrong OTP codes per pre-auth ticket (by jti). Entries are dropped once
+    the ticket has expired, so memory is bounded by the tickets issued in
+    the last PREAUTH_TICKET_TTL seconds.
+    """
+
+    def __init__(self):
+        self._failures = {}  # jti -> (count, expires_at)
+        self._lock = threading.Lock()
+
+    def record_failure(self, jti: str, expires_at: float) -> int:
+        """Count one more failure for the ticket; returns the total so far."""
+        now = time.time()
+        with self._lock:
+            for key in [key for key, (_, expiry) in self._failures.items() if expiry <= now]:
+                del self._failures[key]
+            count = self._failures.get(jti, (0, expires_at))[0] + 1
+            self._failures[jti] = (count, expires_at)
+            return count
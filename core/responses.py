@@ -0,0 +1,50 @@
+# core/responses.py
+import gzip
+import orjson
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+def _default(value):
+    # Decimal (salary) and anything else orjson does not know
+    return float(value) if hasattr(value, "as_integer_ratio") else str(value)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick br or gzip from Accept-Encoding, honouring q=0."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    for encoding in (("br",) if brotli else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+def fast_json_response(request: Request, content, status_code: int = 200) -> Response:
+    """
+    Serialise with orjson (dataclasses, dates and enums natively) and
+    compress with the best encoding the client accepts.
+    """
+    body = orjson.dumps(content, default=_default)
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = brotli.compress(body, quality=4) if encoding == "br" else gzip.compress(body, compresslevel=5)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
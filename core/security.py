@@ -1,29 +1,118 @@
 from datetime import datetime, timedelta
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+from functools import lru_cache
 from config import settings
-import pyotp
+from core.hash_pool import hash_pool, HashPoolBusy
+from core.token_cache import VerifiedTokenCache
+from core.otp_replay import FailedAttemptCounter, UsedOtpCache
 import random
+import time
+import uuid
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose, passlib and pyotp are imported where they are used, so importing
+# this module (and the app) does not load them or build the CryptContext.
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+def build_pwd_context(scheme: str = settings.PASSWORD_HASH_SCHEME):
+    """
+    Hash with `scheme` at the configured cost. The other scheme stays
+    verifiable but deprecated, and hashes below the configured cost report
+    needs_update(), so they are upgraded on the next successful login.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        deprecated="auto",
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+# Built on first use, once per process (the hash pool workers build their own).
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    return build_pwd_context()
+
+# Claims of tokens whose signature was already verified.
+token_cache = VerifiedTokenCache(
+    max_entries=settings.TOKEN_CACHE_MAX_ENTRIES,
+    max_ttl=settings.TOKEN_CACHE_MAX_TTL,
+)
+
+# Run inside the hash pool processes.
+def _hash_in_worker(password: str):
+    return get_pwd_context().hash(password)
+
+def _verify_in_worker(plain_password, hashed_password):
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+def _verify_and_update_in_worker(plain_password, hashed_password):
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 # Hash the Password.
 def hash_password(password: str):
     try:
-        return pwd_context.hash(password)
+        return hash_pool.run(_hash_in_worker, password)
+    except HashPoolBusy:
+        raise
     except Exception as e:
         print(f"Error hashing password: {e}")
 
 # Verify the Password.
 def verify_password(plain_password, hashed_password):
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        return hash_pool.run(_verify_in_worker, plain_password, hashed_password)
+    except HashPoolBusy:
+        raise
+    except Exception as e:
+        print(f"Error verifying password: {e}")
+        return False
+
+# Verify the Password and return a replacement hash when the stored one
+# uses an outdated scheme or cost: (is_valid, new_hash_or_None).
+def verify_and_update_password(plain_password, hashed_password):
+    try:
+        return hash_pool.run(_verify_and_update_in_worker, plain_password, hashed_password)
+    except HashPoolBusy:
+        raise
+    except Exception as e:
+        print(f"Error verifying password: {e}")
+        return False, None
+
+# Async variants for `async def` handlers; they do not hold a worker thread.
+async def hash_password_async(password: str):
+    try:
+        return await hash_pool.run_async(_hash_in_worker, password)
+    except HashPoolBusy:
+        raise
+    except Exception as e:
+        print(f"Error hashing password: {e}")
+
+async def verify_password_async(plain_password, hashed_password):
+    try:
+        return await hash_pool.run_async(_verify_in_worker, plain_password, hashed_password)
+    except HashPoolBusy:
+        raise
     except Exception as e:
         print(f"Error verifying password: {e}")
         return False
 
+async def verify_and_update_password_async(plain_password, hashed_password):
+    try:
+        return await hash_pool.run_async(_verify_and_update_in_worker, plain_password, hashed_password)
+    except HashPoolBusy:
+        raise
+    except Exception as e:
+        print(f"Error verifying password: {e}")
+        return False, None
+
 # Create JWT Token without expiration time.
 def create_access_token(data: dict):
+    from jose import jwt
+
     try:
         to_encode = data.copy()
         return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
@@ -32,20 +121,90 @@ def create_access_token(data: dict):
         return None
     
 def decode_access_token(token: str):
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    if token_cache.is_revoked(token):
+        return None
+    from jose import jwt, JWTError
+
     try:
         payload = jwt.decode(token, settings.JWT_SECRET, algorithms=settings.JWT_ALGORITHM)
+        token_cache.put(token, payload)
         return payload
     except JWTError:
         return None
+
+# Reject a token before it expires (logout, password change).
+def revoke_access_token(token: str):
+    from jose import jwt, JWTError
+
+    exp = None
+    try:
+        exp = jwt.get_unverified_claims(token).get("exp")
+    except JWTError:
+        pass
+    token_cache.revoke(token, exp)
     
+# Short-lived ticket proving the password step of a TOTP login passed.
+def create_preauth_ticket(user):
+    return create_access_token({
+        "sub": user.user_email,
+        "user_id": user.user_id,
+        "purpose": "preauth",
+        "jti": uuid.uuid4().hex,
+        "exp": datetime.utcnow() + timedelta(seconds=settings.PREAUTH_TICKET_TTL),
+    })
+
+# Link token that lets its holder choose a new password for one user.
+def create_reset_password_token(user_id: str, email: str, ttl: int = settings.RESET_PASSWORD_LINK_TTL):
+    return create_access_token({
+        "user_id": user_id,
+        "email": email,
+        "purpose": "reset_password",
+        "exp": datetime.utcnow() + timedelta(seconds=ttl),
+    })
+
+def decode_preauth_ticket(ticket: str):
+    claims = decode_access_token(ticket)
+    if not claims or claims.get("purpose") != "preauth":
+        return None
+    return claims
+
+used_otp_codes = UsedOtpCache(valid_window=1)
+preauth_otp_failures = FailedAttemptCounter()
+
+# Count a wrong OTP against a pre-auth ticket. The ticket skips the password
+# hash, so it only gets PREAUTH_MAX_OTP_ATTEMPTS guesses before it is revoked.
+# Returns True when the ticket was revoked.
+def record_preauth_otp_failure(ticket: str, claims: dict) -> bool:
+    expires_at = claims.get("exp") or time.time() + settings.PREAUTH_TICKET_TTL
+    failures = preauth_otp_failures.record_failure(claims.get("jti") or ticket, expires_at)
+    if failures >= settings.PREAUTH_MAX_OTP_ATTEMPTS:
+        revoke_access_token(ticket)
+        return True
+    return False
+
+# Verify a TOTP code once; a code that was already accepted is rejected.
+def verify_otp_once(user_id, secret_key, otp):
+    import pyotp
+
+    if not pyotp.TOTP(secret_key).verify(otp, valid_window=1):
+        return False
+    return used_otp_codes.mark_used(user_id, otp)
+
 def generate_qr_url(user_email, secret_key):
     # Implement QR code URL generation logic here
     return f"otpauth://totp/{user_email}?secret={secret_key}&issuer=SchoolManagementSystem"
 
 def generate_secret():
+    import pyotp
+
     return pyotp.random_base32()
 
 def verify_otp(secret_key, otp):
+    import pyotp
+
     totp = pyotp.TOTP(secret_key)
     return totp.verify(otp)
 
@@ -0,0 +1,163 @@
+# core/storage.py
+import asyncio
+import hashlib
+import io
+import mimetypes
+import os
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from config import settings
+
+# Bytes read from an upload per await; the whole file is never held in memory.
+CHUNK_SIZE = 256 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class StoredBlob:
+    key: str
+    url: str
+    size: int
+    content_type: str | None = None
+
+
+async def _iter_chunks(source):
+    """Yield chunks from an UploadFile (async read) or from bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        for start in range(0, len(source), CHUNK_SIZE):
+            yield bytes(source[start:start + CHUNK_SIZE])
+        return
+    while chunk := await source.read(CHUNK_SIZE):
+        yield chunk
+
+
+class BlobStore(ABC):
+    """Where uploaded files live. Implementations must not block the event loop."""
+
+    @abstractmethod
+    async def put(self, source, folder: str = "", content_type: str | None = None) -> StoredBlob:
+        """Store an UploadFile or bytes and return its key and public URL."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Return the stored content."""
+
+    @abstractmethod
+    async def url(self, key: str) -> str:
+        """Public URL of a stored key."""
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Content-addressed files on local disk: <root>/<folder>/<ab>/<sha256><ext>.
+    Uploads are streamed to a temp file while hashing, then renamed into
+    place, so identical files are stored once. Works offline.
+    """
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.realpath(self.root) + os.sep):
+            raise ValueError(f"Invalid blob key: {key}")
+        return path
+
+    async def put(self, source, folder: str = "", content_type: str | None = None) -> StoredBlob:
+        import aiofiles
+        import aiofiles.os
+
+        content_type = content_type or getattr(source, "content_type", None)
+        filename = getattr(source, "filename", None) or ""
+        extension = os.path.splitext(filename)[1].lower() or mimetypes.guess_extension(content_type or "") or ""
+
+        tmp_dir = os.path.join(self.root, ".tmp")
+        await aiofiles.os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, "wb") as out:
+                async for chunk in _iter_chunks(source):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    await out.write(chunk)
+
+            key = "/".join(part for part in (folder, digest.hexdigest()[:2], digest.hexdigest() + extension) if part)
+            final_path = self._path(key)
+            await aiofiles.os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            if await aiofiles.os.path.exists(final_path):
+                await aiofiles.os.remove(tmp_path)
+            else:
+                await aiofiles.os.replace(tmp_path, final_path)
+        except Exception:
+            if await aiofiles.os.path.exists(tmp_path):
+                await aiofiles.os.remove(tmp_path)
+            raise
+
+        return StoredBlob(key=key, url=await self.url(key), size=size, content_type=content_type)
+
+    async def get(self, key: str) -> bytes:
+        import aiofiles
+
+        async with aiofiles.open(self._path(key), "rb") as f:
+            return await f.read()
+
+    async def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+
+class CloudinaryBlobStore(BlobStore):
+    """Cloudinary uploads; the synchronous SDK runs on a worker thread."""
+
+    async def put(self, source, folder: str = "", content_type: str | None = None) -> StoredBlob:
+        import cloudinary.uploader
+
+        # UploadFile wraps a spooled temp file, which the SDK reads itself
+        file = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source.file
+        result = await asyncio.to_thread(
+            cloudinary.uploader.upload,
+            file,
+            folder=folder or None,
+            resource_type="auto",
+        )
+        return StoredBlob(
+            key=result["public_id"],
+            url=result["secure_url"],
+            size=result.get("bytes", 0),
+            content_type=content_type or getattr(source, "content_type", None),
+        )
+
+    async def get(self, key: str) -> bytes:
+        from urllib.request import urlopen
+
+        def _download():
+            with urlopen(self._build_url(key), timeout=30) as response:
+                return response.read()
+
+        return await asyncio.to_thread(_download)
+
+    async def url(self, key: str) -> str:
+        return self._build_url(key)
+
+    @staticmethod
+    def _build_url(key: str) -> str:
+        import cloudinary.utils
+
+        return cloudinary.utils.cloudinary_url(key, secure=True)[0]
+
+
+_blob_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """The configured store (BLOB_STORE_BACKEND), created once per process."""
+    global _blob_store
+    if _blob_store is None:
+        if settings.BLOB_STORE_BACKEND == "local":
+            _blob_store = LocalBlobStore(settings.BLOB_LOCAL_ROOT, f"{settings.BACKEND_URL}/blobs")
+        else:
+            _blob_store = CloudinaryBlobStore()
+    return _blob_store
@@ -0,0 +1,104 @@
+# core/tasks.py
+import signal
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+
+# task_name -> callable(**payload)
+_task_registry = {}
+
+
+def task(name: str):
+    """
+    Register a function as a background task handler. The function stays
+    callable directly; workers look it up by name. A handler signals
+    failure by raising, which schedules a retry.
+    """
+    def decorator(func):
+        _task_registry[name] = func
+        return func
+    return decorator
+
+
+def get_task_handler(name: str):
+    return _task_registry.get(name)
+
+
+class TaskWorker:
+    """
+    Polls the background_tasks table and runs due tasks on a bounded thread
+    pool. At most `concurrency` tasks run at once; failures are retried with
+    exponential backoff and dead-lettered after max_attempts.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = settings.TASK_WORKER_CONCURRENCY,
+        poll_interval: float = settings.TASK_POLL_INTERVAL,
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="task-worker")
+
+    def _free_slots(self) -> int:
+        free = 0
+        while self._slots.acquire(blocking=False):
+            free += 1
+        return free
+
+    def _execute(self, task_id: int, task_name: str, payload: dict):
+        from repositories.task_repository import TaskRepository
+
+        repo = TaskRepository()
+        try:
+            handler = get_task_handler(task_name)
+            if handler is None:
+                raise LookupError(f"No handler registered for task '{task_name}'")
+            handler(**payload)
+            repo.mark_done(task_id)
+        except Exception as e:
+            print(f"Task {task_id} ({task_name}) failed: {e}")
+            try:
+                repo.mark_failed(task_id, "".join(traceback.format_exception(e))[-4000:])
+            except Exception as db_error:
+                # Lease expiry will hand the task to a worker again
+                print(f"Could not record failure of task {task_id}: {db_error}")
+        finally:
+            repo.close()
+            self._slots.release()
+
+    def run_once(self) -> int:
+        """Claim as many due tasks as there are free slots. Returns how many started."""
+        from repositories.task_repository import TaskRepository
+
+        free = self._free_slots()
+        if not free:
+            return 0
+        claimed = []
+        repo = TaskRepository()
+        try:
+            claimed = repo.claim_due_tasks(free)
+        except Exception as e:
+            print(f"Error claiming background tasks: {e}")
+        finally:
+            repo.close()
+            for _ in range(free - len(claimed)):
+                self._slots.release()
+
+        for task_id, task_name, payload in claimed:
+            self._executor.submit(self._execute, task_id, task_name, payload)
+        return len(claimed)
+
+    def run(self):
+        """Block until SIGINT/SIGTERM, then let running tasks finish"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self._stop.set())
+        print(f"Task worker started with concurrency {self.concurrency}")
+        while not self._stop.is_set():
+            if not self.run_once():
+                self._stop.wait(self.poll_interval)
+        self._executor.shutdown(wait=True)
+        print("Task worker stopped")
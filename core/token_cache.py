@@ -0,0 +1,95 @@
+# core/token_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of JWT claims that already passed signature verification,
+    keyed by a SHA-256 digest of the token so raw tokens are not kept in
+    memory. An entry lives until the token's `exp` (capped at `max_ttl`
+    seconds). Revoked tokens are remembered until they expire so they are
+    rejected without re-verifying; the revocation list is not bounded by
+    `max_entries`, since forgetting a revocation would re-validate the token.
+    """
+
+    def __init__(self, max_entries: int, max_ttl: float):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()  # digest -> (claims, expires_at)
+        self._revoked = {}  # digest -> expires_at | None (never expires)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[0])
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: dict):
+        expires_at = time.time() + self.max_ttl
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        key = self._digest(token)
+        with self._lock:
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str):
+        """Drop a cached entry; the next decode verifies the token again."""
+        with self._lock:
+            self._entries.pop(self._digest(token), None)
+
+    def revoke(self, token: str, exp: float | None = None):
+        """Reject the token from now on, until `exp` when it expires anyway."""
+        key = self._digest(token)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._revoked[key] = exp
+            if len(self._revoked) > self.max_entries:
+                # Only revocations of tokens that expired anyway are dropped
+                now = time.time()
+                for expired in [k for k, expiry in self._revoked.items() if expiry is not None and expiry <= now]:
+                    del self._revoked[expired]
+
+    def is_revoked(self, token: str) -> bool:
+        key = self._digest(token)
+        with self._lock:
+            if key not in self._revoked:
+                return False
+            exp = self._revoked[key]
+            if exp is not None and exp <= time.time():
+                del self._revoked[key]
+                return False
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "revoked": len(self._revoked),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
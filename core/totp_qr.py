@@ -0,0 +1,101 @@
+# core/totp_qr.py
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from config import settings
+from core.security import create_access_token, decode_access_token
+
+
+class QrImageCache:
+    """
+    Content-addressed LRU of rendered QR images. The key is a digest of the
+    provisioning URI and the image format, so the secret itself is never
+    used as a key and each format of a secret is rendered only once per
+    process, when first requested.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (digest, image format) -> image bytes
+        self._lock = threading.Lock()
+
+    def get_or_render(self, content: str, render, image_format: str = "svg") -> tuple[str, bytes]:
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        key = (digest, image_format)
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+                return digest, image
+        image = render(content)
+        with self._lock:
+            self._entries[key] = image
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return digest, image
+
+
+qr_image_cache = QrImageCache()
+
+
+def totp_provisioning_uri(email: str, totp_secret: str) -> str:
+    import pyotp
+
+    return pyotp.TOTP(totp_secret).provisioning_uri(
+        name=email, issuer_name=settings.TOTP_ISSUER
+    )
+
+
+def render_qr_svg(content: str) -> bytes:
+    # qrcode is only needed when a QR image is actually requested
+    import qrcode
+    import qrcode.image.svg
+
+    image = qrcode.make(content, image_factory=qrcode.image.svg.SvgPathImage)
+    buf = io.BytesIO()
+    image.save(buf)
+    return buf.getvalue()
+
+
+def render_qr_png(content: str) -> bytes:
+    # Gmail and Outlook do not display SVG images, so emails embed the PNG
+    import qrcode
+
+    image = qrcode.make(content, box_size=6, border=2)
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+# image format -> (media type, renderer)
+QR_IMAGE_FORMATS = {
+    "svg": ("image/svg+xml", render_qr_svg),
+    "png": ("image/png", render_qr_png),
+}
+
+
+def get_totp_qr_image(email: str, totp_secret: str, image_format: str = "svg") -> tuple[str, bytes]:
+    """Returns (digest, image bytes) for the user's authenticator QR code."""
+    _, render = QR_IMAGE_FORMATS[image_format]
+    return qr_image_cache.get_or_render(totp_provisioning_uri(email, totp_secret), render, image_format)
+
+
+def build_totp_qr_link(user, image_format: str = "svg") -> str:
+    """Signed, expiring link to the user's QR image, safe to put in an email."""
+    token = create_access_token({
+        "sub": user.user_email,
+        "user_id": user.user_id,
+        "purpose": "totp_qr",
+        "exp": datetime.utcnow() + timedelta(seconds=settings.TOTP_QR_LINK_TTL),
+    })
+    link = f"{settings.BACKEND_URL}/principal/totp_qr?token={token}"
+    return link if image_format == "svg" else f"{link}&format={image_format}"
+
+
+def decode_totp_qr_token(token: str):
+    claims = decode_access_token(token)
+    if not claims or claims.get("purpose") != "totp_qr":
+        return None
+    return claims
@@ -1,14 +1,64 @@
+import random
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
 from config import settings
+from core.db_pool import instrument_engine, pool_options
+import core.collection_versions  # noqa: F401 -- writes bump the ETag versions of their collections
 
 #Load database url from config file instead of inserting using settings function
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True) #Create a new SQLAlchemy engine instance which connects to the database
+engine = create_engine(settings.DATABASE_URL, **pool_options(settings.DATABASE_URL)) #Create a new SQLAlchemy engine instance which connects to the database
+instrument_engine("primary", engine) #Pool metrics (GET /internal/metrics) and the DB_POOL_PRE_PING strategy
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) #SessionMaker instance used to create sessions read,insert,update,delete
 Base = declarative_base() #Function to create a base class for your ORM models
 
-# Dependency for routers
-def get_db():
+# -------------------------
+# Read replicas
+# -------------------------
+# GET / HEAD / OPTIONS read from a replica; everything else, and every
+# request of a client that wrote in the last READ_YOUR_WRITES_WINDOW
+# seconds (marked by a cookie), uses the primary. Without
+# DATABASE_REPLICA_URLS all sessions are primary sessions.
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+READ_PRIMARY_COOKIE = "db_read_primary"
+
+replica_engines = [
+    instrument_engine(f"replica_{number}", create_engine(url, **pool_options(url)))
+    for number, url in enumerate(settings.DATABASE_REPLICA_URLS, start=1)
+]
+_replica_sessionmakers = [
+    sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines
+]
+
+
+def ReplicaSessionLocal():
+    """Session on a random replica, or on the primary when none is configured"""
+    if not _replica_sessionmakers:
+        return SessionLocal()
+    return random.choice(_replica_sessionmakers)()
+
+
+def reads_from_replica(request: Request) -> bool:
+    return request.method in SAFE_METHODS and READ_PRIMARY_COOKIE not in request.cookies
+
+
+async def stick_to_primary_after_writes(request: Request, call_next):
+    """Middleware: after a successful write, send this client's reads to the primary for a while"""
+    response = await call_next(request)
+    if replica_engines and request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            READ_PRIMARY_COOKIE,
+            "1",
+            max_age=settings.READ_YOUR_WRITES_WINDOW,
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+# Dependencies for routers
+def get_writer_db():
     db = SessionLocal()
     try:
         yield db
@@ -16,10 +66,120 @@ def get_db():
         db.close()
 
 
+def get_reader_db():
+    db = ReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_db(request: Request):
+    """Primary or replica session, routed by HTTP method"""
+    db = ReplicaSessionLocal() if reads_from_replica(request) else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# -------------------------
+# Async engine
+# -------------------------
+# Sync driver -> asyncio driver for the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+_async_engine = None
+_async_sessionmaker = None
+_async_replica_sessionmakers = []
+
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL rewritten for the asyncio driver of the same database"""
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def get_async_engine():
+    """
+    Built on first use, so the async driver (aiomysql / aiosqlite) is only
+    imported by processes that serve async routes.
+    """
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **pool_options(url, async_engine=True))
+        instrument_engine("primary_async", _async_engine.sync_engine)
+        # expire_on_commit=False: attributes stay readable after commit without an implicit (sync) refresh
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+
+        for number, replica_url in enumerate(settings.DATABASE_REPLICA_URLS, start=1):
+            replica_url = async_database_url(replica_url)
+            replica = create_async_engine(replica_url, **pool_options(replica_url, async_engine=True))
+            instrument_engine(f"replica_{number}_async", replica.sync_engine)
+            _async_replica_sessionmakers.append(
+                async_sessionmaker(replica, expire_on_commit=False, autoflush=False)
+            )
+    return _async_engine
+
+
+def get_async_replica_engines() -> list:
+    get_async_engine()
+    return [maker.kw["bind"] for maker in _async_replica_sessionmakers]
+
+
+def AsyncSessionLocal():
+    get_async_engine()
+    return _async_sessionmaker()
+
+
+def AsyncReplicaSessionLocal():
+    get_async_engine()
+    if not _async_replica_sessionmakers:
+        return _async_sessionmaker()
+    return random.choice(_async_replica_sessionmakers)()
+
+
+# Dependencies for async routers
+async def get_async_writer_db():
+    db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_reader_db():
+    db = AsyncReplicaSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+async def get_async_db(request: Request):
+    """Primary or replica session, routed by HTTP method"""
+    db = AsyncReplicaSessionLocal() if reads_from_replica(request) else AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 """
 create_engine is used to create a connection to your database. It’s like telling SQLAlchemy: “Here is the database I want to use.
 sessionmaker: A factory for creating database sessions. A session is how you talk to the database (query, insert, update, delete).
 declarative_base: A function that gives a base class for your ORM models (tables). All your models inherit from this base class.
-pool_pre_ping=True ensures that SQLAlchemy checks if a database connection is alive before using it, avoiding errors from stale or disconnected connections.
+pool_options() sizes the pool from Settings (DB_POOL_*). DB_POOL_PRE_PING="idle" only checks connections that sat unused for a while, instead of a round trip on every checkout.
 
 """
\ No newline at end of file
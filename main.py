@@ -1,23 +1,54 @@
-from fastapi import FastAPI
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from config import settings
-from database import Base, engine
+from database import engine, get_async_engine, replica_engines, get_async_replica_engines, stick_to_primary_after_writes
+from core.db_pool import warm_up_pool, warm_up_async_pool
+from core.hash_pool import hash_pool
+from core.image_pipeline import shutdown_image_pipeline
+from core.identity_cache import start_identity_lookup_counter
+from core.conditional import NotModified, add_validator_headers, not_modified_handler
 from controllers.principal_controller import principalController 
+from controllers.calendar_controller import calendarController
+from controllers.internal_controller import internalController
 # from controllers.student_controller import studentController
 # from controllers.teacher_controller import teacherController
 
 
-# Base = Function to create a base class for your ORM models
-# engine = Create a new SQLAlchemy engine instance which connects to the database
-# Create tables
-Base.metadata.create_all(bind=engine)
+# The schema is managed by migrations: run `alembic upgrade head` before starting
+
+async def warm_up_database_pools():
+    # Connect before the first requests arrive; a failure here is retried per request
+    try:
+        for sync_engine in [engine, *replica_engines]:
+            await run_in_threadpool(warm_up_pool, sync_engine)
+        for async_engine in [get_async_engine(), *get_async_replica_engines()]:
+            await warm_up_async_pool(async_engine)
+    except Exception as e:
+        print(f"Error warming up database pools: {e}")
+
+def shutdown_process_pools():
+    hash_pool.shutdown()
+    shutdown_image_pipeline()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up_database_pools()
+    try:
+        yield
+    finally:
+        shutdown_process_pools()
 
 app = FastAPI(
     title="School Management System - Admin API",
     description="Admin login with JWT and TOTP",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -29,7 +60,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ETag / Last-Modified for conditional read endpoints
+app.add_exception_handler(NotModified, not_modified_handler)
+app.middleware("http")(add_validator_headers)
+
+# Reads go to replicas except right after this client wrote
+app.middleware("http")(stick_to_primary_after_writes)
+
+# Expose how many identity lookups hit the database for this request (0 on a cache hit)
+@app.middleware("http")
+async def count_identity_lookups(request: Request, call_next):
+    counter = start_identity_lookup_counter()
+    response = await call_next(request)
+    response.headers["X-Identity-DB-Lookups"] = str(counter[0])
+    return response
+
+# Local blob store files are served by the app itself
+if settings.BLOB_STORE_BACKEND == "local":
+    os.makedirs(settings.BLOB_LOCAL_ROOT, exist_ok=True)
+    app.mount("/blobs", StaticFiles(directory=settings.BLOB_LOCAL_ROOT), name="blobs")
+
 # Register admin router
 app.include_router(principalController)
+app.include_router(calendarController)
+app.include_router(internalController)
 # app.include_router(studentController)
 # app.include_router(teacherController)
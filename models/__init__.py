@@ -4,7 +4,9 @@ Base = declarative_base()
 
 from .user import User  # noqa: E402 -- Base is defined above to avoid circular imports
 from .student import Student  # noqa: E402 -- Base is defined above to avoid circular imports
-from .teacher import Teacher  # noqa: E402 -- Base is defined above to avoid circular imports
+from .teacher import Teacher, TeacherClass  # noqa: E402 -- Base is defined above to avoid circular imports
 from .principal import Principal  # noqa: E402 -- Base is defined above to avoid circular imports
+from .task import BackgroundTask  # noqa: E402 -- Base is defined above to avoid circular imports
+from .collection_version import CollectionVersion  # noqa: E402 -- Base is defined above to avoid circular imports
 
-__all__ = ["Base", "User", "Student", "Teacher", "Principal"]
+__all__ = ["Base", "User", "Student", "Teacher", "TeacherClass", "Principal", "BackgroundTask", "CollectionVersion"]
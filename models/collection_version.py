@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, BigInteger, DateTime
+from models import Base
+
+
+class CollectionVersion(Base):
+    """
+    Change counter per read collection, bumped in the same transaction as
+    every write to it (core/collection_versions.py). Conditional GETs read
+    one row by primary key instead of aggregating the collection.
+    """
+    __tablename__ = "collection_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    changed_at = Column(DateTime)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Date, Time
+from sqlalchemy import Column, String, Integer, ForeignKey, Date, Time, Index
 from sqlalchemy.orm import relationship
 from models import Base
 
@@ -14,6 +14,11 @@ class ExamTable(Base):
     # Relationship to ExamSubjectsTable
     exam_info = relationship("ExamSubjectsTable", back_populates="exam_details", cascade="all, delete-orphan")
 
+    # Exam schedule of a class
+    __table_args__ = (
+        Index("ix_exam_table_class_name", "class_name"),
+    )
+
 # Exam subjects table
 class ExamSubjectsTable(Base):
     __tablename__ = 'exam_subjects_table'
@@ -28,3 +33,8 @@ class ExamSubjectsTable(Base):
 
     # Relationship back to ExamTable
     exam_details = relationship("ExamTable", back_populates="exam_info")
+
+    # Join from exam_table, ordered by date
+    __table_args__ = (
+        Index("ix_exam_subjects_exam_code_exam_date", "exam_code", "exam_date"),
+    )
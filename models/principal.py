@@ -9,7 +9,8 @@ class Principal(Base):
     user_id = Column(
         String(100),
         ForeignKey("users.user_id", ondelete="CASCADE", onupdate="CASCADE"),
-        nullable=False
+        nullable=False,
+        index=True,  # profile reads and the identity lookup join on it
     )
     principal_name = Column(String(100), nullable=False)
     principal_email = Column(String(100), unique=True, nullable=False)
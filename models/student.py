@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum, Integer, ForeignKey, Date, Text
+from sqlalchemy import Column, String, Enum, Integer, ForeignKey, Date, Text, Index, JSON
 from sqlalchemy.orm import relationship
 from models import Base
 import datetime
@@ -14,6 +14,7 @@ class Student(Base):
     student_name = Column(String(50), nullable=False)
     student_email = Column(String(100), nullable=False, unique=True)
     student_image_url = Column(Text)
+    student_image_urls = Column(JSON)   # {"thumb" | "medium" | "large": {"key": blob key, "url": url}}
     student_class_name = Column(String(20), nullable=False)   # FIXED — removed reserved word alias
     student_gender = Column(Enum("Male", "Female", "Other"))
     student_date_of_birth = Column(Date)
@@ -32,6 +33,12 @@ class Student(Base):
     # Relationship to Attendance
     attendances = relationship("StudentsAttendance",back_populates="student",cascade="all, delete")
 
+    # Keyset pagination filters: class + cursor, admission date range
+    __table_args__ = (
+        Index("ix_students_class_name_user_id", "student_class_name", "user_id"),
+        Index("ix_students_admission_date", "student_admission_date"),
+    )
+
 
 # --------------------------------------
 # ATTENDANCE STATUS ENUM
@@ -68,3 +75,8 @@ class StudentsAttendance(Base):
 
     # Relationship to Student
     student = relationship("Student", back_populates="attendances")
+
+    # Whole-day reads: the primary key leads with user_id, this one with the date
+    __table_args__ = (
+        Index("ix_students_attendance_date_user_id", "attendance_date", "user_id"),
+    )
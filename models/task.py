@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Enum, Integer, Text, DateTime, TIMESTAMP, Index, func
+from models import Base
+import datetime
+
+
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+
+    task_id = Column(Integer, primary_key=True, autoincrement=True)
+    task_name = Column(String(100), nullable=False)
+    payload = Column(Text, nullable=False)  # JSON encoded keyword arguments
+    status = Column(
+        Enum("Queued", "Running", "Done", "Dead"), nullable=False, default="Queued"
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    locked_at = Column(DateTime)
+    last_error = Column(Text)
+
+    created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
+    updated_at = Column(
+        TIMESTAMP,
+        server_default=func.current_timestamp(),
+        onupdate=func.current_timestamp(),
+    )
+
+    # Worker poll: due tasks by status
+    __table_args__ = (
+        Index("ix_background_tasks_status_run_after", "status", "run_after"),
+    )
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, Enum, Integer, ForeignKey, Text, DECIMAL
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Enum, Integer, ForeignKey, Text, DECIMAL, Index, delete, event, insert, inspect
+from sqlalchemy.orm import Session, relationship
 from models import Base
 
 
@@ -24,7 +24,63 @@ class Teacher(Base):
     teacher_mobile_number = Column(String(15))
     teacher_address = Column(Text)
     teacher_bank_account_id = Column(String(30))
-    teacher_class_ids = Column(String(100))
+    teacher_class_ids = Column(String(100))   # comma separated; mirrored row per class in teacher_classes
 
     # Relation back to User
     user = relationship("User", back_populates="teacher")
+
+
+# --------------------------------------
+# TEACHER CLASSES
+# --------------------------------------
+class TeacherClass(Base):
+    """
+    One row per class in Teacher.teacher_class_ids, so "teachers of a class"
+    is an index lookup on the (class_name, teacher_id) primary key instead
+    of a LIKE over the comma separated column.
+    """
+    __tablename__ = "teacher_classes"
+
+    class_name = Column(String(20), primary_key=True)
+    teacher_id = Column(
+        String(100),
+        ForeignKey("teachers.user_id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True,
+    )
+
+    __table_args__ = (
+        Index("ix_teacher_classes_teacher_id", "teacher_id"),
+    )
+
+
+def split_class_ids(value: str | None) -> list[str]:
+    return list(dict.fromkeys(part.strip() for part in (value or "").split(",") if part.strip()))
+
+
+# Keep teacher_classes in step with teacher_class_ids on every ORM write
+# (sync sessions and the sessions behind AsyncSession alike).
+@event.listens_for(Session, "before_flush")
+def _collect_teacher_class_changes(session, flush_context, instances):
+    changed = {
+        teacher.user_id: teacher.teacher_class_ids
+        for teacher in (*session.new, *session.dirty)
+        if isinstance(teacher, Teacher) and inspect(teacher).attrs.teacher_class_ids.history.has_changes()
+    }
+    if changed:
+        session.info.setdefault("teacher_class_changes", {}).update(changed)
+
+
+@event.listens_for(Session, "after_flush")
+def _write_teacher_classes(session, flush_context):
+    changed = session.info.pop("teacher_class_changes", None)
+    if not changed:
+        return
+    connection = session.connection()
+    connection.execute(delete(TeacherClass).where(TeacherClass.teacher_id.in_(list(changed))))
+    rows = [
+        {"class_name": class_name, "teacher_id": teacher_id}
+        for teacher_id, class_ids in changed.items()
+        for class_name in split_class_ids(class_ids)
+    ]
+    if rows:
+        connection.execute(insert(TeacherClass), rows)
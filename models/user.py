@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Enum, TIMESTAMP, func
+from sqlalchemy import Column, String, Enum, Integer, TIMESTAMP, func
 from sqlalchemy.orm import relationship
 from models import Base
 
@@ -10,8 +10,10 @@ class User(Base):
     user_name = Column(String(40), nullable=False)
     user_email = Column(String(70), nullable=False, unique=True, index=True)
     user_password = Column(String(255), nullable=False)
-    user_role = Column(Enum("Principal", "Teacher", "Student"), nullable=False)
+    user_role = Column(Enum("Principal", "Teacher", "Student"), nullable=False, index=True)
     totp_secret = Column(String(32), nullable=True)
+    # Part of every calendar feed URL issued to the user; bumping it revokes them all
+    calendar_feed_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     created_at = Column(TIMESTAMP, server_default=func.current_timestamp())
     updated_at = Column(
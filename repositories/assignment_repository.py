@@ -0,0 +1,261 @@
+import bisect
+import datetime
+import fcntl
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from config import settings
+
+
+class AssignmentLog:
+    """
+    Assignments stored as an append-only JSON Lines log.
+
+    Every change appends one fsync'd record ({"op": "put" | "delete", ...}),
+    so writes are O(1) and never rewrite earlier data. Reads are served from
+    in-memory indexes by id, class and due date. Other processes appending
+    to the same file are picked up by reading only the new tail, and the
+    log is compacted once most of its records are superseded.
+
+    Writers serialise on an exclusive flock of the log file. The legacy
+    JSON file is imported once, under that lock, and then renamed to
+    <legacy>.imported.
+    """
+
+    def __init__(self, path: str, legacy_path: str | None = None, compact_min_records: int = 1000):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_min_records = compact_min_records
+        self._lock = threading.RLock()
+        self._reset_indexes()
+        self._inode = None
+        self._offset = 0
+        with self._lock:
+            self._import_legacy()
+            self._sync()
+
+    # -------------------------
+    # Indexes
+    # -------------------------
+    def _reset_indexes(self):
+        self._by_id = {}
+        self._by_class = defaultdict(set)
+        self._by_due = []  # sorted [(due_date, assignment_id)]
+        self._records = 0
+
+    @staticmethod
+    def _due_key(assignment: dict) -> str | None:
+        due = assignment.get("due_date")
+        if not due:
+            return None
+        # ISO dates (optionally with a time part) sort correctly as strings
+        return str(due)[:10]
+
+    def _index_put(self, assignment: dict):
+        self._index_remove(assignment["assignment_id"])
+        assignment_id = assignment["assignment_id"]
+        self._by_id[assignment_id] = assignment
+        if assignment.get("class_name"):
+            self._by_class[assignment["class_name"]].add(assignment_id)
+        due = self._due_key(assignment)
+        if due:
+            bisect.insort(self._by_due, (due, assignment_id))
+
+    def _index_remove(self, assignment_id: str):
+        old = self._by_id.pop(assignment_id, None)
+        if not old:
+            return
+        if old.get("class_name"):
+            self._by_class[old["class_name"]].discard(assignment_id)
+        due = self._due_key(old)
+        if due:
+            pos = bisect.bisect_left(self._by_due, (due, assignment_id))
+            if pos < len(self._by_due) and self._by_due[pos] == (due, assignment_id):
+                self._by_due.pop(pos)
+
+    def _apply(self, record: dict):
+        self._records += 1
+        if record["op"] == "put":
+            self._index_put(record["data"])
+        elif record["op"] == "delete":
+            self._index_remove(record["assignment_id"])
+
+    # -------------------------
+    # File handling
+    # -------------------------
+    def _sync(self):
+        """Bring the indexes up to date with the file: full reload after a compaction, else read the new tail."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._inode:
+            self._reset_indexes()
+            self._inode, self._offset = stat.st_ino, 0
+        if stat.st_size <= self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-append; read it next time
+                self._offset += len(line)
+                if line.strip():
+                    self._apply(json.loads(line))
+
+    @contextmanager
+    def _locked_log(self):
+        """
+        The log opened for append under an exclusive flock. A compaction may
+        swap in a new file while we wait for the lock; the lock then guards
+        the unlinked inode, so reopen the path and lock again.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        while True:
+            with open(self.path, "ab") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    try:
+                        current = os.stat(self.path).st_ino
+                    except FileNotFoundError:
+                        current = None
+                    if current == os.fstat(f.fileno()).st_ino:
+                        yield f
+                        return
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _write_records(f, records: list[dict]):
+        f.write(b"".join((json.dumps(record, default=str) + "\n").encode() for record in records))
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _append(self, build_record) -> dict | None:
+        """
+        Append the record `build_record()` returns, or nothing if it returns
+        None. It is called under the lock, after applying what other
+        processes appended, so it sees the current state of every assignment.
+        """
+        with self._locked_log() as f:
+            self._sync()
+            record = build_record()
+            if record is not None:
+                self._write_records(f, [record])
+        self._sync()
+        return record
+
+    def _import_legacy(self):
+        """One-time import of the old whole-file JSON list."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        with self._locked_log() as f:
+            # Another process may have imported it while we waited for the lock
+            if not os.path.exists(self.legacy_path) or os.fstat(f.fileno()).st_size:
+                return
+            with open(self.legacy_path) as legacy:
+                content = legacy.read().strip()
+            self._write_records(f, [
+                {"op": "put", "data": {**assignment, "assignment_id": assignment.get("assignment_id") or uuid.uuid4().hex}}
+                for assignment in (json.loads(content) if content else [])
+            ])
+            # Never import again, even once compaction has emptied the log
+            os.replace(self.legacy_path, f"{self.legacy_path}.imported")
+
+    def _maybe_compact(self):
+        if self._records >= self.compact_min_records and len(self._by_id) * 2 < self._records:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with only live assignments and atomically swap it in."""
+        with self._lock:
+            with self._locked_log():
+                self._sync()
+                tmp_path = f"{self.path}.{uuid.uuid4().hex}.tmp"
+                with open(tmp_path, "wb") as out:
+                    self._write_records(out, [{"op": "put", "data": assignment} for assignment in self._by_id.values()])
+                os.replace(tmp_path, self.path)
+                dir_fd = os.open(os.path.dirname(self.path) or ".", os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+            self._sync()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def add(self, data: dict) -> dict:
+        with self._lock:
+            assignment = {**data, "assignment_id": uuid.uuid4().hex}
+            self._append(lambda: {"op": "put", "data": assignment})
+            return assignment
+
+    def update(self, assignment_id: str, changes: dict) -> dict | None:
+        def merged():
+            current = self._by_id.get(assignment_id)
+            if current is None:
+                return None
+            return {"op": "put", "data": {**current, **changes, "assignment_id": assignment_id}}
+
+        with self._lock:
+            record = self._append(merged)
+            if record is None:
+                return None
+            self._maybe_compact()
+            return record["data"]
+
+    def delete(self, assignment_id: str) -> bool:
+        def deletion():
+            if assignment_id not in self._by_id:
+                return None
+            return {"op": "delete", "assignment_id": assignment_id}
+
+        with self._lock:
+            if self._append(deletion) is None:
+                return False
+            self._maybe_compact()
+            return True
+
+    def get(self, assignment_id: str) -> dict | None:
+        with self._lock:
+            self._sync()
+            return self._by_id.get(assignment_id)
+
+    def list_all(self, class_name: str | None = None) -> list[dict]:
+        with self._lock:
+            self._sync()
+            if class_name:
+                return [self._by_id[i] for i in self._by_class.get(class_name, ())]
+            return list(self._by_id.values())
+
+    def due_between(self, start: datetime.date, end: datetime.date, class_name: str | None = None) -> list[dict]:
+        """Assignments due in [start, end], ordered by due date."""
+        with self._lock:
+            self._sync()
+            lo = bisect.bisect_left(self._by_due, (start.isoformat(), ""))
+            hi = bisect.bisect_right(self._by_due, (end.isoformat(), "\uffff"))
+            class_ids = self._by_class.get(class_name, set()) if class_name else None
+            return [
+                self._by_id[assignment_id]
+                for _, assignment_id in self._by_due[lo:hi]
+                if class_ids is None or assignment_id in class_ids
+            ]
+
+
+_assignment_log: AssignmentLog | None = None
+_assignment_log_lock = threading.Lock()
+
+
+def get_assignment_log() -> AssignmentLog:
+    global _assignment_log
+    with _assignment_log_lock:
+        if _assignment_log is None:
+            _assignment_log = AssignmentLog(
+                settings.ASSIGNMENTS_LOG_PATH,
+                legacy_path=settings.ASSIGNMENTS_LEGACY_PATH,
+            )
+        return _assignment_log
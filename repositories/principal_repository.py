@@ -1,8 +1,140 @@
-from sqlalchemy.orm import Session
-from database import SessionLocal
-from models import User, Principal, Teacher, Student
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+from database import SessionLocal, AsyncSessionLocal, AsyncReplicaSessionLocal
+from core.identity_cache import identity_cache
+from schemas.records import StudentRecord, TeacherRecord, record_fields, teacher_values
+from models import User, Principal, Teacher, TeacherClass, Student, CollectionVersion
+from datetime import date
 import uuid
 
+# Record field -> model attribute, where the names differ
+TEACHER_FIELD_ATTRS = {"teacher_user_name": "teacher_name"}
+
+
+# -------------------------
+# Statements shared by the sync and async repositories
+# -------------------------
+def _record_columns(model, names, renames: dict | None = None) -> list:
+    """Columns for the given record fields, labelled with the field names."""
+    renames = renames or {}
+    return [getattr(model, renames.get(name, name)).label(name) for name in names]
+
+
+def _principal_user_stmt(**filters):
+    return select(User).where(User.user_role == "Principal").filter_by(**filters)
+
+
+def _user_with_principal_stmt(email: str):
+    return select(User).options(joinedload(User.principal)).where(User.user_email == email)
+
+
+def _principal_fields_stmt(user_id: str, fields: tuple[str, ...]):
+    return select(*_record_columns(Principal, fields)).where(Principal.user_id == user_id)
+
+
+def _teachers_page_stmt(limit, after_user_id=None, class_name=None, gender=None, fields=None):
+    names = fields or record_fields(TeacherRecord)
+    stmt = select(*_record_columns(Teacher, names, TEACHER_FIELD_ATTRS))
+    if after_user_id:
+        stmt = stmt.where(Teacher.user_id > after_user_id)
+    if class_name:
+        # Exact class match through the (class_name, teacher_id) primary key of teacher_classes
+        stmt = stmt.join(TeacherClass, TeacherClass.teacher_id == Teacher.user_id).where(
+            TeacherClass.class_name == class_name
+        )
+    if gender:
+        stmt = stmt.where(Teacher.teacher_gender == gender)
+    return stmt.order_by(Teacher.user_id).limit(limit + 1)
+
+
+def _students_page_stmt(
+    limit, after_user_id=None, class_name=None, gender=None, admitted_from=None, admitted_to=None, fields=None
+):
+    stmt = select(*_record_columns(Student, fields or record_fields(StudentRecord)))
+    if after_user_id:
+        stmt = stmt.where(Student.user_id > after_user_id)
+    if class_name:
+        stmt = stmt.where(Student.student_class_name == class_name)
+    if gender:
+        stmt = stmt.where(Student.student_gender == gender)
+    if admitted_from:
+        stmt = stmt.where(Student.student_admission_date >= admitted_from)
+    if admitted_to:
+        stmt = stmt.where(Student.student_admission_date <= admitted_to)
+    return stmt.order_by(Student.user_id).limit(limit + 1)
+
+
+def _collection_version_stmt(collection: str):
+    return select(CollectionVersion.version, CollectionVersion.changed_at).where(CollectionVersion.name == collection)
+
+
+def _version_tuple(row) -> tuple:
+    # (change counter, time of the last change); (0, None) before the first write
+    return tuple(row) if row else (0, None)
+
+
+def _split_page(rows: list, limit: int) -> tuple[list, str | None]:
+    # One extra row was fetched to learn whether another page exists
+    if len(rows) > limit:
+        return rows[:limit], rows[limit - 1].user_id
+    return rows, None
+
+
+def _teachers_page(rows: list, limit: int, fields) -> tuple[list, str | None]:
+    rows, next_cursor = _split_page(rows, limit)
+    if fields:
+        return [teacher_values(dict(row._mapping)) for row in rows], next_cursor
+    return [TeacherRecord.from_row(row) for row in rows], next_cursor
+
+
+def _students_page(rows: list, limit: int, fields) -> tuple[list, str | None]:
+    rows, next_cursor = _split_page(rows, limit)
+    if fields:
+        return [dict(row._mapping) for row in rows], next_cursor
+    return [StudentRecord(*row) for row in rows], next_cursor
+
+
+def _new_user(user_name, user_email, hashed_password, user_role, user_totp_secret) -> User:
+    return User(
+        user_id=str(uuid.uuid4()),
+        user_name=user_name,
+        user_email=user_email,
+        user_password=hashed_password,
+        user_role=user_role,
+        totp_secret=user_totp_secret,
+    )
+
+
+def _new_teacher(user: User) -> Teacher:
+    return Teacher(
+        user_id=user.user_id,
+        teacher_name=user.user_name,
+        teacher_email=user.user_email,
+    )
+
+
+def _new_principal(user: User) -> Principal:
+    return Principal(
+        user_id=user.user_id,
+        principal_name=user.user_name,
+        principal_email=user.user_email,
+        principal_hire_date=date.today(),
+    )
+
+
+def _new_student(user: User, student_class: str | None = None) -> Student:
+    return Student(
+        user_id=user.user_id,
+        student_name=user.user_name,
+        student_email=user.user_email,
+        student_class_name=student_class,  # store class in DB
+    )
+
+
+def _apply_profile_update(principal: Principal, payload):
+    for field, value in payload.dict(exclude_unset=True).items():
+        setattr(principal, field, value)
+
 
 class PrincipalRepository:
     def __init__(self, db: Session = None):
@@ -10,77 +142,59 @@ class PrincipalRepository:
         self._own_session = db is None
 
     def get_principal_by_email(self, email: str) -> User | None:
-        return (
-            self.db.query(User)
-            .filter(User.user_email == email, User.user_role == "principal")
-            .first()
-        )
+        return self.db.scalars(_principal_user_stmt(user_email=email)).first()
 
     def update_password(self, user_id: str, hashed_password: str):
         try:
-            user = (
-                self.db.query(User)
-                .filter(User.user_id == user_id, User.user_role == "principal")
-                .first()
-            )
+            user = self.db.get(User, user_id)
             if not user:
                 return None
             user.user_password = hashed_password
             self.db.commit()
             self.db.refresh(user)
+            identity_cache.invalidate(user_id=user_id)
             return user
         except Exception as e:
             print("DB Error update_password:", e)
             return None
 
+    def get_user_with_principal_by_email(self, email: str) -> User | None:
+        """User row plus its principal profile in one round trip"""
+        return self.db.scalars(_user_with_principal_stmt(email)).first()
+
     def get_principal_by_user_id(self, user_id: str) -> Principal | None:
         return self.db.query(Principal).filter(Principal.user_id == user_id).first()
 
+    def get_principal_fields(self, user_id: str, fields: tuple[str, ...]) -> dict | None:
+        """Only the requested principal columns, as a dict"""
+        row = self.db.execute(_principal_fields_stmt(user_id, fields)).first()
+        return dict(row._mapping) if row else None
+
     def add_user(
         self, user_name, user_email, hashed_password, user_role, user_totp_secret
     ):
-        user = User(
-            user_id=str(uuid.uuid4()),
-            user_name=user_name,
-            user_email=user_email,
-            user_password=hashed_password,
-            user_role=user_role,
-            totp_secret=user_totp_secret,
-        )
+        user = _new_user(user_name, user_email, hashed_password, user_role, user_totp_secret)
         self.db.add(user)
         self.db.commit()
         self.db.refresh(user)
         return user
 
     def add_teacher(self, user: User) -> Teacher:
-        teacher = Teacher(
-            user_id=user.user_id,
-            teacher_name=user.user_name,
-            teacher_email=user.user_email,
-        )
+        teacher = _new_teacher(user)
         self.db.add(teacher)
         self.db.commit()
         self.db.refresh(teacher)
         return teacher
 
     def add_principal(self, user: User) -> Principal:
-        principal = Principal(
-            user_id=user.user_id,
-            principal_name=user.user_name,
-            principal_email=user.user_email,
-        )
+        principal = _new_principal(user)
         self.db.add(principal)
         self.db.commit()
         self.db.refresh(principal)
         return principal
 
     def add_student(self, user: User, student_class: str | None = None) -> Student:
-        student = Student(
-            User_id=user.user_id,
-            student_name=user.user_name,
-            student_email=user.user_email,
-            student_class=student_class,  # store class in DB
-        )
+        student = _new_student(user, student_class)
         self.db.add(student)
         self.db.commit()
         self.db.refresh(student)
@@ -92,20 +206,206 @@ class PrincipalRepository:
     def get_all_students(self) -> list[Student]:
         return self.db.query(Student).all()
 
-    def update_principal_profile(self, payload) -> Principal | None:
+    def get_teachers_page(
+        self,
+        limit: int,
+        after_user_id: str | None = None,
+        class_name: str | None = None,
+        gender: str | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[list, str | None]:
+        """
+        Keyset page of teachers ordered by user_id. Returns (teachers, next_cursor).
+        Only the response columns are selected and no ORM objects are built;
+        with `fields` only those columns are read and rows come back as dicts.
+        """
+        stmt = _teachers_page_stmt(limit, after_user_id, class_name, gender, fields)
+        return _teachers_page(self.db.execute(stmt).all(), limit, fields)
+
+    def get_students_page(
+        self,
+        limit: int,
+        after_user_id: str | None = None,
+        class_name: str | None = None,
+        gender: str | None = None,
+        admitted_from: date | None = None,
+        admitted_to: date | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[list, str | None]:
+        """
+        Keyset page of students ordered by user_id. Returns (students, next_cursor).
+        Only the response columns are selected and no ORM objects are built;
+        with `fields` only those columns are read and rows come back as dicts.
+        """
+        stmt = _students_page_stmt(limit, after_user_id, class_name, gender, admitted_from, admitted_to, fields)
+        return _students_page(self.db.execute(stmt).all(), limit, fields)
+
+    def get_collection_version(self, collection: str) -> tuple:
+        """
+        Cheap version of what a read endpoint returns, computed before any rows are loaded:
+        (change counter, last change time), one primary key lookup. Every write to the
+        collection's table bumps the counter (core/collection_versions.py).
+        """
+        return _version_tuple(self.db.execute(_collection_version_stmt(collection)).first())
+
+    def stream_students(self, columns: list[str], batch_size: int = 1000):
+        """
+        Yield student rows as mappings of the requested columns.
+        yield_per turns on a server-side cursor, so only one batch is held in memory.
+        """
+        stmt = (
+            select(*(getattr(Student, column) for column in columns))
+            .order_by(Student.user_id)
+            .execution_options(yield_per=batch_size)
+        )
+        for row in self.db.execute(stmt):
+            yield row._mapping
+
+    def update_principal_profile(self, user_id: str, payload) -> Principal | None:
         principal = (
             self.db.query(Principal)
-            .filter(Principal.user_id == payload.user_id)
+            .filter(Principal.user_id == user_id)
             .first()
         )
         if not principal:
             return None
-        for field, value in payload.dict(exclude_unset=True).items():
-            setattr(principal, field, value)
+        _apply_profile_update(principal, payload)
         self.db.commit()
         self.db.refresh(principal)
+        identity_cache.invalidate(user_id=user_id)
         return principal
 
     def close(self):
         if self._own_session:
             self.db.close()
+
+
+class AsyncPrincipalRepository:
+    """
+    PrincipalRepository on an AsyncSession. Same statements, but every
+    query awaits the async driver, so a waiting request holds no thread.
+    """
+
+    def __init__(self, db=None, read_only: bool = False):
+        # read_only: an owned session goes to a replica (exports)
+        self.db = db or (AsyncReplicaSessionLocal() if read_only else AsyncSessionLocal())
+        self._own_session = db is None
+
+    async def get_principal_by_email(self, email: str) -> User | None:
+        return (await self.db.scalars(_principal_user_stmt(user_email=email))).first()
+
+    async def update_password(self, user_id: str, hashed_password: str):
+        try:
+            user = await self.db.get(User, user_id)
+            if not user:
+                return None
+            user.user_password = hashed_password
+            await self.db.commit()
+            identity_cache.invalidate(user_id=user_id)
+            return user
+        except Exception as e:
+            print("DB Error update_password:", e)
+            return None
+
+    async def get_user_with_principal_by_email(self, email: str) -> User | None:
+        """User row plus its principal profile in one round trip"""
+        return (await self.db.scalars(_user_with_principal_stmt(email))).first()
+
+    async def get_principal_by_user_id(self, user_id: str) -> Principal | None:
+        return (await self.db.scalars(select(Principal).where(Principal.user_id == user_id))).first()
+
+    async def get_principal_fields(self, user_id: str, fields: tuple[str, ...]) -> dict | None:
+        """Only the requested principal columns, as a dict"""
+        row = (await self.db.execute(_principal_fields_stmt(user_id, fields))).first()
+        return dict(row._mapping) if row else None
+
+    def stage_user_with_role(
+        self, user_name, user_email, hashed_password, user_role, user_totp_secret, student_class=None
+    ) -> User:
+        """
+        Add a user and its teacher / principal / student row to the session
+        without committing, so further writes (the welcome email task) go
+        into the same transaction. Finish with commit_new_user().
+        """
+        user = _new_user(user_name, user_email, hashed_password, user_role, user_totp_secret)
+        role = user_role.lower()
+        self.db.add(user)
+        if role == "teacher":
+            self.db.add(_new_teacher(user))
+        elif role == "principal":
+            self.db.add(_new_principal(user))
+        elif role == "student":
+            self.db.add(_new_student(user, student_class))
+        return user
+
+    async def commit_new_user(self, user: User) -> User:
+        try:
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        # Loads server defaults (created_at, ...) without a lazy load later
+        await self.db.refresh(user)
+        return user
+
+    async def get_all_teachers(self) -> list[Teacher]:
+        return list(await self.db.scalars(select(Teacher)))
+
+    async def get_all_students(self) -> list[Student]:
+        return list(await self.db.scalars(select(Student)))
+
+    async def get_teachers_page(
+        self,
+        limit: int,
+        after_user_id: str | None = None,
+        class_name: str | None = None,
+        gender: str | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[list, str | None]:
+        stmt = _teachers_page_stmt(limit, after_user_id, class_name, gender, fields)
+        return _teachers_page((await self.db.execute(stmt)).all(), limit, fields)
+
+    async def get_students_page(
+        self,
+        limit: int,
+        after_user_id: str | None = None,
+        class_name: str | None = None,
+        gender: str | None = None,
+        admitted_from: date | None = None,
+        admitted_to: date | None = None,
+        fields: tuple[str, ...] | None = None,
+    ) -> tuple[list, str | None]:
+        stmt = _students_page_stmt(limit, after_user_id, class_name, gender, admitted_from, admitted_to, fields)
+        return _students_page((await self.db.execute(stmt)).all(), limit, fields)
+
+    async def get_collection_version(self, collection: str) -> tuple:
+        return _version_tuple((await self.db.execute(_collection_version_stmt(collection))).first())
+
+    async def stream_students(self, columns: list[str], batch_size: int = 1000):
+        """Async generator of student row mappings over a server-side cursor"""
+        stmt = (
+            select(*(getattr(Student, column) for column in columns))
+            .order_by(Student.user_id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for row in result:
+            yield row._mapping
+
+    async def update_principal_profile(self, user_id: str, payload) -> Principal | None:
+        principal = (
+            await self.db.scalars(
+                select(Principal).options(joinedload(Principal.user)).where(Principal.user_id == user_id)
+            )
+        ).first()
+        if not principal:
+            return None
+        _apply_profile_update(principal, payload)
+        await self.db.commit()
+        await self.db.refresh(principal)
+        identity_cache.invalidate(user_id=user_id)
+        return principal
+
+    async def close(self):
+        if self._own_session:
+            await self.db.close()
@@ -16,13 +16,14 @@ class StudentRepository:
             self.db.query(User)
             .filter(
                User.user_email == email,
-               User.user_role == "principal"
+               User.user_role == "Student"
             )
             .first()
         )
     def get_student_details_by_email(self,student_email,student_id,student_role) -> Student | None:
         return (
             self.db.query(Student)
+            .join(Student.user)
             .filter(
                 User.user_email == student_email,
                 User.user_id == student_id,
@@ -0,0 +1,132 @@
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from database import SessionLocal
+from models import BackgroundTask
+from config import settings
+import datetime
+import json
+
+
+def _new_task(task_name: str, max_attempts: int | None, payload: dict) -> BackgroundTask:
+    return BackgroundTask(
+        task_name=task_name,
+        payload=json.dumps(payload),
+        status="Queued",
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+        run_after=datetime.datetime.utcnow(),
+    )
+
+
+def _due_tasks_stmt(now: datetime.datetime, limit: int):
+    """Queued tasks that are due, plus Running ones whose lease expired (worker crashed)"""
+    lease_expired = now - datetime.timedelta(seconds=settings.TASK_LEASE_TIMEOUT)
+    return (
+        select(BackgroundTask)
+        .where(
+            or_(
+                (BackgroundTask.status == "Queued") & (BackgroundTask.run_after <= now),
+                (BackgroundTask.status == "Running") & (BackgroundTask.locked_at <= lease_expired),
+            )
+        )
+        .order_by(BackgroundTask.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _dead_letter(task: BackgroundTask, error: str):
+    task.status = "Dead"
+    task.locked_at = None
+    task.last_error = error
+    task.payload = "{}"  # payloads can carry credentials; a dead task is never run again
+
+
+class TaskRepository:
+    """All DB operations for the background task queue"""
+
+    def __init__(self, db: Session = None):
+        self.db = db or SessionLocal()
+        self._own_session = db is None
+
+    def enqueue(self, task_name: str, max_attempts: int | None = None, **payload) -> BackgroundTask:
+        """Persist a task; it survives restarts until a worker completes it"""
+        task = _new_task(task_name, max_attempts, payload)
+        self.db.add(task)
+        self.db.commit()
+        self.db.refresh(task)
+        return task
+
+    def claim_due_tasks(self, limit: int) -> list[tuple[int, str, dict]]:
+        """
+        Lock and mark up to `limit` due tasks as Running.
+        Running tasks whose lease expired (worker crashed) are claimed again,
+        unless that was their last attempt: a task that keeps crashing the
+        worker is dead-lettered instead of retried forever.
+        Returns [(task_id, task_name, payload)].
+        """
+        now = datetime.datetime.utcnow()
+        try:
+            tasks = self.db.scalars(_due_tasks_stmt(now, limit)).all()
+            claimed = []
+            for task in tasks:
+                if task.status == "Running" and task.attempts >= task.max_attempts:
+                    _dead_letter(task, f"Lease expired on attempt {task.attempts}; the worker stopped while running it")
+                    continue
+                task.status = "Running"
+                task.locked_at = now
+                task.attempts += 1
+                claimed.append((task.task_id, task.task_name, json.loads(task.payload)))
+            self.db.commit()
+            return claimed
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def mark_done(self, task_id: int):
+        task = self.db.get(BackgroundTask, task_id)
+        if task:
+            task.status = "Done"
+            task.locked_at = None
+            task.last_error = None
+            task.payload = "{}"  # payloads can carry credentials, drop them once delivered
+            self.db.commit()
+
+    def mark_failed(self, task_id: int, error: str):
+        """Schedule a retry with exponential backoff, or dead-letter the task"""
+        task = self.db.get(BackgroundTask, task_id)
+        if not task:
+            return
+        task.last_error = error
+        task.locked_at = None
+        if task.attempts >= task.max_attempts:
+            _dead_letter(task, error)
+        else:
+            delay = min(
+                settings.TASK_RETRY_BASE_DELAY * 2 ** (task.attempts - 1),
+                settings.TASK_RETRY_MAX_DELAY,
+            )
+            task.status = "Queued"
+            task.run_after = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+        self.db.commit()
+
+    def close(self):
+        if self._own_session:
+            self.db.close()
+
+
+class AsyncTaskRepository:
+    """Enqueueing from async request handlers; workers use TaskRepository"""
+
+    def __init__(self, db):
+        self.db = db
+
+    def stage(self, task_name: str, max_attempts: int | None = None, **payload) -> BackgroundTask:
+        """Add a task to the session; it is queued when the caller's transaction commits"""
+        task = _new_task(task_name, max_attempts, payload)
+        self.db.add(task)
+        return task
+
+    async def enqueue(self, task_name: str, max_attempts: int | None = None, **payload) -> BackgroundTask:
+        task = self.stage(task_name, max_attempts, **payload)
+        await self.db.commit()
+        return task
@@ -1,15 +1,76 @@
 from models.user import User
-from models.student import Student, StudentsAttendance
-from models.teacher import Teacher
+from models.collection_version import CollectionVersion
+from models.student import Student, StudentsAttendance, AttendanceStatus
+from models.teacher import Teacher, TeacherClass
 from models.education.exams import ExamTable, ExamSubjectsTable
 from models.education.subjects import Subjects
-from schemas.teacher_schema import AttendanceStatus
 
 from database import SessionLocal
-from sqlalchemy import func
+from core.image_pipeline import ingest_image_async, read_upload
+from core.storage import BlobStore, get_blob_store
+from sqlalchemy import select, insert, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
 import datetime
 
+# Max rows sent per attendance statement; a class roster fits in a single batch.
+ATTENDANCE_BATCH_SIZE = 500
+
+
+# -------------------------
+# Statements (also EXPLAINed by scripts/check_query_plans.py)
+# -------------------------
+def _teacher_by_email_stmt(email: str):
+    return select(Teacher).join(Teacher.user).where(User.user_email == email, User.user_role == "Teacher")
+
+
+def _existing_attendance_stmt(attendance_date: datetime.date, user_ids: list):
+    return select(StudentsAttendance.user_id).where(
+        StudentsAttendance.attendance_date == attendance_date,
+        StudentsAttendance.user_id.in_(user_ids)
+    )
+
+
+def _class_attendance_stmt(class_name: str, attendance_date: datetime.date):
+    return (
+        select(
+            Student.user_id,
+            Student.student_name,
+            Student.student_class_name,
+            StudentsAttendance.attendance_status
+        )
+        .outerjoin(
+            StudentsAttendance,
+            (Student.user_id == StudentsAttendance.user_id)
+            & (StudentsAttendance.attendance_date == attendance_date)
+        )
+        .where(Student.student_class_name == class_name)
+    )
+
+
+def _exam_schedule_version_stmt():
+    # Bumped by every write to exam_table / exam_subjects_table (core/collection_versions.py)
+    return select(CollectionVersion.version).where(CollectionVersion.name == "exams")
+
+
+def _exam_schedule_stmt(class_name: str):
+    return (
+        select(
+            ExamTable.exam_name,
+            ExamTable.exam_code,
+            ExamSubjectsTable.subject_name,
+            ExamSubjectsTable.exam_date,
+            ExamSubjectsTable.start_time,
+            ExamSubjectsTable.end_time,
+            ExamSubjectsTable.marks
+        )
+        .join(ExamTable, ExamTable.exam_code == ExamSubjectsTable.exam_code)
+        .where(ExamTable.class_name == class_name)
+        .order_by(ExamSubjectsTable.exam_date, ExamSubjectsTable.start_time)
+    )
+
 
 class TeacherRepository:
     """All DB operations for Teacher"""
@@ -24,14 +85,7 @@ class TeacherRepository:
     def get_teacher_by_email(self, email) -> Teacher:
         """Fetch teacher object by email"""
         try:
-            return (
-                self.db.query(Teacher)
-                .filter(
-                    User.user_email == email,
-                    func.lower(User.user_role) == "teacher"
-                )
-                .first()
-            )
+            return self.db.scalars(_teacher_by_email_stmt(email)).first()
         except SQLAlchemyError as e:
             print(f"DB Error in get_teacher_by_email: {e}")
             return None
@@ -46,7 +100,7 @@ class TeacherRepository:
                 self.db.query(User)
                 .filter(
                     User.user_email == email,
-                    func.lower(User.user_role) == "teacher"
+                    User.user_role == "Teacher"
                 )
                 .first()
             )
@@ -93,21 +147,7 @@ class TeacherRepository:
     def get_students_attendance_in_todays_date(self, class_name: str, today_date: datetime.date):
         """Fetch students with today's attendance status"""
         try:
-            return (
-                self.db.query(
-                    Student.user_id,
-                    Student.student_name,
-                    Student.student_class_name,
-                    StudentsAttendance.attendance_status
-                )
-                .outerjoin(
-                    StudentsAttendance,
-                    (Student.user_id == StudentsAttendance.user_id)
-                    & (StudentsAttendance.attendance_date == today_date)
-                )
-                .filter(Student.student_class_name == class_name)
-                .all()
-            )
+            return self.db.execute(_class_attendance_stmt(class_name, today_date)).all()
         except SQLAlchemyError as e:
             print(f"DB Error in get_students_attendance_in_todays_date: {e}")
             return []
@@ -141,7 +181,7 @@ class TeacherRepository:
             if not teacher:
                 return False
 
-            teacher.teacher_user_name = data.get('user_name', teacher.teacher_user_name)
+            teacher.teacher_name = data.get('user_name', teacher.teacher_name)
             teacher.teacher_age = data.get('age', teacher.teacher_age)
             teacher.teacher_gender = data.get('gender', teacher.teacher_gender)
             teacher.teacher_qualification = data.get('qualification', teacher.teacher_qualification)
@@ -163,9 +203,38 @@ class TeacherRepository:
     # -------------------------
     # Attendance Management
     # -------------------------
-    def submit_students_attendance_in_db(self, data: dict) -> bool:
+    def _fetch_existing_attendance_user_ids(self, attendance_date: datetime.date, user_ids: list) -> set:
+        """Return the user_ids that already have an attendance row on the given date"""
+        existing = set()
+        for start in range(0, len(user_ids), ATTENDANCE_BATCH_SIZE):
+            chunk = user_ids[start:start + ATTENDANCE_BATCH_SIZE]
+            existing.update(self.db.scalars(_existing_attendance_stmt(attendance_date, chunk)))
+        return existing
+
+    def _attendance_upsert_statement(self):
+        """
+        Build a dialect native upsert keyed on (user_id, attendance_date).
+        Returns None when the dialect has no upsert support.
+        """
+        dialect = self.db.get_bind().dialect.name
+        table = StudentsAttendance.__table__
+
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table)
+            return stmt.on_duplicate_key_update(
+                attendance_status=stmt.inserted.attendance_status
+            )
+        if dialect in ("sqlite", "postgresql"):
+            stmt = (sqlite_insert if dialect == "sqlite" else postgresql_insert)(table)
+            return stmt.on_conflict_do_update(
+                index_elements=[table.c.user_id, table.c.attendance_date],
+                set_={"attendance_status": stmt.excluded.attendance_status}
+            )
+        return None
+
+    def submit_students_attendance_in_db(self, data: dict) -> dict:
         """
-        Insert or update student attendance.
+        Insert or update student attendance for a whole class in bulk.
 
         data = {
             "class_name": "10A",
@@ -175,95 +244,144 @@ class TeacherRepository:
                 {"user_id": "u2", "user_name": "Bob", "status": "Absent"}
             ]
         }
+
+        A roster of up to ATTENDANCE_BATCH_SIZE students costs two statements:
+        one SELECT of the keys already present (used for the counts) and one
+        upsert on the (user_id, attendance_date) primary key.
+
+        Returns {"success": True, "inserted": n, "updated": m}
         """
         try:
             attendance_date = datetime.date.fromisoformat(data["date"])
-            attendance_list = data["attendance"]
-
-            for student in attendance_list:
-                user_id = student["user_id"]
-                student_name = student["user_name"]
-                status = student["status"]
-
-                # Check if attendance already exists
-                existing = (
-                    self.db.query(StudentsAttendance)
-                    .filter(
-                        StudentsAttendance.user_id == user_id,
-                        StudentsAttendance.attendance_date == attendance_date
-                    )
-                    .first()
-                )
 
-                if existing:
-                    existing.attendance_status = AttendanceStatus(status)
-                else:
-                    new_attendance = StudentsAttendance(
-                        user_id=user_id,
-                        student_name=student_name,
-                        attendance_date=attendance_date,
-                        attendance_status=AttendanceStatus(status)
-                    )
-                    self.db.add(new_attendance)
+            # Last entry wins when a student appears twice in the payload
+            rows = {}
+            for student in data["attendance"]:
+                rows[student["user_id"]] = {
+                    "user_id": student["user_id"],
+                    "student_name": student["user_name"],
+                    "attendance_date": attendance_date,
+                    "attendance_status": AttendanceStatus(student["status"])
+                }
+            if not rows:
+                return {"success": True, "inserted": 0, "updated": 0}
+
+            user_ids = list(rows)
+            existing = self._fetch_existing_attendance_user_ids(attendance_date, user_ids)
+            values = list(rows.values())
+            upsert = self._attendance_upsert_statement()
+
+            for start in range(0, len(values), ATTENDANCE_BATCH_SIZE):
+                batch = values[start:start + ATTENDANCE_BATCH_SIZE]
+                if upsert is not None:
+                    self.db.execute(upsert, batch)
+                    continue
+
+                # Generic fallback: one executemany INSERT and one executemany UPDATE
+                new_rows = [row for row in batch if row["user_id"] not in existing]
+                old_rows = [
+                    {
+                        "user_id": row["user_id"],
+                        "attendance_date": row["attendance_date"],
+                        "attendance_status": row["attendance_status"]
+                    }
+                    for row in batch if row["user_id"] in existing
+                ]
+                if new_rows:
+                    self.db.execute(insert(StudentsAttendance), new_rows)
+                if old_rows:
+                    self.db.execute(update(StudentsAttendance), old_rows)
 
             self.db.commit()
-            return True
+            return {
+                "success": True,
+                "inserted": len(user_ids) - len(existing),
+                "updated": len(existing)
+            }
 
         except SQLAlchemyError as e:
             self.db.rollback()
             print(f"DB Error in submit_students_attendance_in_db: {e}")
-            return False
+            return {"success": False, "error": str(e)}
         except Exception as e:
             self.db.rollback()
             print(f"General Error in submit_students_attendance_in_db: {e}")
-            return False
+            return {"success": False, "error": str(e)}
 
-    def submit_modified_attendance_in_db(self, data: dict) -> bool:
+    def submit_modified_attendance_in_db(self, data: dict) -> dict:
         """
-        Update existing student attendance.
+        Update existing student attendance in batches.
 
         data = {
             "date": "2025-09-10",
             "attendance": [
                 {"user_id": "u1", "status": "Present"},
-                {"user_id": "u2", "status": "Absent"}
+                {"user_id": "u2", "status": "Absent", "date": "2025-09-11"}
             ]
         }
+
+        An entry may carry its own "date" to correct several days at once.
+        Each date costs one SELECT of the existing keys and one executemany
+        UPDATE by primary key, regardless of how many rows are corrected.
+
+        Returns {
+            "success": True,
+            "updated": n,
+            "missing": m,
+            "results": [{"user_id": "u1", "date": "2025-09-10", "result": "updated"}, ...]
+        }
         """
         try:
-            attendance_date = datetime.date.fromisoformat(data["date"])
-            attendance_list = data["attendance"]
-
-            for student in attendance_list:
-                user_id = student["user_id"]
-                status = student["status"]
-
-                # Update only if record exists
-                existing = (
-                    self.db.query(StudentsAttendance)
-                    .filter(
-                        StudentsAttendance.user_id == user_id,
-                        StudentsAttendance.attendance_date == attendance_date
-                    )
-                    .first()
+            default_date = data.get("date")
+
+            # Group corrections by date, last entry wins for a repeated key
+            rows_by_date = {}
+            for student in data["attendance"]:
+                attendance_date = datetime.date.fromisoformat(student.get("date", default_date))
+                rows_by_date.setdefault(attendance_date, {})[student["user_id"]] = AttendanceStatus(student["status"])
+
+            results = []
+            for attendance_date, statuses in rows_by_date.items():
+                user_ids = list(statuses)
+                existing = self._fetch_existing_attendance_user_ids(attendance_date, user_ids)
+
+                changes = [
+                    {
+                        "user_id": user_id,
+                        "attendance_date": attendance_date,
+                        "attendance_status": statuses[user_id]
+                    }
+                    for user_id in user_ids if user_id in existing
+                ]
+                for start in range(0, len(changes), ATTENDANCE_BATCH_SIZE):
+                    self.db.execute(update(StudentsAttendance), changes[start:start + ATTENDANCE_BATCH_SIZE])
+
+                results.extend(
+                    {
+                        "user_id": user_id,
+                        "date": attendance_date.isoformat(),
+                        "result": "updated" if user_id in existing else "missing"
+                    }
+                    for user_id in user_ids
                 )
 
-                if existing:
-                    existing.attendance_status = AttendanceStatus(status)
-                else:
-                    print(f"No record for user_id={user_id} on {attendance_date}, skipping update.")
-
             self.db.commit()
-            return True
+            updated = sum(1 for row in results if row["result"] == "updated")
+            return {
+                "success": True,
+                "updated": updated,
+                "missing": len(results) - updated,
+                "results": results
+            }
 
         except SQLAlchemyError as e:
             self.db.rollback()
             print(f"DB Error in submit_modified_attendance_in_db: {e}")
-            return False
+            return {"success": False, "error": str(e)}
         except Exception as e:
             self.db.rollback()
             print(f"General Error in submit_modified_attendance_in_db: {e}")
-            return False
+            return {"success": False, "error": str(e)}
     
     def fetch_all_subjects_from_db(self):
         """Fetch all subjects from the database"""
@@ -313,13 +431,116 @@ class TeacherRepository:
             print(f"General Error in publish_exam_schedules_in_db: {e}")
             return False
     
-    def add_student_via_teacher_in_db(self, student_datas):
-        """Add a new student via teacher"""
+    def get_exam_schedule_version(self) -> int | None:
+        """
+        Change counter of the exam schedules, bumped by every insert, edit or
+        delete of exam rows. None when it cannot be read.
+        """
+        try:
+            return self.db.execute(_exam_schedule_version_stmt()).scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"DB Error in get_exam_schedule_version: {e}")
+            return None
+
+    def get_calendar_class_names(self, user_id: str, role: str) -> list[str]:
+        """Classes whose exam feed the user may subscribe to"""
+        if role == "teacher":
+            stmt = select(TeacherClass.class_name).where(TeacherClass.teacher_id == user_id)
+        elif role == "student":
+            stmt = select(Student.student_class_name).where(Student.user_id == user_id)
+        elif role == "principal":
+            stmt = select(ExamTable.class_name).distinct()
+        else:
+            return []
+        try:
+            return sorted(set(self.db.scalars(stmt)))
+        except SQLAlchemyError as e:
+            print(f"DB Error in get_calendar_class_names: {e}")
+            return []
+
+    def get_calendar_feed_version(self, user_id: str) -> int | None:
+        """Version the user's feed tokens must carry; None for an unknown user"""
+        try:
+            return self.db.scalar(select(User.calendar_feed_version).where(User.user_id == user_id))
+        except SQLAlchemyError as e:
+            print(f"DB Error in get_calendar_feed_version: {e}")
+            return None
+
+    def rotate_calendar_feed_version(self, user_id: str) -> int | None:
+        """Bump the version so every feed URL issued to the user stops working"""
+        try:
+            self.db.execute(
+                update(User)
+                .where(User.user_id == user_id)
+                .values(calendar_feed_version=User.calendar_feed_version + 1)
+            )
+            self.db.commit()
+            return self.get_calendar_feed_version(user_id)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            print(f"DB Error in rotate_calendar_feed_version: {e}")
+            return None
+
+    def get_exam_schedule_for_class(self, class_name: str):
+        """Exam subjects of a class with their exam name, ordered by date"""
+        try:
+            return self.db.execute(_exam_schedule_stmt(class_name)).all()
+        except SQLAlchemyError as e:
+            print(f"DB Error in get_exam_schedule_for_class: {e}")
+            return []
+
+    async def add_student_via_teacher_in_db(self, student_datas, student_image_file=None, blob_store: BlobStore | None = None):
+        """
+        Add a new student via teacher.
+        The image (an UploadFile) goes through the image pipeline and its size
+        variants are stored in the blob store before the rows are written.
+        """
         try:
+            student_image_urls = await self._store_student_image(student_image_file, blob_store)
+        except Exception as e:
+            print(f"Error in adding the new student: {str(e)}")
+            return {"success": False, "error": str(e)}
+        return self._insert_student_rows(student_datas, student_image_urls)
+
+    @staticmethod
+    async def _store_student_image(student_image_file=None, blob_store: BlobStore | None = None) -> dict | None:
+        """
+        Validate, strip metadata and resize the upload, then store every size.
+        Returns {size: {"key": blob key, "url": public url}}; the original
+        upload itself is never stored.
+        """
+        if student_image_file is None:
+            return None
+        ingested = await ingest_image_async(await read_upload(student_image_file))
+        blob_store = blob_store or get_blob_store()
+        variants = {}
+        for size, content in ingested["variants"].items():
+            stored = await blob_store.put(content, folder="students", content_type=ingested["content_type"])
+            variants[size] = {"key": stored.key, "url": stored.url}
+        print(
+            f"Image {ingested['digest'][:12]}: {ingested['original_bytes']} bytes uploaded, "
+            f"{ingested['bytes_saved']} bytes saved on the large variant"
+        )
+        return variants
+
+    def _insert_student_rows(self, student_datas, student_image_urls: dict | None):
+        try:
+            # User first: students.user_id references users.user_id
+            new_user = User(
+                user_id = student_datas['user_id'],
+                user_name = student_datas['student_name'],
+                user_email = student_datas['user_email'],
+                user_password = student_datas['hashed_password'],
+                user_role = student_datas['user_role']
+            )
+            self.db.add(new_user)
+
             new_student = Student(
                 user_id=student_datas["user_id"],
                 student_name=student_datas["student_name"],
-                student_image_url=student_datas.get("student_image_url"),
+                student_email=student_datas["user_email"],
+                student_image_url=student_image_urls["large"]["url"] if student_image_urls else student_datas.get("student_image_url"),
+                student_image_urls=student_image_urls,
                 student_class_name=student_datas["student_class_name"],
                 student_gender=student_datas["student_gender"],   # fixed mapping
                 student_date_of_birth=student_datas["student_dob"],
@@ -332,23 +553,17 @@ class TeacherRepository:
                 student_address=student_datas["student_address"],
                 student_admission_date=student_datas["admission_date"]
             )
-
             self.db.add(new_student)
-            self.db.commit()       # ✅ commit to persist in DB
-            self.db.refresh(new_student)  # ✅ refresh to get updated fields (like autogenerated IDs)
 
-            new_user = User(
-                user_id = student_datas['user_id'],
-                user_name = student_datas['student_name'],
-                user_email = student_datas['user_email'],
-                user_password = student_datas['hashed_password'],
-                user_role = student_datas['user_role']
-            )
-            self.db.add(new_user)
-            self.db.commit()
-            self.db.refresh(new_user)
+            self.db.commit()       # ✅ one transaction for both rows
+            self.db.refresh(new_student)
 
-            return {"success": True, "student_id": new_student.user_id}
+            return {
+                "success": True,
+                "student_id": new_student.user_id,
+                "student_image_url": new_student.student_image_url,
+                "student_image_urls": student_image_urls,
+            }
 
         except Exception as e:
             self.db.rollback()  # ✅ rollback if something goes wrong
@@ -360,4 +575,4 @@ class TeacherRepository:
             student = Student()
         except Exception as e:
             print(F" Error in get_student_from_db_by_user_id : {str(e)}")
-            return []
\ No newline at end of file
+            return []
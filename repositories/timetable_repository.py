@@ -0,0 +1,157 @@
+import bisect
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from config import settings
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@dataclass(frozen=True, slots=True)
+class Period:
+    teacher_id: str
+    class_name: str
+    subject: str
+    weekday: int   # 0 = Monday
+    start: int     # minutes since midnight
+    end: int
+    data: dict     # the stored record, returned to clients as-is
+
+
+def _minutes(value: str) -> int:
+    hours, minutes = value.split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def _weekday(value) -> int:
+    if isinstance(value, int):
+        return value
+    return WEEKDAYS.index(value.strip().capitalize())
+
+
+class TimetableIndex:
+    """
+    Immutable index over one version of the timetable.
+
+    periods.json holds a list of periods such as
+        {"teacher_id": "u1", "class_name": "10A", "subject": "Maths",
+         "day": "Monday", "start_time": "09:00", "end_time": "09:45"}
+    """
+
+    def __init__(self, records: list[dict], mtime: float | None = None):
+        self.mtime = mtime
+        self._by_teacher = {}   # teacher_id -> [Period] ordered by (weekday, start)
+        self._by_class_day = {}  # (class_name, weekday) -> ([start], [Period]) ordered by start
+        self._by_slot = {}      # (weekday, start) -> [Period]
+
+        periods = sorted(
+            (
+                Period(
+                    teacher_id=str(record["teacher_id"]),
+                    class_name=record["class_name"],
+                    subject=record.get("subject", ""),
+                    weekday=_weekday(record["day"]),
+                    start=_minutes(record["start_time"]),
+                    end=_minutes(record["end_time"]),
+                    data=record,
+                )
+                for record in records
+            ),
+            key=lambda period: (period.weekday, period.start),
+        )
+        for period in periods:
+            self._by_teacher.setdefault(period.teacher_id, []).append(period)
+            starts, class_periods = self._by_class_day.setdefault((period.class_name, period.weekday), ([], []))
+            starts.append(period.start)
+            class_periods.append(period)
+            self._by_slot.setdefault((period.weekday, period.start), []).append(period)
+
+    def teacher_week(self, teacher_id: str) -> list[Period]:
+        return self._by_teacher.get(str(teacher_id), [])
+
+    def class_period_at(self, class_name: str, weekday: int, minute: int) -> Period | None:
+        """The period running in a class at the given time, found by bisect."""
+        entry = self._by_class_day.get((class_name, weekday))
+        if not entry:
+            return None
+        starts, periods = entry
+        pos = bisect.bisect_right(starts, minute) - 1
+        if pos >= 0 and periods[pos].end > minute:
+            return periods[pos]
+        return None
+
+    def slot(self, weekday: int, start: int) -> list[Period]:
+        """Every period starting in the given weekday / time slot."""
+        return self._by_slot.get((weekday, start), [])
+
+
+class Timetable:
+    """
+    Holds the current TimetableIndex. A daemon thread watches the file's
+    mtime and swaps in a freshly built index, so requests only read a
+    reference and never touch the file.
+    """
+
+    def __init__(self, path: str, check_interval: float = 2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._index = TimetableIndex([])
+        self._failed_mtime = None   # mtime of a version that failed to load; not retried or re-logged
+        self._reload_lock = threading.Lock()
+        self.reload_if_changed()
+        watcher = threading.Thread(target=self._watch, name="timetable-watcher", daemon=True)
+        watcher.start()
+
+    @property
+    def index(self) -> TimetableIndex:
+        return self._index
+
+    def reload_if_changed(self) -> bool:
+        with self._reload_lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+            except OSError:
+                return False
+            if mtime in (self._index.mtime, self._failed_mtime):
+                return False
+            try:
+                with open(self.path) as f:
+                    content = f.read().strip()
+                records = json.loads(content) if content else []
+                # Build fully before publishing; readers keep the old index meanwhile
+                self._index = TimetableIndex(records, mtime)
+                return True
+            except Exception as e:
+                # Any malformed record (missing key, wrong type, bad time...) keeps the
+                # last good timetable in service until the file changes again
+                self._failed_mtime = mtime
+                print(f"Error loading timetable {self.path}: {type(e).__name__}: {e}")
+                return False
+
+    def _watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.reload_if_changed()
+            except Exception as e:
+                # The watcher must outlive any single bad reload
+                print(f"Timetable watcher error for {self.path}: {type(e).__name__}: {e}")
+
+    def who_is_teaching(self, class_name: str, at: datetime.datetime | None = None) -> Period | None:
+        at = at or datetime.datetime.now()
+        return self._index.class_period_at(class_name, at.weekday(), at.hour * 60 + at.minute)
+
+
+_timetable: Timetable | None = None
+_timetable_lock = threading.Lock()
+
+
+def get_timetable() -> Timetable:
+    global _timetable
+    with _timetable_lock:
+        if _timetable is None:
+            _timetable = Timetable(settings.PERIODS_FILE_PATH)
+        return _timetable
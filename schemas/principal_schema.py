@@ -16,10 +16,25 @@ class Gender(str, Enum):
     OTHER = "Other"
 
 
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class QrImageFormat(str, Enum):
+    SVG = "svg"
+    PNG = "png"
+
+
 # ===== REQUEST SCHEMAS =====
 class PrincipalLoginRequest(BaseModel):
     principal_email: EmailStr
     principal_password: str
+    principal_otp: Optional[str] = None
+
+
+class PrincipalOtpVerifyRequest(BaseModel):
+    preauth_ticket: str
     principal_otp: str
 
 
@@ -47,6 +62,7 @@ class PrincipalTokenResponse(BaseModel):
     access_token: str | None = None
     token_type: str | None = None
     totp_required: bool = False
+    preauth_ticket: str | None = None
     message: str | None = None
 
 
@@ -58,6 +74,17 @@ class PrincipalAddUserResponse(BaseModel):
 
 # ===== OUTPUT SCHEMAS (ORM) =====
 class PrincipalOut(BaseModel):
+    principal_id: Optional[int] = None
+    user_id: Optional[str] = None
+    principal_name: Optional[str] = None
+    principal_email: Optional[str] = None
+    principal_phone: Optional[str] = None
+    principal_hire_date: Optional[date] = None
+    principal_qualification: Optional[str] = None
+    principal_experience_years: Optional[int] = None
+    principal_address: Optional[str] = None
+    principal_status: Optional[PrincipalStatus] = None
+
     model_config = {
         "from_attributes": True
     }
@@ -90,7 +117,7 @@ class StudentsOut(BaseModel):
     student_class_name: Optional[str] = None
     student_gender: Optional[Gender] = None
     student_date_of_birth: Optional[date] = None
-    student_roll_no: Optional[str] = None
+    student_roll_no: Optional[int] = None
     student_age: Optional[int] = None
     student_father_name: Optional[str] = None
     student_mother_name: Optional[str] = None
@@ -101,3 +128,14 @@ class StudentsOut(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+
+# ===== PAGINATED OUTPUT SCHEMAS =====
+class TeachersPage(BaseModel):
+    items: List[TeachersOut]
+    next_cursor: Optional[str] = None
+
+
+class StudentsPage(BaseModel):
+    items: List[StudentsOut]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,91 @@
+from dataclasses import dataclass, fields
+from datetime import date
+from decimal import Decimal
+
+
+# ===== LIGHTWEIGHT LIST RECORDS =====
+# Plain slotted rows for list endpoints. They carry the same fields as
+# StudentsOut / TeachersOut but skip per-row pydantic validation and are
+# serialised directly by orjson.
+
+@dataclass(slots=True)
+class StudentRecord:
+    user_id: str | None
+    student_name: str | None
+    student_image_url: str | None
+    student_class_name: str | None
+    student_gender: str | None
+    student_date_of_birth: date | None
+    student_roll_no: int | None
+    student_age: int | None
+    student_father_name: str | None
+    student_mother_name: str | None
+    student_father_mobile_number: str | None
+    student_mother_mobile_number: str | None
+    student_admission_date: date | None
+
+
+@dataclass(slots=True)
+class TeacherRecord:
+    user_id: str
+    teacher_user_name: str
+    teacher_image_url: str | None
+    teacher_gender: str | None
+    teacher_qualification: str | None
+    teacher_age: int | None
+    teacher_year_of_experience: int | None
+    teacher_subject_specialization: str | None
+    teacher_salary_package: float | None
+    teacher_mobile_number: str | None
+    teacher_address: str | None
+    teacher_bank_account_id: str | None
+    teacher_class_ids: list[str] | None
+
+    @classmethod
+    def from_row(cls, row) -> "TeacherRecord":
+        record = cls(*row)
+        record.teacher_salary_package = _salary(record.teacher_salary_package)
+        record.teacher_class_ids = _class_ids(record.teacher_class_ids)
+        return record
+
+
+def _salary(value):
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _class_ids(value):
+    # Stored as a comma separated string, returned as a list
+    if isinstance(value, str):
+        return [class_id.strip() for class_id in value.split(",") if class_id.strip()]
+    return value
+
+
+def teacher_values(values: dict) -> dict:
+    """Same conversions as TeacherRecord.from_row for a sparse field selection."""
+    if "teacher_salary_package" in values:
+        values["teacher_salary_package"] = _salary(values["teacher_salary_package"])
+    if "teacher_class_ids" in values:
+        values["teacher_class_ids"] = _class_ids(values["teacher_class_ids"])
+    return values
+
+
+def record_fields(record_cls) -> list[str]:
+    return [field.name for field in fields(record_cls)]
+
+
+def parse_fields(allowed, raw: str | None, always: tuple[str, ...] = ("user_id",)) -> tuple[str, ...] | None:
+    """
+    Validate a comma separated ?fields= value against the response schema's
+    field names. Returns None when absent (full records), otherwise the
+    selected names in schema order; `always` fields are always included.
+    Raises ValueError for unknown names.
+    """
+    if not raw:
+        return None
+    allowed = list(allowed)
+    requested = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(requested.difference(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    requested.update(name for name in always if name in allowed)
+    return tuple(name for name in allowed if name in requested)
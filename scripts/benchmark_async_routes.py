@@ -0,0 +1,107 @@
+"""
+Latency of the teachers page under N concurrent requests: a `def` route on
+the sync repository (FastAPI's worker thread pool) versus an `async def`
+route on the async repository (no thread held while the query waits).
+
+    python -m scripts.benchmark_async_routes --connections 500
+
+Requests go through the ASGI stack in process (httpx ASGITransport), so no
+HTTP server is involved; the queries go to DATABASE_URL. Run it against the
+production database type (MySQL over the network): on a local SQLite file
+the queries never wait, and aiosqlite's hop to its own thread makes the
+async route the slower one. Needs the same environment (.env) as the app,
+with a migrated database.
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from fastapi import FastAPI
+from database import AsyncSessionLocal, SessionLocal
+from repositories.principal_repository import AsyncPrincipalRepository, PrincipalRepository
+
+PAGE_SIZE = 50
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync/teachers")
+    def sync_teachers():
+        repo = PrincipalRepository(SessionLocal())
+        try:
+            teachers, _ = repo.get_teachers_page(PAGE_SIZE)
+            return {"count": len(teachers)}
+        finally:
+            repo.db.close()
+
+    @app.get("/async/teachers")
+    async def async_teachers():
+        db = AsyncSessionLocal()
+        try:
+            teachers, _ = await AsyncPrincipalRepository(db).get_teachers_page(PAGE_SIZE)
+            return {"count": len(teachers)}
+        finally:
+            await db.close()
+
+    return app
+
+
+async def run(client, path: str, connections: int) -> dict:
+    peak_threads = threading.active_count()
+    done = asyncio.Event()
+
+    async def sample_threads():
+        nonlocal peak_threads
+        while not done.is_set():
+            peak_threads = max(peak_threads, threading.active_count())
+            await asyncio.sleep(0.005)
+
+    async def one() -> float:
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    sampler = asyncio.create_task(sample_threads())
+    started = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(one() for _ in range(connections))))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await sampler
+    return {
+        "rps": connections / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "threads": peak_threads,
+    }
+
+
+async def main_async(args):
+    import httpx
+
+    transport = httpx.ASGITransport(app=build_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for path in ("/sync/teachers", "/async/teachers"):
+            await run(client, path, 20)   # warm the pools
+        results = {
+            "sync  (def, thread pool)": await run(client, "/sync/teachers", args.connections),
+            "async (async def)       ": await run(client, "/async/teachers", args.connections),
+        }
+    print(f"{args.connections} concurrent requests")
+    for name, result in results.items():
+        print(
+            f"{name}: {result['rps']:8.1f} req/s  p50 {result['p50']:7.1f} ms  "
+            f"p99 {result['p99']:7.1f} ms  peak threads {result['threads']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=500)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Round trips and latency of one class's daily attendance submission: the
+old loop (a SELECT per student, then the ORM flush of the changed rows)
+versus submit_students_attendance_in_db (one key SELECT and one upsert per
+batch), and its generic INSERT + UPDATE fallback for dialects without an
+upsert.
+
+    python -m scripts.benchmark_attendance_upsert --sizes 30,100,500 --repeat 5
+
+Each size is submitted twice per run: a first submission that inserts every
+row and a resubmission that updates them. Run it against the production
+database type (MySQL over the network), where every round trip costs a
+network hop; a local SQLite file hides most of that. Needs the same
+environment (.env) as the app, with a migrated database. The benchmark
+students and their attendance are deleted afterwards.
+"""
+import argparse
+import datetime
+import statistics
+import time
+from sqlalchemy import delete, event, insert
+from database import SessionLocal
+from models.student import AttendanceStatus, Student, StudentsAttendance
+from models.user import User
+from repositories.teacher_respository import TeacherRepository
+
+CLASS_NAME = "BENCH"
+FIRST_DAY = datetime.date(2099, 1, 1)
+
+
+def per_row_submit(repo: TeacherRepository, data: dict):
+    """The loop submit_students_attendance_in_db replaced."""
+    attendance_date = datetime.date.fromisoformat(data["date"])
+    for student in data["attendance"]:
+        existing = (
+            repo.db.query(StudentsAttendance)
+            .filter(
+                StudentsAttendance.user_id == student["user_id"],
+                StudentsAttendance.attendance_date == attendance_date,
+            )
+            .first()
+        )
+        if existing:
+            existing.attendance_status = AttendanceStatus(student["status"])
+        else:
+            repo.db.add(StudentsAttendance(
+                user_id=student["user_id"],
+                student_name=student["user_name"],
+                attendance_date=attendance_date,
+                attendance_status=AttendanceStatus(student["status"]),
+            ))
+    repo.db.commit()
+
+
+def fallback_submit(repo: TeacherRepository, data: dict):
+    repo._attendance_upsert_statement = lambda: None
+    return repo.submit_students_attendance_in_db(data)
+
+
+STRATEGIES = {
+    "per-row loop  ": per_row_submit,
+    "bulk upsert   ": TeacherRepository.submit_students_attendance_in_db,
+    "bulk fallback ": fallback_submit,
+}
+
+
+def user_ids(size: int) -> list[str]:
+    return [f"bench-{i:05d}" for i in range(size)]
+
+
+def roster(day: datetime.date, ids: list[str], status: str) -> dict:
+    return {
+        "class_name": CLASS_NAME,
+        "date": day.isoformat(),
+        "attendance": [{"user_id": user_id, "user_name": user_id, "status": status} for user_id in ids],
+    }
+
+
+def timed_submit(strategy, data: dict) -> tuple[float, int]:
+    """Seconds taken and statements sent by one submission"""
+    repo = TeacherRepository(SessionLocal())
+    statements = 0
+
+    def count(*args):
+        nonlocal statements
+        statements += 1
+
+    bind = repo.db.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    try:
+        started = time.perf_counter()
+        strategy(repo, data)
+        return time.perf_counter() - started, statements
+    finally:
+        event.remove(bind, "before_cursor_execute", count)
+        repo.db.close()
+
+
+def create_students(ids: list[str]):
+    db = SessionLocal()
+    try:
+        db.execute(insert(User), [
+            {"user_id": user_id, "user_name": user_id, "user_email": f"{user_id}@bench.invalid",
+             "user_password": "x", "user_role": "Student"}
+            for user_id in ids
+        ])
+        db.execute(insert(Student), [
+            {"user_id": user_id, "student_name": user_id, "student_email": f"{user_id}@bench.invalid",
+             "student_class_name": CLASS_NAME}
+            for user_id in ids
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def drop_students(ids: list[str]):
+    db = SessionLocal()
+    try:
+        db.execute(delete(StudentsAttendance).where(StudentsAttendance.user_id.in_(ids)))
+        db.execute(delete(Student).where(Student.user_id.in_(ids)))
+        db.execute(delete(User).where(User.user_id.in_(ids)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="30,100,500")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    ids = user_ids(max(sizes))
+    create_students(ids)
+    day = FIRST_DAY
+    try:
+        for size in sizes:
+            print(f"class of {size}")
+            for name, strategy in STRATEGIES.items():
+                runs = {"insert": [], "update": []}
+                trips = {}
+                for _ in range(args.repeat):
+                    day += datetime.timedelta(days=1)
+                    for phase, status in (("insert", "Present"), ("update", "Absent")):
+                        seconds, trips[phase] = timed_submit(strategy, roster(day, ids[:size], status))
+                        runs[phase].append(seconds)
+                print(
+                    f"  {name}: "
+                    + "  ".join(
+                        f"{phase} {statistics.median(runs[phase]) * 1000:8.1f} ms ({trips[phase]:4} round trips)"
+                        for phase in ("insert", "update")
+                    )
+                )
+    finally:
+        drop_students(ids)
+
+
+if __name__ == "__main__":
+    main()
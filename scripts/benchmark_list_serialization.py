@@ -0,0 +1,125 @@
+"""
+CPU time and peak memory of building one student list response: the fast
+path the list endpoints use (column-projected StudentRecord rows dumped by
+orjson) versus the ORM + pydantic path it replaced (Student entities,
+StudentsPage validation, model_dump and json.dumps, as a response_model
+route does).
+
+    python -m scripts.benchmark_list_serialization --rows 10000 --repeat 5
+
+Both paths run the query and produce the JSON body; compression is left
+out since it is the same for both. Figures are scaled to 10k rows. Peak
+memory is measured with tracemalloc in a separate, untimed pass. Needs the
+same environment (.env) as the app, with a migrated database; the
+benchmark students are deleted afterwards.
+"""
+import argparse
+import datetime
+import json
+import statistics
+import time
+import tracemalloc
+import orjson
+from sqlalchemy import delete, insert, select
+from core.responses import _default
+from database import SessionLocal
+from models import Student
+from repositories.principal_repository import PrincipalRepository
+from schemas.principal_schema import StudentsPage
+
+CLASS_NAME = "BENCHLIST"
+
+
+def orm_pydantic_body(db) -> bytes:
+    students = db.scalars(
+        select(Student).where(Student.student_class_name == CLASS_NAME).order_by(Student.user_id)
+    ).all()
+    page = StudentsPage.model_validate({"items": students, "next_cursor": None}, from_attributes=True)
+    return json.dumps(page.model_dump(mode="json")).encode()
+
+
+def fast_path_body(db) -> bytes:
+    students, next_cursor = PrincipalRepository(db).get_students_page(10**9, class_name=CLASS_NAME)
+    return orjson.dumps({"items": students, "next_cursor": next_cursor}, default=_default)
+
+
+PATHS = {
+    "ORM + pydantic         ": orm_pydantic_body,
+    "records + orjson (fast)": fast_path_body,
+}
+
+
+def create_students(rows: int):
+    db = SessionLocal()
+    try:
+        db.execute(insert(Student), [
+            {
+                "user_id": f"benchlist-{i:06d}",
+                "student_name": f"Bench Student {i}",
+                "student_email": f"benchlist-{i:06d}@bench.invalid",
+                "student_class_name": CLASS_NAME,
+                "student_gender": "Female" if i % 2 else "Male",
+                "student_date_of_birth": datetime.date(2012, 1, 1) + datetime.timedelta(days=i % 365),
+                "student_roll_no": i,
+                "student_father_name": "Father",
+                "student_mother_name": "Mother",
+                "student_admission_date": datetime.date(2020, 6, 1),
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def drop_students():
+    db = SessionLocal()
+    try:
+        db.execute(delete(Student).where(Student.student_class_name == CLASS_NAME))
+        db.commit()
+    finally:
+        db.close()
+
+
+def measure(build, repeat: int) -> tuple[float, int, int]:
+    """Median CPU seconds, peak traced bytes and body size of one response"""
+    cpu = []
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            started = time.process_time()
+            body = build(db)
+            cpu.append(time.process_time() - started)
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        build(db)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return statistics.median(cpu), peak, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    create_students(args.rows)
+    try:
+        print(f"{args.rows} students, per 10k rows")
+        for name, build in PATHS.items():
+            cpu, peak, size = measure(build, args.repeat)
+            scale = 10000 / args.rows
+            print(f"{name}: CPU {cpu * scale * 1000:8.1f} ms  peak memory {peak * scale / 2**20:7.1f} MiB  body {size} bytes")
+    finally:
+        drop_students()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Messages per second against the local SMTP stand-in: a new connection and
+login per email (the old send_email_smtp) versus SMTPConnectionPool batches.
+
+    python -m scripts.benchmark_smtp_pool --messages 500 --batch 50
+"""
+import argparse
+import smtplib
+import time
+from core.mail import SMTPConnectionPool, build_email_message
+from scripts.local_smtp_server import RecordingHandler, start_server
+
+
+def send_unpooled(port: int, messages) -> None:
+    for msg in messages:
+        with smtplib.SMTP("127.0.0.1", port, timeout=30) as server:
+            server.login("bench", "bench")
+            server.send_message(msg)
+
+
+def send_pooled(pool: SMTPConnectionPool, messages, batch: int) -> None:
+    for start in range(0, len(messages), batch):
+        results = pool.send_messages(messages[start:start + batch])
+        if not all(result.sent for result in results):
+            raise RuntimeError("benchmark message was not accepted")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    handler = RecordingHandler()
+    controller = start_server(handler)
+    messages = [
+        build_email_message(f"user{i}@example.com", "Benchmark", "<p>hello</p>") for i in range(args.messages)
+    ]
+    try:
+        started = time.perf_counter()
+        send_unpooled(controller.port, messages)
+        unpooled = time.perf_counter() - started
+
+        pool = SMTPConnectionPool("127.0.0.1", controller.port, "bench", "bench", starttls=False)
+        started = time.perf_counter()
+        send_pooled(pool, messages, args.batch)
+        pooled = time.perf_counter() - started
+        pool.close()
+    finally:
+        controller.stop()
+
+    print(f"connection per message: {args.messages / unpooled:8.1f} msg/s  ({args.messages} connections)")
+    print(f"pooled, batch {args.batch:<4}     : {args.messages / pooled:8.1f} msg/s  ({pool.connects} connections)")
+    print("Over TLS to a remote server the handshake, and so the gap, is far larger.")
+
+
+if __name__ == "__main__":
+    main()
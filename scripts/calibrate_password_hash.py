@@ -0,0 +1,89 @@
+"""
+Pick a password hash work factor for this host.
+
+    python -m scripts.calibrate_password_hash --scheme bcrypt --target-ms 250
+    python -m scripts.calibrate_password_hash --scheme argon2 --target-ms 250 --memory-kib 65536
+
+Hashes a sample password at increasing cost and prints the settings for
+the most expensive cost that still fits the latency budget. Copy them into
+.env; existing hashes are upgraded on each user's next login.
+"""
+import argparse
+import statistics
+import time
+
+SAMPLE_PASSWORD = "calibration-Password-123"
+
+
+def measure_ms(handler, samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        handler.hash(SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int) -> dict:
+    from passlib.hash import bcrypt
+
+    chosen = None
+    for rounds in range(10, 18):
+        elapsed = measure_ms(bcrypt.using(rounds=rounds), samples)
+        print(f"bcrypt rounds={rounds}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    if chosen is None:
+        print("Even 10 rounds exceed the budget; keeping the minimum.")
+        chosen = 10
+    return {"PASSWORD_HASH_SCHEME": "bcrypt", "BCRYPT_ROUNDS": chosen}
+
+
+def calibrate_argon2(target_ms: float, samples: int, memory_kib: int, parallelism: int) -> dict:
+    from passlib.hash import argon2
+
+    # Memory hardness comes first: shrink memory until one pass fits, then add passes
+    while memory_kib > 8192:
+        handler = argon2.using(time_cost=1, memory_cost=memory_kib, parallelism=parallelism)
+        if measure_ms(handler, samples) <= target_ms:
+            break
+        memory_kib //= 2
+
+    chosen = 1
+    for time_cost in range(1, 11):
+        handler = argon2.using(time_cost=time_cost, memory_cost=memory_kib, parallelism=parallelism)
+        elapsed = measure_ms(handler, samples)
+        print(f"argon2 memory={memory_kib}KiB time_cost={time_cost}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = time_cost
+    return {
+        "PASSWORD_HASH_SCHEME": "argon2",
+        "ARGON2_TIME_COST": chosen,
+        "ARGON2_MEMORY_COST": memory_kib,
+        "ARGON2_PARALLELISM": parallelism,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250, help="latency budget per hash")
+    parser.add_argument("--samples", type=int, default=3, help="hashes measured per cost step")
+    parser.add_argument("--memory-kib", type=int, default=65536, help="argon2 starting memory cost")
+    parser.add_argument("--parallelism", type=int, default=1, help="argon2 lanes")
+    args = parser.parse_args()
+
+    if args.scheme == "bcrypt":
+        recommended = calibrate_bcrypt(args.target_ms, args.samples)
+    else:
+        recommended = calibrate_argon2(args.target_ms, args.samples, args.memory_kib, args.parallelism)
+
+    print("\nRecommended settings:")
+    for key, value in recommended.items():
+        print(f"{key}={value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+EXPLAIN the hot repository queries and fail when one needs a full table scan.
+
+    python -m scripts.check_query_plans                      # migrated scratch SQLite database
+    python -m scripts.check_query_plans --database-url URL   # an already migrated SQLite/MySQL database
+
+Without --database-url the migrations are applied to a temporary SQLite
+file first, so the check covers the schema exactly as Alembic builds it.
+Exits with status 1 when any plan contains a full scan.
+"""
+import argparse
+import datetime
+import itertools
+import os
+import sys
+import tempfile
+from sqlalchemy import create_engine
+from repositories.principal_repository import (
+    _collection_version_stmt,
+    _principal_fields_stmt,
+    _principal_user_stmt,
+    _students_page_stmt,
+    _teachers_page_stmt,
+    _user_with_principal_stmt,
+)
+from repositories.task_repository import _due_tasks_stmt
+from repositories.teacher_respository import (
+    _class_attendance_stmt,
+    _exam_schedule_stmt,
+    _exam_schedule_version_stmt,
+    _existing_attendance_stmt,
+    _teacher_by_email_stmt,
+)
+
+TODAY = datetime.date(2026, 1, 1)
+LIMIT = 51
+
+
+def _filter_combinations(**options) -> list[tuple[str, dict]]:
+    """Every subset of the given filters, named like "class_name+gender" ("no filters" when empty)."""
+    combinations = []
+    for size in range(len(options) + 1):
+        for names in itertools.combinations(options, size):
+            combinations.append(("+".join(names) or "no filters", {name: options[name] for name in names}))
+    return combinations
+
+
+def hot_queries() -> dict:
+    """
+    The repositories' own statement builders with sample parameters, so the
+    check follows the code it guards. Page builders are checked with every
+    combination of their filters.
+    """
+    queries = {
+        "login: principal by email": _principal_user_stmt(user_email="a@example.com"),
+        "identity: user with principal by email": _user_with_principal_stmt("a@example.com"),
+        "principal profile fields": _principal_fields_stmt("u1", ("principal_name", "principal_email")),
+        "teacher by email": _teacher_by_email_stmt("a@example.com"),
+        "existing attendance of a day": _existing_attendance_stmt(TODAY, ["u1", "u2"]),
+        "attendance of a class on a day": _class_attendance_stmt("10A", TODAY),
+        "exam schedule version": _exam_schedule_version_stmt(),
+        "exam schedule of a class": _exam_schedule_stmt("10A"),
+        "due background tasks": _due_tasks_stmt(datetime.datetime(2026, 1, 1), 10),
+    }
+    for collection in ("principal_profile", "students", "teachers"):
+        queries[f"collection version: {collection}"] = _collection_version_stmt(collection)
+    for name, filters in _filter_combinations(after_user_id="cursor", class_name="10A", gender="Female"):
+        queries[f"teachers page: {name}"] = _teachers_page_stmt(LIMIT, **filters)
+    for name, filters in _filter_combinations(
+        after_user_id="cursor", class_name="10A", gender="Female", admitted_from=TODAY, admitted_to=TODAY
+    ):
+        queries[f"students page: {name}"] = _students_page_stmt(LIMIT, **filters)
+    return queries
+
+
+def explain(connection, stmt) -> tuple[list[str], list[str]]:
+    """Returns (plan lines, full scan lines) for the connection's dialect."""
+    dialect = connection.dialect.name
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if dialect == "sqlite":
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).all()
+        plan = [row[-1] for row in rows]
+        # "SCAN t" without an index is a full scan; "SEARCH" and "SCAN t USING INDEX" are not
+        scans = [line for line in plan if line.startswith("SCAN") and " USING " not in line]
+    elif dialect == "mysql":
+        rows = connection.exec_driver_sql(f"EXPLAIN {compiled}", params).mappings().all()
+        plan = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']}" for row in rows]
+        scans = [line for line, row in zip(plan, rows) if row["type"] == "ALL"]
+    else:
+        raise SystemExit(f"Unsupported dialect for plan checks: {dialect}")
+    return plan, scans
+
+
+def migrated_sqlite_url(directory: str) -> str:
+    from alembic import command
+    from alembic.config import Config
+
+    url = f"sqlite:///{os.path.join(directory, 'plans.db')}"
+    config = Config(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    return url
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="migrated database to check instead of a scratch SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or migrated_sqlite_url(directory)
+        engine = create_engine(url)
+        failures = 0
+        with engine.connect() as connection:
+            for name, stmt in hot_queries().items():
+                plan, scans = explain(connection, stmt)
+                print(f"{'FULL SCAN' if scans else 'ok':>9}  {name}")
+                for line in plan:
+                    print(f"           {line}")
+                failures += bool(scans)
+        engine.dispose()
+
+    if failures:
+        print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} with a full table scan")
+        return 1
+    print("\nNo full table scans")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Measure cold start and fail when it exceeds a budget.
+
+    python -m scripts.check_startup_time
+    python -m scripts.check_startup_time --import-budget-ms 1500 --first-request-budget-ms 200 --runs 5
+
+Each run starts a fresh interpreter, times `import main`, then times the
+first request through the full ASGI middleware stack (no server or HTTP
+client involved). It also fails when one of the optional heavy modules,
+which should only load on the code path that needs them, was imported at
+startup. Needs the same environment (.env) as the app.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Loaded on demand by QR rendering, image upload, mail, hashing and JWT handling
+LAZY_MODULES = (
+    "jose",
+    "passlib",
+    "bcrypt",
+    "argon2",
+    "pyotp",
+    "qrcode",
+    "PIL",
+    "cloudinary",
+    "aiofiles",
+    "smtplib",
+    "alembic",
+)
+
+CHILD = r"""
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+import main
+import_ms = (time.perf_counter() - started) * 1000
+loaded = [name for name in LAZY_MODULES if name in sys.modules]
+
+async def first_request(path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+    }
+    await main.app(scope, receive, send)
+    return messages[0]["status"]
+
+started = time.perf_counter()
+status = asyncio.run(first_request(PATH))
+first_request_ms = (time.perf_counter() - started) * 1000
+print(json.dumps({"import_ms": import_ms, "first_request_ms": first_request_ms, "status": status, "loaded": loaded}))
+"""
+
+
+def measure_once(path: str) -> dict:
+    code = f"LAZY_MODULES = {LAZY_MODULES!r}\nPATH = {path!r}\n{CHILD}"
+    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=project_root, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--import-budget-ms", type=float, default=2000)
+    parser.add_argument("--first-request-budget-ms", type=float, default=300)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters; the median is compared")
+    parser.add_argument("--path", default="/docs", help="route used for the first request")
+    args = parser.parse_args()
+
+    runs = [measure_once(args.path) for _ in range(args.runs)]
+    import_ms = statistics.median(run["import_ms"] for run in runs)
+    first_request_ms = statistics.median(run["first_request_ms"] for run in runs)
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+
+    print(f"import main:    {import_ms:8.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"first request:  {first_request_ms:8.1f} ms (budget {args.first_request_budget_ms:.0f} ms, "
+          f"GET {args.path} -> {runs[0]['status']})")
+
+    failed = False
+    if import_ms > args.import_budget_ms:
+        print("FAIL: import main is over budget")
+        failed = True
+    if first_request_ms > args.first_request_budget_ms:
+        print("FAIL: first request is over budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: loaded at startup but should be lazy: {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Local SMTP stand-in for development, tests and benchmarks (needs aiosmtpd).
+
+    python -m scripts.local_smtp_server --port 8025
+
+Point the app at it with SMTP_HOST=127.0.0.1 SMTP_PORT=8025 SMTP_STARTTLS=false.
+Any login is accepted; messages are counted (and printed when run directly).
+Recipients listed in --refuse get a 550 reply; a message to one of
+`close_on` gets a 421 that ends the session.
+"""
+import argparse
+import socket
+import time
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps the accepted messages and refuses chosen recipients."""
+
+    def __init__(self, refuse=(), verbose: bool = False):
+        self.refuse = set(refuse)
+        self.close_on = set()
+        self.verbose = verbose
+        self.messages = []
+        self.sessions = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.refuse:
+            return "550 5.1.1 Mailbox unavailable"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.close_on.intersection(envelope.rcpt_tos):
+            return "421 4.3.0 Closing connection"
+        self.messages.append(envelope.content)
+        if self.verbose:
+            print(f"{envelope.mail_from} -> {', '.join(envelope.rcpt_tos)} ({len(envelope.content)} bytes)")
+        return "250 Message accepted"
+
+
+def _accept_any_login(server, session, envelope, mechanism, auth_data):
+    from aiosmtpd.smtp import AuthResult
+
+    return AuthResult(success=True)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(handler: RecordingHandler, port: int | None = None):
+    """Start the server on a background thread; call .stop() on the result."""
+    from aiosmtpd.controller import Controller
+
+    controller = Controller(
+        handler,
+        hostname="127.0.0.1",
+        port=port or free_port(),
+        authenticator=_accept_any_login,
+        auth_require_tls=False,
+    )
+    controller.start()
+    return controller
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--refuse", nargs="*", default=[])
+    args = parser.parse_args()
+
+    controller = start_server(RecordingHandler(args.refuse, verbose=True), args.port)
+    print(f"SMTP stand-in listening on 127.0.0.1:{args.port}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
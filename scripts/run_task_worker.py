@@ -0,0 +1,11 @@
+"""
+Run the background task worker.
+
+    python -m scripts.run_task_worker
+"""
+import core.mail  # noqa: F401 -- registers the email tasks
+from core.tasks import TaskWorker
+
+
+if __name__ == "__main__":
+    TaskWorker().run()
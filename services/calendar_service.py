@@ -0,0 +1,129 @@
+import datetime
+from urllib.parse import quote
+from fastapi import HTTPException, status
+
+from config import settings
+from core.ical import exam_events, feed_cache, render_calendar, timetable_events
+from core.identity_cache import CurrentUser
+from core.security import create_access_token, decode_access_token
+from repositories.teacher_respository import TeacherRepository
+from repositories.timetable_repository import Timetable, get_timetable
+
+
+def teacher_feed_name(teacher_id: str) -> str:
+    return f"teachers/{teacher_id}"
+
+
+def class_exam_feed_name(class_name: str) -> str:
+    return f"classes/{class_name}/exams"
+
+
+def build_feed_link(user: CurrentUser, feed: str, version: int) -> str:
+    """
+    Subscription URL for one feed, signed for one user. Calendar apps cannot
+    send a bearer token, so the token travels in the URL. It does not expire
+    (a subscription has no way to re-issue it) but carries the user's feed
+    version, so rotating the version revokes it.
+    """
+    token = create_access_token({
+        "sub": user.user_email,
+        "user_id": user.user_id,
+        "purpose": "calendar_feed",
+        "feed": feed,
+        "ver": version,
+    })
+    return f"{settings.BACKEND_URL}/calendar/{quote(feed)}.ics?token={token}"
+
+
+class CalendarService:
+    """iCalendar feeds, rendered once per data version and then served from feed_cache."""
+
+    def __init__(self, repo: TeacherRepository, timetable: Timetable | None = None):
+        self.repo = repo
+        self.timetable = timetable or get_timetable()
+
+    def feed_token_allows(self, token: str | None, feed: str) -> bool:
+        """The token was issued for this feed and its user has not rotated their feed URLs since"""
+        claims = decode_access_token(token) if token else None
+        if not claims or claims.get("purpose") != "calendar_feed" or claims.get("feed") != feed:
+            return False
+        version = self.repo.get_calendar_feed_version(claims.get("user_id"))
+        return version is not None and claims.get("ver") == version
+
+    def feed_links(self, user: CurrentUser) -> dict:
+        """The calendar feeds this user may subscribe to, as signed URLs"""
+        version = self.repo.get_calendar_feed_version(user.user_id)
+        if version is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        role = user.user_role.lower()
+        timetable = None
+        if role == "teacher" and self.timetable.index.teacher_week(user.user_id):
+            timetable = build_feed_link(user, teacher_feed_name(user.user_id), version)
+        return {
+            "timetable": timetable,
+            "exams": {
+                class_name: build_feed_link(user, class_exam_feed_name(class_name), version)
+                for class_name in self.repo.get_calendar_class_names(user.user_id, role)
+            },
+        }
+
+    def rotate_feed_links(self, user: CurrentUser) -> dict:
+        """Revoke every feed URL issued to the user and return fresh ones"""
+        if self.repo.rotate_calendar_feed_version(user.user_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to rotate feed links"
+            )
+        return self.feed_links(user)
+
+    def teacher_timetable_feed(self, teacher_id: str) -> tuple[bytes, str]:
+        try:
+            index = self.timetable.index
+            periods = index.teacher_week(teacher_id)
+            if not periods:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="No timetable found for this teacher"
+                )
+            stamp = datetime.datetime.fromtimestamp(index.mtime or 0, datetime.timezone.utc)
+            # The timetable file's mtime is the version: one render per reload
+            return feed_cache.get(
+                ("teacher", teacher_id),
+                index.mtime,
+                lambda: render_calendar(
+                    f"Timetable {teacher_id}",
+                    timetable_events(periods, settings.TIMETABLE_ANCHOR_DATE),
+                    stamp,
+                ),
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            )
+
+    def class_exam_feed(self, class_name: str) -> tuple[bytes, str]:
+        try:
+            version = self.repo.get_exam_schedule_version()
+
+            def render():
+                rows = self.repo.get_exam_schedule_for_class(class_name)
+                return render_calendar(
+                    f"Exams {class_name}",
+                    exam_events(rows),
+                    datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+                )
+
+            return feed_cache.get(("class_exams", class_name), version, render)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            )
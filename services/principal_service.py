@@ -1,26 +1,35 @@
 from fastapi import HTTPException, status
-import pyotp
-from datetime import datetime, timedelta
-from jose import JWTError
-
-from repositories.principal_repository import PrincipalRepository
-from core.security import verify_password, create_access_token, hash_password , decode_access_token
-from core.mail import send_reset_password_email, send_welcome_email, send_principal_welcome_email
-from schemas.principal_schema import PrincipalCreateRequest
+import csv
+import io
+import json
+
+from repositories.principal_repository import AsyncPrincipalRepository
+from repositories.task_repository import AsyncTaskRepository
+from core.security import verify_and_update_password_async, create_access_token, hash_password_async, decode_access_token
+from core.security import create_preauth_ticket, decode_preauth_ticket, verify_otp_once, revoke_access_token
+from core.security import create_reset_password_token, record_preauth_otp_failure
+from schemas.principal_schema import PrincipalCreateRequest, StudentsOut, ExportFormat
 from core.security import generate_secret
+from core.totp_qr import QR_IMAGE_FORMATS, decode_totp_qr_token, get_totp_qr_image
+
+
+# Rows encoded per chunk handed to the streaming response
+EXPORT_CHUNK_ROWS = 500
 
 
 class PrincipalService:
-    def __init__(self, repo: PrincipalRepository):
+    def __init__(self, repo: AsyncPrincipalRepository):
         self.repo = repo
+        # Slow side work (SMTP, QR rendering) is queued and run by the task worker
+        self.tasks = AsyncTaskRepository(repo.db)
         
         
     """ Authenticate principal with email/password and optionally OTP if TOTP is enabled.
             Returns JWT token or TOTP setup info. """
-    def principal_login(self, email: str, password: str, otp_code: str = None):
+    async def principal_login(self, email: str, password: str, otp_code: str = None):
         try:
             # 1. Fetch user by email
-            user = self.repo.get_principal_by_email(email)
+            user = await self.repo.get_principal_by_email(email)
             # Check user existence
             if not user:
                 raise HTTPException(
@@ -28,42 +37,66 @@ class PrincipalService:
                     detail="Invalid email or password"
                 )
             # 2. Verify password
-            if not verify_password(password, user.user_password):
+            is_valid, new_hash = await verify_and_update_password_async(password, user.user_password)
+            if not is_valid:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Invalid email or password"
                 )
+            # Stored hash uses an outdated scheme or cost: upgrade it transparently
+            if new_hash:
+                await self.repo.update_password(user.user_id, new_hash)
             # 3. Check if TOTP is enabled
-            if user.user_totp_secret:
-                # TOTP is enabled → OTP required
-                if not otp_code:
-                    # Inform frontend that OTP is required
-                    return {
-                        "totp_required": True,
-                        "message": "TOTP is enabled. OTP code required."
-                    }
-                # 4. Verify OTP
-                totp = pyotp.TOTP(user.user_totp_secret)
-                if not totp.verify(otp_code):
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Invalid OTP"
-                    )
-            if not user.user_totp_secret:
+            if not user.totp_secret:
                 return {
                     "totp_required": False,
                     "message": "TOTP is not enabled for this user."
                 }
-            # 5. Generate JWT token
-            token = create_access_token(
-                {"sub": user.user_email, "role": user.user_role}
+            if not otp_code:
+                # Password checked: hand out a pre-auth ticket so the OTP step
+                # (/login/verify_otp) does not run the password hash again
+                return {
+                    "totp_required": True,
+                    "preauth_ticket": create_preauth_ticket(user),
+                    "message": "TOTP is enabled. OTP code required."
+                }
+            # 4. Verify OTP and return the token
+            return self._issue_token_after_otp(user, otp_code)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}"
             )
-            # 6. Return success response
-            return {
-                "totp_required": False,
-                "access_token": token,
-                "token_type": "bearer"
-            }
+
+    """ Second login step: check the OTP against a pre-auth ticket issued by principal_login. """
+    async def verify_login_otp(self, preauth_ticket: str, otp_code: str):
+        try:
+            claims = decode_preauth_ticket(preauth_ticket)
+            if not claims:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired login ticket"
+                )
+            user = await self.repo.get_principal_by_email(claims["sub"])
+            if not user or user.user_id != claims.get("user_id") or not user.totp_secret:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired login ticket"
+                )
+            try:
+                token_data = self._issue_token_after_otp(user, otp_code)
+            except HTTPException:
+                if record_preauth_otp_failure(preauth_ticket, claims):
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Too many invalid OTP codes; log in again"
+                    )
+                raise
+            # A ticket completes one login only
+            revoke_access_token(preauth_ticket)
+            return token_data
         except HTTPException:
             raise
         except Exception as e:
@@ -72,25 +105,36 @@ class PrincipalService:
                 detail=f"Internal server error: {str(e)}"
             )
 
-    def send_forget_password_email(self, email: str):
+    def _issue_token_after_otp(self, user, otp_code: str):
+        if not verify_otp_once(user.user_id, user.totp_secret, otp_code):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid OTP"
+            )
+        token = create_access_token(
+            {"sub": user.user_email, "role": user.user_role}
+        )
+        return {
+            "totp_required": False,
+            "access_token": token,
+            "token_type": "bearer"
+        }
+
+    async def send_forget_password_email(self, email: str):
         try:
-            user = self.repo.get_principal_by_email(email)
+            user = await self.repo.get_principal_by_email(email)
             if not user:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Invalid Email Address"
                 )
             # Create token
-            token = create_access_token({
-                "user_id": user.user_id,
-                "email": user.user_email,
-                "exp": datetime.utcnow() + timedelta(minutes=30)
-            })
-            # Send email
-            send_reset_password_email(
-                user.user_email,
-                user.user_name,
-                token
+            token = create_reset_password_token(user.user_id, user.user_email)
+            # Queue the email
+            await self.tasks.enqueue(
+                "send_reset_password_email",
+                to_email=user.user_email,
+                reset_token=token,
             )
             return {"message": "Reset password link sent successfully"}
         except HTTPException:
@@ -101,29 +145,30 @@ class PrincipalService:
                 detail=f"Failed to send reset link: {e}"
             )
 
-    def reset_password(self, token: str, new_password: str):
+    async def reset_password(self, token: str, new_password: str):
         try:
             # Decode token
             decoded = decode_access_token(token)
+            # Only reset tokens carry this purpose; pre-auth tickets also have a user_id
+            if not decoded or decoded.get("purpose") != "reset_password":
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid token"
+                )
             user_id = decoded.get("user_id")
             if not user_id:
                 raise HTTPException(
                     status_code=400,
                     detail="Invalid token"
                 )
-            hashed = hash_password(new_password)
-            updated_user = self.repo.update_password(user_id, hashed)
+            hashed = await hash_password_async(new_password)
+            updated_user = await self.repo.update_password(user_id, hashed)
             if not updated_user:
                 raise HTTPException(
                     status_code=404,
                     detail="User not found"
                 )
             return {"message": "Password updated successfully"}
-        except JWTError:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid or expired token"
-            )
         except HTTPException:
             raise
         except Exception as e:
@@ -132,9 +177,12 @@ class PrincipalService:
                 detail=f"Failed to reset password: {e}"
             )
     
-    def fetch_principal_profile(self, user_id: int):
+    async def fetch_principal_profile(self, user_id: str, fields: tuple[str, ...] | None = None):
         try:
-            principal = self.repo.get_principal_by_user_id(user_id)
+            if fields:
+                principal = await self.repo.get_principal_fields(user_id, fields)
+            else:
+                principal = await self.repo.get_principal_by_user_id(user_id)
             if not principal:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
@@ -149,7 +197,7 @@ class PrincipalService:
                 detail=f"Internal server error: {str(e)}",
             )
 
-    def principal_add_user(self, payload: PrincipalCreateRequest):
+    async def principal_add_user(self, payload: PrincipalCreateRequest):
         try:
             user_name = payload.user_name
             user_email = payload.user_email
@@ -160,24 +208,54 @@ class PrincipalService:
             totp_secret = generate_secret()
             
             # Hash password if not already hashed
-            hashed_password = hash_password(password)
+            hashed_password = await hash_password_async(password)
 
-            # Add user in User table
-            user = self.repo.add_user(user_name, user_email, hashed_password, user_role)
+            # User row plus the role-specific row
+            user = self.repo.stage_user_with_role(
+                user_name, user_email, hashed_password, user_role, totp_secret, user_class
+            )
 
-            # Role-specific inserts
-            if user_role.lower() == "teacher":
-                self.repo.add_teacher(user)
-                send_welcome_email(user_email, user_name, password, user_role)
-            elif user_role.lower() == "principal":
-                self.repo.add_principal(user)
-                send_principal_welcome_email(user_email, user_name, password, user_role, totp_secret)
-            elif user_role.lower() == "student":
-                self.repo.add_student(user,user_class)
-                send_welcome_email(user_email, user_name, password, user_role)
+            # No secrets in the stored payload: the worker builds the
+            # set-password (and QR) links when it sends the email
+            welcome_email = {
+                "to_email": user_email,
+                "user_name": user_name,
+                "user_role": user_role,
+                "user_id": user.user_id,
+            }
+            # Welcome emails are sent by the task worker
+            if user_role.lower() == "principal":
+                self.tasks.stage("send_principal_welcome_email", **welcome_email)
+            elif user_role.lower() in ("teacher", "student"):
+                self.tasks.stage("send_welcome_email", **welcome_email)
 
+            # One transaction: no user without its role row or its welcome email
+            return await self.repo.commit_new_user(user)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            )
 
-            return user
+    async def get_totp_qr(self, token: str, image_format: str = "svg") -> tuple[str, bytes, str]:
+        """Returns (digest, image, media type) of the QR code for a signed link from the welcome email."""
+        try:
+            claims = decode_totp_qr_token(token)
+            if not claims:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid or expired QR code link"
+                )
+            user = await self.repo.get_principal_by_email(claims["sub"])
+            if not user or user.user_id != claims.get("user_id") or not user.totp_secret:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="TOTP is not enabled for this user"
+                )
+            digest, image = get_totp_qr_image(user.user_email, user.totp_secret, image_format)
+            return digest, image, QR_IMAGE_FORMATS[image_format][0]
         except HTTPException:
             raise
         except Exception as e:
@@ -186,9 +264,9 @@ class PrincipalService:
                 detail=f"Internal server error: {str(e)}",
             )
 
-    def fetch_all_teachers(self):
+    async def fetch_all_teachers(self):
         try:
-            teachers = self.repo.get_all_teachers()
+            teachers = await self.repo.get_all_teachers()
             return teachers
         except HTTPException:
             raise
@@ -198,9 +276,9 @@ class PrincipalService:
                 detail=f"Internal server error: {str(e)}",
             )
 
-    def fetch_all_students(self):
+    async def fetch_all_students(self):
         try:
-            students = self.repo.get_all_students()
+            students = await self.repo.get_all_students()
             return students
         except HTTPException:
             raise
@@ -210,9 +288,66 @@ class PrincipalService:
                 detail=f"Internal server error: {str(e)}",
             )
 
-    def update_principal_profile(self, payload):
+    async def fetch_teachers_page(self, limit: int, cursor: str | None = None, **filters):
+        try:
+            teachers, next_cursor = await self.repo.get_teachers_page(limit, cursor, **filters)
+            return {"items": teachers, "next_cursor": next_cursor}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            )
+
+    async def fetch_students_page(self, limit: int, cursor: str | None = None, **filters):
+        try:
+            students, next_cursor = await self.repo.get_students_page(limit, cursor, **filters)
+            return {"items": students, "next_cursor": next_cursor}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal server error: {str(e)}",
+            )
+
+    async def export_students(self, export_format: ExportFormat, fields: tuple[str, ...] | None = None):
+        """
+        Async generator of the full student register as NDJSON or CSV text chunks.
+        The field set is the one of StudentsOut, or `fields` when given. The
+        repository session is closed once the generator is exhausted or abandoned.
+        """
+        columns = list(fields or StudentsOut.model_fields)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if export_format == ExportFormat.CSV else None
+        if writer:
+            writer.writerow(columns)
+
+        try:
+            count = 0
+            async for row in self.repo.stream_students(columns):
+                count += 1
+                student = StudentsOut.model_validate(dict(row)).model_dump(mode="json", include=set(columns))
+                if writer:
+                    writer.writerow(student[column] for column in columns)
+                else:
+                    buffer.write(json.dumps(student))
+                    buffer.write("\n")
+
+                if count % EXPORT_CHUNK_ROWS == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+
+            if buffer.tell():
+                yield buffer.getvalue()
+        finally:
+            await self.repo.close()
+
+    async def update_principal_profile(self, user_id: str, payload):
         try:
-            principal_data = self.repo.update_principal_profile(payload)
+            principal_data = await self.repo.update_principal_profile(user_id, payload)
             if not principal_data:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
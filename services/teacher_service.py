@@ -0,0 +1,77 @@
+import datetime
+
+from repositories.teacher_respository import TeacherRepository
+from repositories.assignment_repository import AssignmentLog, get_assignment_log
+from repositories.timetable_repository import Timetable, get_timetable
+from core.security import decode_access_token
+
+
+class TeacherService:
+    def __init__(
+        self,
+        repo: TeacherRepository,
+        assignments: AssignmentLog | None = None,
+        timetable: Timetable | None = None,
+    ):
+        self.repo = repo
+        self.assignments = assignments or get_assignment_log()
+        self.timetable = timetable or get_timetable()
+
+    # -------------------------
+    # Timetable
+    # -------------------------
+    def get_periods_from_stored_json_file(self, token: str) -> list[dict]:
+        """Calendar events of the teacher owning the access token, served from the in-memory timetable"""
+        claims = decode_access_token(token)
+        # Access tokens carry only sub (email) and role; pre-auth, reset and
+        # feed tokens carry a purpose and must not read a timetable
+        if not claims or claims.get("purpose") or not claims.get("sub"):
+            return []
+        user = self.repo.get_user_by_email(claims["sub"])
+        if not user:
+            return []
+        return self.get_teacher_week(user.user_id)
+
+    def get_teacher_week(self, teacher_id: str) -> list[dict]:
+        return [period.data for period in self.timetable.index.teacher_week(teacher_id)]
+
+    def who_is_teaching(self, class_name: str, at: datetime.datetime | None = None) -> dict | None:
+        period = self.timetable.who_is_teaching(class_name, at)
+        return period.data if period else None
+
+    # -------------------------
+    # Assignments
+    # -------------------------
+    def add_assignment(self, data: dict) -> dict:
+        try:
+            assignment = self.assignments.add(data)
+            return {"success": True, "assignment": assignment}
+        except Exception as e:
+            print(f"Error in add_assignment: {e}")
+            return {"success": False, "error": str(e)}
+
+    def get_assignments(self, class_name: str | None = None) -> list[dict]:
+        return self.assignments.list_all(class_name)
+
+    def get_assignments_due(self, start: datetime.date, end: datetime.date, class_name: str | None = None) -> list[dict]:
+        """e.g. assignments due this week for class 10A, answered from the in-memory index"""
+        return self.assignments.due_between(start, end, class_name)
+
+    def update_assignment(self, assignment_id: str, changes: dict) -> dict:
+        try:
+            assignment = self.assignments.update(assignment_id, changes)
+            if assignment is None:
+                return {"success": False, "error": "Assignment not found"}
+            return {"success": True, "assignment": assignment}
+        except Exception as e:
+            print(f"Error in update_assignment: {e}")
+            return {"success": False, "error": str(e)}
+
+    def delete_assignment(self, assignment_id: str) -> dict:
+        try:
+            if not self.assignments.delete(assignment_id):
+                return {"success": False, "error": "Assignment not found"}
+            return {"success": True}
+        except Exception as e:
+            print(f"Error in delete_assignment: {e}")
+            return {"success": False, "error": str(e)}
@@ -0,0 +1,67 @@
+# tests/conftest.py
+import os
+import tempfile
+
+# Settings() is built at import time, so the environment is set before any app module loads
+TEST_ROOT = tempfile.mkdtemp(prefix="school-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{TEST_ROOT}/test.db",
+    "JWT_SECRET": "test-secret",
+    "SMTP_EMAIL": "noreply@example.com",
+    "SMTP_PASSWORD": "test",
+    # Cheapest costs each scheme accepts; tests check behaviour, not strength
+    "BCRYPT_ROUNDS": "4",
+    "ARGON2_TIME_COST": "1",
+    "ARGON2_MEMORY_COST": "1024",
+    "BLOB_STORE_BACKEND": "local",
+    "BLOB_LOCAL_ROOT": f"{TEST_ROOT}/blobs",
+    "ASSIGNMENTS_LOG_PATH": f"{TEST_ROOT}/assignments.jsonl",
+    "ASSIGNMENTS_LEGACY_PATH": f"{TEST_ROOT}/assignments.json",
+    "PERIODS_FILE_PATH": f"{TEST_ROOT}/periods.json",
+    "DB_POOL_WARMUP": "0",
+})
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def migrated_db():
+    """The test database at `alembic upgrade head`."""
+    from alembic import command
+    from alembic.config import Config
+
+    command.upgrade(Config("alembic.ini"), "head")
+    return os.environ["DATABASE_URL"]
+
+
+@pytest.fixture(scope="session")
+def principal(migrated_db):
+    """A principal without TOTP: {"user_id", "email", "password", "headers"}."""
+    from core.security import build_pwd_context, create_access_token
+    from database import SessionLocal
+    from repositories.principal_repository import PrincipalRepository
+
+    password = "principal-password"
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Head", "head@example.com", build_pwd_context().hash(password), "Principal", None)
+        repo.add_principal(user)
+        user_id, email = user.user_id, user.user_email
+    finally:
+        repo.db.close()
+    token = create_access_token({"sub": email, "role": "Principal"})
+    return {
+        "user_id": user_id,
+        "email": email,
+        "password": password,
+        "headers": {"Authorization": f"Bearer {token}"},
+    }
+
+
+@pytest.fixture
+def client(migrated_db):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
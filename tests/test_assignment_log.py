@@ -0,0 +1,113 @@
+import json
+import multiprocessing
+import pytest
+import repositories.assignment_repository as assignment_repository
+from repositories.assignment_repository import AssignmentLog
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "assignments.jsonl"), str(tmp_path / "assignments.json")
+
+
+def test_append_waiting_on_a_compaction_lands_in_the_new_file(paths, monkeypatch):
+    log_path, _ = paths
+    writer = AssignmentLog(log_path)
+    compactor = AssignmentLog(log_path)
+    kept = writer.add({"title": "kept"})
+    compactor.delete(writer.add({"title": "superseded"})["assignment_id"])
+    writer._sync()
+
+    flock = assignment_repository.fcntl.flock
+    raced = []
+
+    def flock_after_compaction(f, operation):
+        # Another process compacts between our open() and our flock()
+        if operation == assignment_repository.fcntl.LOCK_EX and not raced:
+            raced.append(True)
+            compactor.compact()
+        return flock(f, operation)
+
+    monkeypatch.setattr(assignment_repository.fcntl, "flock", flock_after_compaction)
+    added = writer.add({"title": "written during compaction"})
+    monkeypatch.setattr(assignment_repository.fcntl, "flock", flock)
+
+    reader = AssignmentLog(log_path)
+    assert raced
+    assert reader.get(added["assignment_id"]) == added
+    assert {a["assignment_id"] for a in reader.list_all()} == {kept["assignment_id"], added["assignment_id"]}
+
+
+def _open_log(log_path, legacy_path, start):
+    start.wait()
+    AssignmentLog(log_path, legacy_path=legacy_path)
+
+
+def test_legacy_file_is_imported_once_by_concurrent_processes(paths):
+    log_path, legacy_path = paths
+    with open(legacy_path, "w") as f:
+        json.dump([{"assignment_id": f"a{i}", "title": f"Homework {i}"} for i in range(50)], f)
+
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    processes = [context.Process(target=_open_log, args=(log_path, legacy_path, start)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    start.set()
+    for process in processes:
+        process.join()
+
+    with open(log_path) as f:
+        assert len(f.readlines()) == 50
+    assert len(AssignmentLog(log_path, legacy_path=legacy_path).list_all()) == 50
+
+
+def _update_fields(log_path, assignment_id, worker, start):
+    log = AssignmentLog(log_path)
+    start.wait()
+    for i in range(25):
+        log.update(assignment_id, {f"w{worker}_{i}": i})
+
+
+def test_concurrent_updates_from_processes_are_all_kept(paths):
+    log_path, _ = paths
+    assignment_id = AssignmentLog(log_path).add({"title": "Shared"})["assignment_id"]
+
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    processes = [
+        context.Process(target=_update_fields, args=(log_path, assignment_id, worker, start))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    start.set()
+    for process in processes:
+        process.join()
+
+    assignment = AssignmentLog(log_path).get(assignment_id)
+    assert {key for key in assignment if key.startswith("w")} == {f"w{w}_{i}" for w in range(4) for i in range(25)}
+
+
+def test_delete_of_an_assignment_deleted_elsewhere_reports_missing(paths):
+    log_path, _ = paths
+    first, second = AssignmentLog(log_path), AssignmentLog(log_path)
+    assignment_id = first.add({"title": "Twice"})["assignment_id"]
+    second._sync()
+
+    assert first.delete(assignment_id) is True
+    assert second.delete(assignment_id) is False
+    assert second.update(assignment_id, {"title": "Gone"}) is None
+    with open(log_path) as f:
+        assert len(f.readlines()) == 2
+
+
+def test_legacy_file_is_not_reimported_after_compaction_empties_the_log(paths):
+    log_path, legacy_path = paths
+    with open(legacy_path, "w") as f:
+        json.dump([{"assignment_id": "a1", "title": "Homework"}], f)
+    log = AssignmentLog(log_path, legacy_path=legacy_path)
+    log.delete("a1")
+    log.compact()
+
+    assert AssignmentLog(log_path, legacy_path=legacy_path).list_all() == []
@@ -0,0 +1,166 @@
+import datetime
+
+import pytest
+from sqlalchemy import event, select
+
+import repositories.teacher_respository as teacher_repository
+from database import SessionLocal
+from models.student import AttendanceStatus, StudentsAttendance
+from repositories.teacher_respository import TeacherRepository
+
+
+def roster(day: str, statuses: dict) -> dict:
+    return {
+        "class_name": "5B",
+        "date": day,
+        "attendance": [
+            {"user_id": user_id, "user_name": user_id.title(), "status": status}
+            for user_id, status in statuses.items()
+        ],
+    }
+
+
+def stored(day: str) -> dict:
+    db = SessionLocal()
+    try:
+        rows = db.scalars(
+            select(StudentsAttendance).where(StudentsAttendance.attendance_date == datetime.date.fromisoformat(day))
+        )
+        return {row.user_id: row.attendance_status for row in rows}
+    finally:
+        db.close()
+
+
+def submit(data: dict, method: str = "submit_students_attendance_in_db") -> tuple[dict, int]:
+    """Result of the submission and the number of statements it sent"""
+    repo = TeacherRepository(SessionLocal())
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    bind = repo.db.get_bind()
+    event.listen(bind, "before_cursor_execute", count)
+    try:
+        return getattr(repo, method)(data), len(statements)
+    finally:
+        event.remove(bind, "before_cursor_execute", count)
+        repo.db.close()
+
+
+@pytest.fixture(params=["native", "fallback"])
+def upsert_path(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(TeacherRepository, "_attendance_upsert_statement", lambda self: None)
+    return request.param
+
+
+def test_resubmission_inserts_new_and_updates_existing_rows(migrated_db, upsert_path):
+    day = "2026-03-02" if upsert_path == "native" else "2026-03-03"
+    first, _ = submit(roster(day, {"ann": "Present", "ben": "Absent"}))
+    second, _ = submit(roster(day, {"ann": "Absent", "ben": "Present", "cal": "Present"}))
+
+    assert first == {"success": True, "inserted": 2, "updated": 0}
+    assert second == {"success": True, "inserted": 1, "updated": 2}
+    assert stored(day) == {
+        "ann": AttendanceStatus.Absent,
+        "ben": AttendanceStatus.Present,
+        "cal": AttendanceStatus.Present,
+    }
+
+
+def test_last_entry_wins_for_a_student_listed_twice(migrated_db):
+    data = roster("2026-03-04", {"dan": "Present"})
+    data["attendance"].append({"user_id": "dan", "user_name": "Dan", "status": "Absent"})
+
+    assert submit(data)[0] == {"success": True, "inserted": 1, "updated": 0}
+    assert stored("2026-03-04") == {"dan": AttendanceStatus.Absent}
+
+
+def test_roster_is_one_select_and_one_upsert_per_batch(migrated_db, monkeypatch):
+    statuses = {f"s{i:02d}": "Present" for i in range(5)}
+    _, statements = submit(roster("2026-03-05", statuses))
+    assert statements == 2
+
+    monkeypatch.setattr(teacher_repository, "ATTENDANCE_BATCH_SIZE", 2)
+    result, statements = submit(roster("2026-03-05", {**statuses, "s05": "Absent"}))
+    assert result == {"success": True, "inserted": 1, "updated": 5}
+    assert statements == 3 + 3   # ceil(6 / 2) key lookups and upserts
+    assert len(stored("2026-03-05")) == 6
+
+
+def correct(data: dict) -> tuple[dict, int]:
+    return submit(data, "submit_modified_attendance_in_db")
+
+
+def test_corrections_report_updated_and_missing_rows(migrated_db):
+    submit(roster("2026-04-01", {"ann": "Present", "ben": "Present"}))
+    result, statements = correct({
+        "date": "2026-04-01",
+        "attendance": [{"user_id": "ann", "status": "Absent"}, {"user_id": "zed", "status": "Absent"}],
+    })
+
+    assert result == {
+        "success": True,
+        "updated": 1,
+        "missing": 1,
+        "results": [
+            {"user_id": "ann", "date": "2026-04-01", "result": "updated"},
+            {"user_id": "zed", "date": "2026-04-01", "result": "missing"},
+        ],
+    }
+    assert statements == 2   # one key lookup and one executemany UPDATE
+    # A correction never creates a row
+    assert stored("2026-04-01") == {"ann": AttendanceStatus.Absent, "ben": AttendanceStatus.Present}
+
+
+def test_corrections_are_grouped_by_their_own_date(migrated_db):
+    submit(roster("2026-04-02", {"ann": "Present", "ben": "Present"}))
+    submit(roster("2026-04-03", {"ann": "Present", "ben": "Present"}))
+    result, statements = correct({
+        "date": "2026-04-02",
+        "attendance": [
+            {"user_id": "ann", "status": "Absent"},
+            {"user_id": "ben", "status": "Absent", "date": "2026-04-03"},
+            {"user_id": "ann", "status": "Absent", "date": "2026-04-03"},
+            {"user_id": "cal", "status": "Absent", "date": "2026-04-03"},
+            {"user_id": "ann", "status": "Present", "date": "2026-04-03"},   # last entry wins
+        ],
+    })
+
+    assert (result["updated"], result["missing"]) == (3, 1)
+    assert [(row["user_id"], row["date"], row["result"]) for row in result["results"]] == [
+        ("ann", "2026-04-02", "updated"),
+        ("ben", "2026-04-03", "updated"),
+        ("ann", "2026-04-03", "updated"),
+        ("cal", "2026-04-03", "missing"),
+    ]
+    assert statements == 2 * 2   # a key lookup and an UPDATE per date
+    assert stored("2026-04-02") == {"ann": AttendanceStatus.Absent, "ben": AttendanceStatus.Present}
+    assert stored("2026-04-03") == {"ann": AttendanceStatus.Present, "ben": AttendanceStatus.Absent}
+
+
+def test_corrections_are_batched_per_date(migrated_db, monkeypatch):
+    statuses = {f"c{i:02d}": "Present" for i in range(5)}
+    submit(roster("2026-04-04", statuses))
+
+    monkeypatch.setattr(teacher_repository, "ATTENDANCE_BATCH_SIZE", 2)
+    result, statements = correct({
+        "date": "2026-04-04",
+        "attendance": [{"user_id": user_id, "status": "Absent"} for user_id in [*statuses, "c05"]],
+    })
+
+    assert (result["updated"], result["missing"]) == (5, 1)
+    assert statements == 3 + 3   # ceil(6 / 2) key lookups, ceil(5 / 2) UPDATEs
+    assert set(stored("2026-04-04").values()) == {AttendanceStatus.Absent}
+
+
+def test_a_bad_correction_is_rolled_back(migrated_db):
+    submit(roster("2026-04-05", {"ann": "Present"}))
+    result, _ = correct({
+        "date": "2026-04-05",
+        "attendance": [{"user_id": "ann", "status": "Absent"}, {"user_id": "ben", "status": "Late"}],
+    })
+
+    assert result["success"] is False
+    assert stored("2026-04-05") == {"ann": AttendanceStatus.Present}
@@ -0,0 +1,94 @@
+import datetime
+from urllib.parse import urlsplit
+
+from core.ical import FeedCache
+from database import SessionLocal
+from models.education.exams import ExamSubjectsTable
+from repositories.teacher_respository import TeacherRepository
+
+
+def publish_exam(class_name: str, exam_code: str):
+    repo = TeacherRepository(SessionLocal())
+    try:
+        assert repo.publish_exam_schedules_in_db("Midterm", exam_code, class_name, [{
+            "subject_name": "Maths",
+            "exam_date": datetime.date(2026, 11, 2),
+            "start_time": datetime.time(9, 0),
+            "end_time": datetime.time(11, 0),
+            "marks": 100,
+        }])
+    finally:
+        repo.db.close()
+
+
+def feed_path(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}"
+
+
+def test_feeds_require_a_token_for_that_feed(client, principal):
+    publish_exam("9Z", "FEED-9Z")
+    links = client.get("/calendar/feeds", headers=principal["headers"]).json()
+    token = urlsplit(links["exams"]["9Z"]).query
+
+    assert client.get("/calendar/classes/9Z/exams.ics").status_code == 401
+    assert client.get("/calendar/classes/9Z/exams.ics?token=forged").status_code == 401
+    assert client.get(f"/calendar/classes/9Y/exams.ics?{token}").status_code == 401
+    assert client.get(f"/calendar/teachers/9Z.ics?{token}").status_code == 401
+    # An access token is not a feed token
+    access_token = principal["headers"]["Authorization"].split()[1]
+    assert client.get(f"/calendar/classes/9Z/exams.ics?token={access_token}").status_code == 401
+
+    response = client.get(feed_path(links["exams"]["9Z"]))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+
+
+def test_rotating_feed_links_revokes_the_old_ones(client, principal):
+    publish_exam("9W", "FEED-9W")
+    old = feed_path(client.get("/calendar/feeds", headers=principal["headers"]).json()["exams"]["9W"])
+    assert client.get(old).status_code == 200
+
+    rotated = client.post("/calendar/feeds/rotate", headers=principal["headers"])
+    assert rotated.status_code == 200
+    new = feed_path(rotated.json()["exams"]["9W"])
+
+    assert client.get(old).status_code == 401
+    assert client.get(new).status_code == 200
+    assert feed_path(client.get("/calendar/feeds", headers=principal["headers"]).json()["exams"]["9W"]) == new
+
+
+def test_exam_feed_changes_when_an_existing_row_is_edited(client, principal):
+    publish_exam("9X", "FEED-9X")
+    path = feed_path(client.get("/calendar/feeds", headers=principal["headers"]).json()["exams"]["9X"])
+    etag = client.get(path).headers["ETag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    db = SessionLocal()
+    try:
+        db.query(ExamSubjectsTable).filter_by(exam_code="FEED-9X").one().marks = 50
+        db.commit()
+    finally:
+        db.close()
+
+    after = client.get(path, headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert b"50 marks" in after.content
+
+
+def test_feed_cache_is_bounded_lru():
+    cache = FeedCache(max_entries=2)
+    renders = []
+
+    def render(name):
+        return lambda: renders.append(name) or name.encode()
+
+    cache.get("a", 1, render("a"))
+    cache.get("b", 1, render("b"))
+    cache.get("a", 1, render("a"))   # hit, "a" becomes most recent
+    cache.get("c", 1, render("c"))   # evicts "b"
+    cache.get("a", 1, render("a"))
+    cache.get("b", 1, render("b"))
+
+    assert len(cache) == 2
+    assert renders == ["a", "b", "c", "b"]
@@ -0,0 +1,81 @@
+from sqlalchemy import update
+from database import SessionLocal
+from models import Student, Teacher, User
+from repositories.principal_repository import PrincipalRepository, _new_user
+from repositories.teacher_respository import TeacherRepository
+
+
+def version_of(collection: str) -> int:
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        return repo.get_collection_version(collection)[0]
+    finally:
+        repo.db.close()
+
+
+def add_teacher(email: str) -> str:
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Teacher", email, "x", "Teacher", None)
+        repo.add_teacher(user)
+        return user.user_id
+    finally:
+        repo.db.close()
+
+
+def test_profile_update_invalidates_etag_within_the_same_second(client, principal):
+    first = client.get("/principal/profile_details", headers=principal["headers"])
+    etag = first.headers["ETag"]
+    assert client.get(
+        "/principal/profile_details", headers={**principal["headers"], "If-None-Match": etag}
+    ).status_code == 304
+
+    client.put("/principal/update_profile", json={"principal_phone": "555-0100"}, headers=principal["headers"])
+    after = client.get("/principal/profile_details", headers={**principal["headers"], "If-None-Match": etag})
+
+    assert after.status_code == 200
+    assert after.json()["principal_phone"] == "555-0100"
+    assert after.headers["ETag"] != etag
+
+
+def test_teacher_and_student_column_edits_bump_their_collection(migrated_db):
+    user_id = add_teacher("versioned.teacher@example.com")
+    teachers, students = version_of("teachers"), version_of("students")
+
+    assert TeacherRepository(SessionLocal()).update_profile_details_in_db(user_id, {"gender": "Female"})
+    assert version_of("teachers") == teachers + 1
+
+    db = SessionLocal()
+    try:
+        db.execute(update(Student).where(Student.student_class_name == "none").values(student_age=1))
+        db.commit()
+    finally:
+        db.close()
+    assert version_of("students") == students + 1
+    assert version_of("teachers") == teachers + 1
+
+
+def test_rolled_back_write_does_not_bump(migrated_db):
+    before = version_of("teachers")
+    db = SessionLocal()
+    try:
+        user = _new_user("Ghost", "ghost@example.com", "x", "Teacher", None)
+        db.add_all([user, Teacher(user_id=user.user_id, teacher_name="Ghost", teacher_email="ghost@example.com")])
+        db.flush()
+        db.rollback()
+    finally:
+        db.close()
+
+    assert version_of("teachers") == before
+
+
+def test_unrelated_writes_do_not_bump(migrated_db):
+    before = {name: version_of(name) for name in ("teachers", "students", "principal_profile")}
+    db = SessionLocal()
+    try:
+        db.add(User(user_id="plain-user", user_name="Plain", user_email="plain@example.com", user_password="x", user_role="Student"))
+        db.commit()
+    finally:
+        db.close()
+
+    assert {name: version_of(name) for name in before} == before
@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import delete, insert, update
+
+from database import SessionLocal
+from models import Student
+
+CLASS = "6C"
+
+
+@pytest.fixture(scope="module")
+def two_students(migrated_db):
+    db = SessionLocal()
+    try:
+        db.execute(insert(Student), [
+            {"user_id": f"cond-{i}", "student_name": f"Cond {i}", "student_email": f"cond-{i}@example.com",
+             "student_class_name": CLASS, "student_roll_no": i}
+            for i in range(2)
+        ])
+        db.commit()
+        yield
+        db.execute(delete(Student).where(Student.user_id.like("cond-%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+def get(client, principal, path, headers=None, **params):
+    return client.get(path, params=params, headers={**principal["headers"], **(headers or {})})
+
+
+def test_list_answers_304_until_the_collection_changes(client, principal, two_students):
+    first = get(client, principal, "/principal/students", class_name=CLASS)
+    etag = first.headers["ETag"]
+
+    not_modified = get(client, principal, "/principal/students", {"If-None-Match": etag}, class_name=CLASS)
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+
+    # The query string is part of the validator: another field set is another representation
+    other = get(client, principal, "/principal/students", {"If-None-Match": etag}, class_name=CLASS, fields="student_name")
+    assert other.status_code == 200
+    assert other.headers["ETag"] != etag
+
+    db = SessionLocal()
+    try:
+        db.execute(update(Student).where(Student.user_id == "cond-0").values(student_age=11))
+        db.commit()
+    finally:
+        db.close()
+    changed = get(client, principal, "/principal/students", {"If-None-Match": etag}, class_name=CLASS)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_if_modified_since_uses_last_modified(client, principal, two_students):
+    db = SessionLocal()
+    try:
+        db.execute(update(Student).where(Student.user_id == "cond-1").values(student_age=12))
+        db.commit()
+    finally:
+        db.close()
+    last_modified = get(client, principal, "/principal/students", class_name=CLASS).headers["Last-Modified"]
+
+    cached = get(client, principal, "/principal/students", {"If-Modified-Since": last_modified}, class_name=CLASS)
+    assert cached.status_code == 304
+    stale = get(client, principal, "/principal/students", {"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"}, class_name=CLASS)
+    assert stale.status_code == 200
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+import core.db_pool as db_pool
+from config import settings
+from core.db_pool import instrument_engine, pool_options
+
+
+@pytest.fixture
+def idle_engine(tmp_path, monkeypatch):
+    """A file SQLite engine with the "idle" pre-ping strategy and a controllable clock"""
+    now = [1_000.0]
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "idle")
+    monkeypatch.setattr(settings, "DB_POOL_PING_IDLE", 60)
+    monkeypatch.setattr(db_pool.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(db_pool, "_engines", {})
+    url = f"sqlite:///{tmp_path}/pool.db"
+    engine = instrument_engine("test", create_engine(url, **pool_options(url)))
+    yield engine, now
+    engine.dispose()
+
+
+def use(engine):
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def test_idle_strategy_pings_only_connections_unused_for_a_while(idle_engine):
+    engine, now = idle_engine
+    assert pool_options(str(engine.url))["pool_pre_ping"] is False
+
+    use(engine)   # new connection, never returned before: no ping
+    now[0] += 30
+    use(engine)   # back in the pool for 30s
+    metrics = engine.pool.metrics
+    assert metrics.pings == 0
+
+    now[0] += 61
+    use(engine)
+    assert metrics.pings == 1
+    assert metrics.connects == 1
+
+
+def test_failed_ping_replaces_the_connection(idle_engine, monkeypatch):
+    engine, now = idle_engine
+    use(engine)
+    now[0] += 61
+
+    def broken_ping(dbapi_connection):
+        raise RuntimeError("server has gone away")
+
+    monkeypatch.setattr(db_pool, "_ping", broken_ping)
+    use(engine)
+
+    snapshot = engine.pool.metrics.snapshot(engine.pool)
+    assert (snapshot["pings"], snapshot["ping_failures"]) == (1, 1)
+    assert snapshot["invalidations"] == 1
+    assert snapshot["connects"] == 2
+    assert snapshot["checked_out"] == 0
+
+
+def test_unknown_pre_ping_strategy_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", "sometimes")
+    with pytest.raises(ValueError, match="DB_POOL_PRE_PING"):
+        pool_options("sqlite:////tmp/pool.db")
+
+
+def test_internal_metrics_reports_pool_and_cache_counters(client, principal):
+    assert client.get("/internal/metrics").status_code == 401
+
+    first = client.get("/internal/metrics", headers=principal["headers"]).json()
+    assert client.get("/principal/profile_details", headers=principal["headers"]).status_code == 200
+    second = client.get("/internal/metrics", headers=principal["headers"]).json()
+
+    assert set(first) == {"db_pools", "password_hash_pool", "token_cache", "identity_cache"}
+    pool = second["db_pools"]["primary_async"]
+    assert {"checked_out", "idle", "checkouts", "connects", "timeouts", "pings", "avg_wait_ms"} <= set(pool)
+    # The profile read in between checked out a connection
+    assert pool["checkouts"] > first["db_pools"]["primary_async"]["checkouts"]
+    assert second["token_cache"]["hits"] > first["token_cache"]["hits"]
+    assert second["identity_cache"]["hits"] > first["identity_cache"]["hits"]
@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from core.hash_pool import HashPoolBusy, PasswordHashPool
+
+
+def slow_hash(seconds: float) -> str:
+    time.sleep(seconds)
+    return "hashed"
+
+
+@pytest.fixture
+def make_pool():
+    pools = []
+
+    def make(**kwargs):
+        pools.append(PasswordHashPool(**kwargs))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.shutdown()
+
+
+async def storm(pool, callers: int, seconds: float):
+    """Run `callers` hashes at once while a ticker measures event loop lag."""
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    tick = asyncio.create_task(ticker())
+    results = await asyncio.gather(
+        *(pool.run_async(slow_hash, seconds) for _ in range(callers)), return_exceptions=True
+    )
+    done.set()
+    await tick
+    return results, max(lags)
+
+
+def test_burst_beyond_max_pending_waits_for_slots(make_pool):
+    pool = make_pool(workers=2, max_pending=4, queue_timeout=5)
+
+    results, max_lag = asyncio.run(storm(pool, callers=20, seconds=0.05))
+
+    assert results == ["hashed"] * 20
+    assert pool.metrics()["completed"] == 20
+    assert pool.metrics()["rejected"] == 0
+    # Waiting callers hold no thread and do not stall the loop
+    assert max_lag < 0.1
+
+
+def test_rejects_only_after_queue_timeout(make_pool):
+    pool = make_pool(workers=1, max_pending=1, queue_timeout=0.2)
+
+    async def two_callers():
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            pool.run_async(slow_hash, 1.0), pool.run_async(slow_hash, 0), return_exceptions=True
+        )
+        return results, time.perf_counter() - started
+
+    (first, second), _ = asyncio.run(two_callers())
+
+    assert first == "hashed"
+    assert isinstance(second, HashPoolBusy)
+    assert second.status_code == 503
+    assert pool.metrics()["rejected"] == 1
+
+
+def test_async_caller_waits_for_slot_held_by_sync_caller(make_pool):
+    pool = make_pool(workers=1, max_pending=1, queue_timeout=5)
+    pool.run(slow_hash, 0)  # start the worker process
+    sync_caller = threading.Thread(target=pool.run, args=(slow_hash, 0.3))
+    sync_caller.start()
+    time.sleep(0.05)
+
+    assert asyncio.run(pool.run_async(slow_hash, 0)) == "hashed"
+    sync_caller.join()
+    assert pool.metrics()["rejected"] == 0
+
+
+@pytest.fixture
+def slow_hash_principal(migrated_db):
+    """A principal whose stored hash costs a real bcrypt verification (~50 ms)."""
+    from passlib.hash import bcrypt
+    from database import SessionLocal
+    from repositories.principal_repository import PrincipalRepository
+
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Storm", "storm@example.com", bcrypt.using(rounds=10).hash("storm-password"), "Principal", None)
+        repo.add_principal(user)
+    finally:
+        repo.db.close()
+    return {"email": "storm@example.com", "password": "storm-password"}
+
+
+def test_login_storm_keeps_other_endpoints_responsive(slow_hash_principal, make_pool, monkeypatch):
+    import core.security
+    from main import app
+
+    principal = slow_hash_principal
+    # Far fewer slots than concurrent logins: the surplus has to queue, not fail
+    monkeypatch.setattr(core.security, "hash_pool", make_pool(workers=1, max_pending=2, queue_timeout=10))
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            credentials = {"principal_email": principal["email"], "principal_password": principal["password"]}
+            await client.get("/openapi.json")
+
+            async def timed_read():
+                started = time.perf_counter()
+                response = await client.get("/openapi.json")
+                return response.status_code, time.perf_counter() - started
+
+            logins = asyncio.gather(*(client.post("/principal/login", json=credentials) for _ in range(20)))
+            reads = asyncio.gather(*(timed_read() for _ in range(20)))
+            return await logins, await reads
+
+    logins, reads = asyncio.run(run())
+
+    assert [response.status_code for response in logins] == [200] * 20
+    assert all(status_code == 200 for status_code, _ in reads)
+    assert max(elapsed for _, elapsed in reads) < 0.5
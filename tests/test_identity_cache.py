@@ -0,0 +1,60 @@
+import pytest
+
+from core.identity_cache import identity_cache
+from core.security import build_pwd_context, create_access_token, create_reset_password_token
+from database import SessionLocal
+from repositories.principal_repository import PrincipalRepository
+
+EMAIL = "identity@example.com"
+
+
+@pytest.fixture(scope="module")
+def cached_principal(migrated_db):
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Identity", EMAIL, build_pwd_context().hash("identity-password"), "Principal", None)
+        repo.add_principal(user)
+        user_id = user.user_id
+    finally:
+        repo.db.close()
+    token = create_access_token({"sub": EMAIL, "role": "Principal"})
+    return {"user_id": user_id, "headers": {"Authorization": f"Bearer {token}"}}
+
+
+def lookups(client, principal) -> int:
+    response = client.get("/principal/profile_details", headers=principal["headers"])
+    assert response.status_code == 200
+    return int(response.headers["X-Identity-DB-Lookups"])
+
+
+def warm(client, principal):
+    identity_cache.invalidate(email=EMAIL)
+    assert lookups(client, principal) == 1
+    assert lookups(client, principal) == 0
+
+
+def test_warm_token_skips_the_user_lookup(client, cached_principal):
+    hits = identity_cache.stats()["hits"]
+    warm(client, cached_principal)
+    assert identity_cache.stats()["hits"] == hits + 1
+
+
+def test_profile_update_invalidates_the_identity(client, cached_principal):
+    warm(client, cached_principal)
+    response = client.put(
+        "/principal/update_profile",
+        json={"principal_qualification": "M.Ed"},
+        headers=cached_principal["headers"],
+    )
+    assert response.status_code == 200
+
+    assert lookups(client, cached_principal) == 1
+
+
+def test_password_change_invalidates_the_identity(client, cached_principal):
+    warm(client, cached_principal)
+    token = create_reset_password_token(cached_principal["user_id"], EMAIL)
+    response = client.post("/principal/reset_password", params={"token": token, "new_password": "new-identity-password"})
+    assert response.status_code == 200
+
+    assert lookups(client, cached_principal) == 1
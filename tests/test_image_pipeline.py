@@ -0,0 +1,102 @@
+import asyncio
+import io
+import os
+import uuid
+import pytest
+from PIL import Image
+from config import settings
+from core.image_pipeline import IMAGE_SIZES, InvalidImage, process_image
+from core.storage import get_blob_store
+from database import SessionLocal
+from models import Student
+from repositories.teacher_respository import TeacherRepository
+
+GPS_IFD = 0x8825
+
+
+def photo_with_gps(size=(2000, 1500)) -> bytes:
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    exif.get_ifd(GPS_IFD)[2] = (51.0, 30.0, 0.0)  # GPSLatitude
+    buf = io.BytesIO()
+    Image.new("RGB", size, "navy").save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+def student_datas(**overrides) -> dict:
+    user_id = str(uuid.uuid4())
+    return {
+        "user_id": user_id,
+        "student_name": "Asha",
+        "user_email": f"{user_id}@example.com",
+        "hashed_password": "x",
+        "user_role": "Student",
+        "student_class_name": "10A",
+        "student_gender": "Female",
+        "student_dob": None,
+        "student_roll_no": 1,
+        "student_age": 15,
+        "father_name": None,
+        "mother_name": None,
+        "father_mobile_number": None,
+        "mother_mobile_number": None,
+        "student_address": None,
+        "admission_date": None,
+        **overrides,
+    }
+
+
+def test_variants_are_resized_and_drop_metadata():
+    variants = process_image(photo_with_gps(), "JPEG", 80)
+
+    assert set(variants) == set(IMAGE_SIZES)
+    for name, content in variants.items():
+        with Image.open(io.BytesIO(content)) as image:
+            assert max(image.size) == IMAGE_SIZES[name]
+            assert not image.getexif()
+
+
+def test_rejects_non_images():
+    with pytest.raises(InvalidImage):
+        process_image(b"GIF89a not really", "JPEG", 80)
+
+
+def test_add_student_stores_only_processed_variants(migrated_db):
+    datas = student_datas()
+    blob_store = get_blob_store()
+    repo = TeacherRepository(SessionLocal())
+    try:
+        result = asyncio.run(repo.add_student_via_teacher_in_db(datas, photo_with_gps(), blob_store))
+        student = repo.db.get(Student, datas["user_id"])
+    finally:
+        repo.db.close()
+
+    assert result["success"], result
+    variants = student.student_image_urls
+    assert set(variants) == set(IMAGE_SIZES)
+    assert student.student_image_url == variants["large"]["url"]
+
+    for size, variant in variants.items():
+        content = asyncio.run(blob_store.get(variant["key"]))
+        with Image.open(io.BytesIO(content)) as image:
+            assert max(image.size) == IMAGE_SIZES[size]
+            assert not image.getexif()
+
+    stored_bytes = sum(
+        os.path.getsize(os.path.join(folder, name))
+        for folder, _, names in os.walk(os.path.join(settings.BLOB_LOCAL_ROOT, "students"))
+        for name in names
+    )
+    assert stored_bytes == sum(len(asyncio.run(blob_store.get(v["key"]))) for v in variants.values())
+
+
+def test_add_student_rejects_invalid_image(migrated_db):
+    datas = student_datas()
+    repo = TeacherRepository(SessionLocal())
+    try:
+        result = asyncio.run(repo.add_student_via_teacher_in_db(datas, b"not an image"))
+        assert repo.db.get(Student, datas["user_id"]) is None
+    finally:
+        repo.db.close()
+
+    assert not result["success"]
@@ -0,0 +1,108 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from core.responses import MIN_COMPRESS_BYTES, negotiate_encoding
+from database import SessionLocal
+from models import Student
+from repositories.principal_repository import PrincipalRepository
+from schemas.principal_schema import StudentsOut
+
+CLASS = "7Q"
+
+
+@pytest.fixture(scope="module")
+def class_roster(migrated_db):
+    db = SessionLocal()
+    try:
+        db.execute(insert(Student), [
+            {
+                "user_id": f"roster-{i:03d}",
+                "student_name": f"Roster Student {i}",
+                "student_email": f"roster-{i:03d}@example.com",
+                "student_class_name": CLASS,
+                "student_gender": "Female" if i % 2 else "Male",
+                "student_date_of_birth": datetime.date(2012, 1, 1 + i),
+                "student_roll_no": i,
+                "student_admission_date": datetime.date(2020, 6, 1),
+            }
+            for i in range(30)
+        ])
+        db.commit()
+        yield
+        db.execute(delete(Student).where(Student.user_id.like("roster-%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+def students(client, principal, accept_encoding: str, **params):
+    return client.get(
+        "/principal/students",
+        params={"class_name": CLASS, **params},
+        headers={**principal["headers"], "Accept-Encoding": accept_encoding},
+    )
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, br", "br"),
+    ("gzip, br;q=0", "gzip"),
+    ("gzip", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("br;q=0, gzip;q=0", None),
+])
+def test_negotiate_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+@pytest.mark.parametrize("accept_encoding", ["gzip", "br"])
+def test_list_is_compressed_for_the_accepted_encoding(client, principal, class_roster, accept_encoding):
+    response = students(client, principal, accept_encoding)
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == accept_encoding
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert len(response.json()["items"]) == 30
+
+
+def test_small_or_unaccepted_bodies_are_not_compressed(client, principal, class_roster):
+    assert "content-encoding" not in students(client, principal, "identity").headers
+
+    small = students(client, principal, "gzip", limit=1, fields="user_id")
+    assert len(small.content) < MIN_COMPRESS_BYTES
+    assert "content-encoding" not in small.headers
+
+
+def test_fast_path_matches_the_response_schema(client, principal, class_roster):
+    items = students(client, principal, "gzip")
+    db = SessionLocal()
+    try:
+        rows = db.scalars(select(Student).where(Student.student_class_name == CLASS).order_by(Student.user_id))
+        expected = [StudentsOut.model_validate(row).model_dump(mode="json") for row in rows]
+    finally:
+        db.close()
+
+    assert items.json()["items"] == expected
+
+
+def test_decimal_salary_is_serialised_as_a_number(client, principal):
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        teacher = repo.add_teacher(repo.add_user("Paid", "paid.teacher@example.com", "x", "Teacher", None))
+        teacher.teacher_salary_package = Decimal("45000.50")
+        repo.db.commit()
+        teacher_id = teacher.user_id
+    finally:
+        repo.db.close()
+
+    response = client.get(
+        "/principal/teachers",
+        params={"fields": "user_id,teacher_salary_package", "limit": 200},
+        headers=principal["headers"],
+    )
+    salaries = {item["user_id"]: item["teacher_salary_package"] for item in response.json()["items"]}
+    assert salaries[teacher_id] == 45000.5
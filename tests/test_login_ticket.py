@@ -0,0 +1,89 @@
+import time
+
+import pyotp
+import pytest
+
+from core.security import build_pwd_context, create_access_token, create_reset_password_token
+from database import SessionLocal
+from repositories.principal_repository import PrincipalRepository
+
+PASSWORD = "ticket-password"
+
+
+@pytest.fixture
+def totp_principal(migrated_db, request):
+    """A principal with TOTP enabled, one per test so used codes do not collide"""
+    email = f"{request.node.name.replace('_', '-')[:40]}@example.com"
+    secret = pyotp.random_base32()
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Ticket", email, build_pwd_context().hash(PASSWORD), "Principal", secret)
+        repo.add_principal(user)
+        return {"email": email, "totp": pyotp.TOTP(secret), "user_id": user.user_id}
+    finally:
+        repo.db.close()
+
+
+def ticket_for(client, principal) -> str:
+    response = client.post("/principal/login", json={"principal_email": principal["email"], "principal_password": PASSWORD})
+    assert response.json()["totp_required"] is True
+    return response.json()["preauth_ticket"]
+
+
+def verify(client, ticket: str, code: str):
+    return client.post("/principal/login/verify_otp", json={"preauth_ticket": ticket, "principal_otp": code})
+
+
+def wrong_code(totp) -> str:
+    now = time.time()
+    valid = {totp.at(now + offset) for offset in (-30, 0, 30)}
+    return next(code for code in ("000000", "111111", "222222", "333333") if code not in valid)
+
+
+def test_ticket_and_code_give_a_working_access_token(client, totp_principal):
+    response = verify(client, ticket_for(client, totp_principal), totp_principal["totp"].now())
+
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/principal/profile_details", headers=headers).status_code == 200
+
+
+def test_ticket_is_single_use(client, totp_principal):
+    ticket = ticket_for(client, totp_principal)
+    assert verify(client, ticket, totp_principal["totp"].now()).status_code == 200
+
+    assert verify(client, ticket, totp_principal["totp"].now()).status_code == 401
+
+
+def test_accepted_code_cannot_be_replayed_with_a_new_ticket(client, totp_principal):
+    code = totp_principal["totp"].now()
+    assert verify(client, ticket_for(client, totp_principal), code).status_code == 200
+
+    replay = verify(client, ticket_for(client, totp_principal), code)
+    assert replay.status_code == 401
+    assert replay.json()["detail"] == "Invalid OTP"
+
+
+def test_other_tokens_are_not_tickets(client, totp_principal):
+    code = totp_principal["totp"].now()
+    access_token = create_access_token({"sub": totp_principal["email"], "role": "Principal"})
+    reset_token = create_reset_password_token(totp_principal["user_id"], totp_principal["email"])
+    feed_token = create_access_token({"sub": totp_principal["email"], "user_id": totp_principal["user_id"], "purpose": "calendar_feed"})
+
+    for token in (access_token, reset_token, feed_token, "not-a-jwt"):
+        response = verify(client, token, code)
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Invalid or expired login ticket"
+
+
+def test_ticket_is_revoked_after_too_many_wrong_codes(client, totp_principal, monkeypatch):
+    monkeypatch.setattr("config.settings.PREAUTH_MAX_OTP_ATTEMPTS", 3)
+    ticket = ticket_for(client, totp_principal)
+    wrong = wrong_code(totp_principal["totp"])
+
+    assert [verify(client, ticket, wrong).json()["detail"] for _ in range(3)] == [
+        "Invalid OTP", "Invalid OTP", "Too many invalid OTP codes; log in again",
+    ]
+    # Even the right code no longer works on this ticket
+    assert verify(client, ticket, totp_principal["totp"].now()).json()["detail"] == "Invalid or expired login ticket"
+    assert verify(client, ticket_for(client, totp_principal), totp_principal["totp"].now()).status_code == 200
@@ -0,0 +1,94 @@
+import socket
+import pytest
+from core.mail import SMTPConnectionPool, build_email_message
+
+pytest.importorskip("aiosmtpd")
+from scripts.local_smtp_server import RecordingHandler, start_server  # noqa: E402
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler(refuse={"bounce1@example.com", "bounce2@example.com"})
+    controller = start_server(handler)
+    yield controller.port, handler
+    controller.stop()
+
+
+@pytest.fixture
+def make_pool(smtp_server):
+    pools = []
+
+    def make():
+        pools.append(SMTPConnectionPool("127.0.0.1", smtp_server[0], "mailer", "secret", starttls=False))
+        return pools[-1]
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def emails(*recipients):
+    return [build_email_message(to, "Hello", "<p>hello</p>") for to in recipients]
+
+
+def test_batch_is_sent_over_one_session(smtp_server, make_pool):
+    _, handler = smtp_server
+    pool = make_pool()
+
+    results = pool.send_messages(emails(*(f"user{i}@example.com" for i in range(5))))
+    results += pool.send_messages(emails("user5@example.com"))
+
+    assert all(result.sent for result in results)
+    assert len(handler.messages) == 6
+    assert pool.connects == 1
+
+
+def test_refused_recipients_fail_alone_and_keep_the_session(smtp_server, make_pool):
+    _, handler = smtp_server
+    pool = make_pool()
+    messages = emails("a@example.com", "bounce1@example.com", "b@example.com", "bounce2@example.com", "c@example.com")
+
+    results = pool.send_messages(messages)
+
+    assert [result.message for result in results] == messages
+    assert [result.sent for result in results] == [True, False, True, False, True]
+    assert "550" in results[1].error
+    assert len(handler.messages) == 3
+    assert pool.connects == 1
+
+
+def drop_connection(server):
+    server.sock.shutdown(socket.SHUT_RDWR)
+
+
+def test_dropped_session_is_reconnected_once(smtp_server, make_pool):
+    _, handler = smtp_server
+    pool = make_pool()
+    pool.send_messages(emails("a@example.com"))
+    drop_connection(pool._idle[0][0])  # the server went away while the session was idle
+
+    results = pool.send_messages(emails("b@example.com", "c@example.com"))
+
+    assert all(result.sent for result in results)
+    assert len(handler.messages) == 3
+    assert pool.connects == 2
+
+
+def test_failed_reconnect_keeps_results_of_sent_messages(smtp_server, make_pool, monkeypatch):
+    _, handler = smtp_server
+    handler.close_on = {"drop@example.com"}
+    pool = make_pool()
+    connect = pool._connect
+
+    def connect_once():
+        if pool.connects:
+            raise ConnectionRefusedError("connection refused")
+        return connect()
+
+    monkeypatch.setattr(pool, "_connect", connect_once)
+    results = pool.send_messages(emails("a@example.com", "drop@example.com", "b@example.com"))
+
+    # "a" was delivered before the session dropped; only the rest failed
+    assert [result.sent for result in results] == [True, False, False]
+    assert "refused" in results[1].error
+    assert len(handler.messages) == 1
@@ -0,0 +1,43 @@
+import asyncio
+import pytest
+from core.security import (
+    PASSWORD_SCHEMES,
+    build_pwd_context,
+    hash_password_async,
+    verify_and_update_password_async,
+)
+
+
+@pytest.mark.parametrize("scheme", PASSWORD_SCHEMES)
+def test_hash_then_verify(scheme):
+    context = build_pwd_context(scheme)
+    hashed = context.hash("correct horse")
+
+    assert context.identify(hashed) == scheme
+    assert context.verify("correct horse", hashed)
+    assert not context.verify("wrong horse", hashed)
+    assert not context.needs_update(hashed)
+
+
+@pytest.mark.parametrize("scheme", PASSWORD_SCHEMES)
+def test_other_scheme_is_verified_and_rehashed(scheme):
+    other = next(name for name in PASSWORD_SCHEMES if name != scheme)
+    old_hash = build_pwd_context(other).hash("correct horse")
+
+    valid, new_hash = build_pwd_context(scheme).verify_and_update("correct horse", old_hash)
+
+    assert valid
+    assert build_pwd_context(scheme).identify(new_hash) == scheme
+
+
+def test_login_path_through_hash_pool():
+    # The configured scheme (bcrypt by default), run in the hash pool processes
+    async def hash_and_verify():
+        hashed = await hash_password_async("correct horse")
+        return hashed, await verify_and_update_password_async("correct horse", hashed)
+
+    hashed, (valid, new_hash) = asyncio.run(hash_and_verify())
+
+    assert hashed
+    assert valid
+    assert new_hash is None
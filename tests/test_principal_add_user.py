@@ -0,0 +1,100 @@
+import json
+
+from sqlalchemy import select
+
+import core.mail
+import repositories.task_repository
+from core.security import build_pwd_context
+from core.tasks import get_task_handler
+from database import SessionLocal
+from models import BackgroundTask, Teacher, User
+
+
+def new_user(email: str, role: str = "Teacher") -> dict:
+    return {"user_name": "New", "user_email": email, "user_password": "secret-pw", "user_role": role}
+
+
+def queued_tasks_for(email: str) -> list[str]:
+    db = SessionLocal()
+    try:
+        return [
+            task.task_name
+            for task in db.scalars(select(BackgroundTask).where(BackgroundTask.status == "Queued"))
+            if json.loads(task.payload).get("to_email") == email
+        ]
+    finally:
+        db.close()
+
+
+def test_add_user_writes_user_role_row_and_welcome_task(client, principal):
+    response = client.post("/principal/add_user", json=new_user("added.teacher@example.com"), headers=principal["headers"])
+    assert response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        assert db.get(Teacher, response.json()["user_id"]) is not None
+    finally:
+        db.close()
+    assert queued_tasks_for("added.teacher@example.com") == ["send_welcome_email"]
+
+
+def test_failed_task_insert_leaves_no_user(client, principal, monkeypatch):
+    broken = BackgroundTask(task_name=None, payload="{}", status="Queued")   # violates NOT NULL
+    monkeypatch.setattr(repositories.task_repository, "_new_task", lambda *args: broken)
+
+    response = client.post("/principal/add_user", json=new_user("rolled.back@example.com"), headers=principal["headers"])
+
+    assert response.status_code == 500
+    db = SessionLocal()
+    try:
+        assert db.scalars(select(User).where(User.user_email == "rolled.back@example.com")).first() is None
+    finally:
+        db.close()
+
+
+def test_principal_welcome_task_queued_with_totp_secret_still_runs(principal, monkeypatch):
+    sent = []
+    monkeypatch.setattr(core.mail, "send_email_smtp", lambda to_email, subject, html: sent.append(html))
+
+    # Payload shape of tasks enqueued before the QR link replaced the inline image
+    get_task_handler("send_principal_welcome_email")(
+        to_email=principal["email"], user_name="Head", password="pw", user_role="Principal", totp_secret="JBSWY3DPEHPK3PXP",
+    )
+
+    assert "/principal/totp_qr?token=" in sent[0]
+
+
+def test_welcome_task_payload_carries_no_password(client, principal):
+    client.post("/principal/add_user", json={**new_user("no.password@example.com", "Student"), "user_class": "4C"}, headers=principal["headers"])
+
+    db = SessionLocal()
+    try:
+        payloads = [
+            json.loads(task.payload)
+            for task in db.scalars(select(BackgroundTask).where(BackgroundTask.task_name == "send_welcome_email"))
+        ]
+    finally:
+        db.close()
+    payload = next(payload for payload in payloads if payload.get("to_email") == "no.password@example.com")
+    assert "password" not in payload
+    assert "secret-pw" not in json.dumps(payload)
+
+
+def test_welcome_email_set_password_link_works_for_a_teacher(client, principal, monkeypatch):
+    user_id = client.post("/principal/add_user", json=new_user("link.teacher@example.com"), headers=principal["headers"]).json()["user_id"]
+    sent = []
+    monkeypatch.setattr(core.mail, "send_email_smtp", lambda to_email, subject, html: sent.append(html))
+
+    get_task_handler("send_welcome_email")(
+        to_email="link.teacher@example.com", user_name="New", user_role="Teacher", user_id=user_id,
+    )
+    token = sent[0].split("reset-password?token=")[1].split('"')[0]
+
+    assert "secret-pw" not in sent[0]
+    response = client.post("/principal/reset_password", params={"token": token, "new_password": "chosen-pw"})
+    assert response.status_code == 200
+    db = SessionLocal()
+    try:
+        assert build_pwd_context().verify("chosen-pw", db.get(User, user_id).user_password)
+    finally:
+        db.close()
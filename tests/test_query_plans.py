@@ -0,0 +1,17 @@
+import pytest
+from sqlalchemy import create_engine
+from scripts.check_query_plans import explain, hot_queries
+
+
+@pytest.fixture(scope="module")
+def connection(migrated_db):
+    engine = create_engine(migrated_db)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", sorted(hot_queries()))
+def test_hot_query_uses_an_index(connection, name):
+    plan, scans = explain(connection, hot_queries()[name])
+    assert not scans, "\n".join(plan)
@@ -0,0 +1,69 @@
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+import database
+from models import Principal
+
+
+@pytest.fixture
+def replica(migrated_db, principal, tmp_path, monkeypatch):
+    """A second SQLite file, copied from the primary, serving replica reads"""
+    path = tmp_path / "replica.db"
+    shutil.copy(make_url(migrated_db).database, path)
+    engine = create_engine(f"sqlite:///{path}", poolclass=NullPool)
+    with engine.begin() as connection:
+        connection.execute(
+            update(Principal).where(Principal.user_id == principal["user_id"]).values(principal_qualification="replica copy")
+        )
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+
+    database.get_async_engine()
+    monkeypatch.setattr(database, "replica_engines", [engine])
+    monkeypatch.setattr(database, "_replica_sessionmakers", [sessionmaker(bind=engine)])
+    monkeypatch.setattr(database, "_async_replica_sessionmakers", [
+        async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+    ])
+    yield path
+    engine.dispose()
+
+
+def qualification(client, principal) -> str:
+    response = client.get("/principal/profile_details", headers=principal["headers"])
+    assert response.status_code == 200
+    return response.json()["principal_qualification"]
+
+
+def test_reads_use_the_replica_until_the_client_writes(client, principal, replica):
+    assert qualification(client, principal) == "replica copy"
+
+    write = client.put(
+        "/principal/update_profile",
+        json={"principal_qualification": "written to primary"},
+        headers=principal["headers"],
+    )
+    assert write.status_code == 200
+    assert write.cookies.get(database.READ_PRIMARY_COOKIE) == "1"
+
+    # The client now carries the cookie, so its reads see its own write
+    assert qualification(client, principal) == "written to primary"
+
+    # Other clients keep reading the (stale) replica
+    client.cookies.clear()
+    assert qualification(client, principal) == "replica copy"
+
+
+def test_failed_writes_do_not_pin_reads_to_the_primary(client, principal, replica):
+    response = client.put(
+        "/principal/update_profile",
+        json={"principal_experience_years": "many"},
+        headers=principal["headers"],
+    )
+    assert response.status_code == 422
+    assert database.READ_PRIMARY_COOKIE not in response.cookies
+    assert qualification(client, principal) == "replica copy"
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import delete, insert
+
+from database import SessionLocal
+from models import Student
+from schemas.principal_schema import StudentsOut
+from schemas.records import parse_fields
+
+CLASS = "6S"
+
+
+@pytest.fixture(scope="module")
+def two_students(migrated_db):
+    db = SessionLocal()
+    try:
+        db.execute(insert(Student), [
+            {"user_id": f"sparse-{i}", "student_name": f"Sparse {i}", "student_email": f"sparse-{i}@example.com",
+             "student_class_name": CLASS, "student_roll_no": i}
+            for i in range(2)
+        ])
+        db.commit()
+        yield
+        db.execute(delete(Student).where(Student.user_id.like("sparse-%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+def get(client, principal, path, headers=None, **params):
+    return client.get(path, params=params, headers={**principal["headers"], **(headers or {})})
+
+
+def test_parse_fields_keeps_schema_order_and_always_fields():
+    allowed = StudentsOut.model_fields
+    assert parse_fields(allowed, None) is None
+    assert parse_fields(allowed, "") is None
+    assert parse_fields(allowed, " student_age , student_name,student_age") == ("user_id", "student_name", "student_age")
+    with pytest.raises(ValueError, match="Unknown fields: nope, password"):
+        parse_fields(allowed, "student_name,password,nope")
+
+
+@pytest.mark.parametrize("path", ["/principal/students", "/principal/teachers", "/principal/profile_details", "/principal/students/export"])
+def test_unknown_field_is_rejected_with_422(client, principal, path):
+    response = get(client, principal, path, fields="user_password")
+
+    assert response.status_code == 422
+    assert "user_password" in response.json()["detail"]
+
+
+def test_sparse_list_and_detail_return_only_the_requested_fields(client, principal, two_students):
+    page = get(client, principal, "/principal/students", class_name=CLASS, fields="student_roll_no").json()
+    assert page["items"] == [{"user_id": "sparse-0", "student_roll_no": 0}, {"user_id": "sparse-1", "student_roll_no": 1}]
+
+    profile = get(client, principal, "/principal/profile_details", fields="principal_name").json()
+    assert profile == {"user_id": principal["user_id"], "principal_name": "Head"}
@@ -0,0 +1,93 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+
+import pytest
+from sqlalchemy import delete, insert
+
+from database import SessionLocal
+from models import Student
+from repositories.principal_repository import AsyncPrincipalRepository
+from schemas.principal_schema import ExportFormat
+from services.principal_service import PrincipalService
+
+EXPORT_ROWS = 20_000
+# Peak traced memory allowed for the export, whatever the row count
+EXPORT_PEAK_BYTES = 3 * 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def large_register(migrated_db):
+    rows = [
+        {
+            "user_id": f"export-{i:06d}",
+            "student_name": f"Student {i}",
+            "student_email": f"export-{i:06d}@example.com",
+            "student_class_name": f"{i % 12 + 1}A",
+            "student_roll_no": i,
+            "student_address": "12 School Lane, Springfield",
+        }
+        for i in range(EXPORT_ROWS)
+    ]
+    db = SessionLocal()
+    try:
+        db.execute(insert(Student), rows)
+        db.commit()
+        yield EXPORT_ROWS
+        db.execute(delete(Student).where(Student.user_id.like("export-%")))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_export(export_format: ExportFormat, trace: bool = True) -> tuple[int, int, int]:
+    """(rows, bytes, peak traced memory) of a full export consumed chunk by chunk"""
+
+    async def consume():
+        rows = size = 0
+        async for chunk in PrincipalService(AsyncPrincipalRepository()).export_students(export_format):
+            rows += chunk.count("\n")
+            size += len(chunk)
+        return rows, size
+
+    if not trace:
+        return (*asyncio.run(consume()), 0)
+    tracemalloc.start()
+    try:
+        rows, size = asyncio.run(consume())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rows, size, peak
+
+
+def test_export_memory_stays_flat_on_a_large_register(large_register):
+    run_export(ExportFormat.NDJSON, trace=False)   # engine, pools and imports outside the trace
+    rows, size, peak = run_export(ExportFormat.NDJSON)
+
+    assert rows >= large_register
+    # A streamed export holds one fetch batch and one chunk at a time;
+    # materialising the register would take a multiple of its output size
+    assert size > 2 * EXPORT_PEAK_BYTES
+    assert peak < EXPORT_PEAK_BYTES, f"peak {peak} bytes for a {size} byte export"
+
+
+def test_csv_export_over_http(client, principal, large_register):
+    response = client.get("/principal/students/export?format=csv&fields=user_id,student_roll_no", headers=principal["headers"])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.reader(io.StringIO(response.text)))
+    assert records[0] == ["user_id", "student_roll_no"]
+    exported = {user_id: roll_no for user_id, roll_no in records[1:]}
+    assert exported["export-000123"] == "123"
+    assert sum(user_id.startswith("export-") for user_id in exported) == large_register
+
+
+def test_ndjson_lines_are_complete_objects(client, principal, large_register):
+    response = client.get("/principal/students/export?fields=user_id", headers=principal["headers"])
+
+    lines = response.text.splitlines()
+    assert all(json.loads(line).keys() == {"user_id"} for line in lines)
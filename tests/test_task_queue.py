@@ -0,0 +1,108 @@
+import datetime
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import repositories.task_repository as task_repository
+from config import settings
+from core.tasks import TaskWorker, task
+from models import BackgroundTask
+from repositories.task_repository import TaskRepository
+
+ran = []
+ran_event = threading.Event()
+
+
+@task("test_record")
+def record(value):
+    ran.append(value)
+    ran_event.set()
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    """TaskRepository on its own database, so tasks queued by other tests are not claimed"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    BackgroundTask.__table__.create(engine)
+    monkeypatch.setattr(task_repository, "SessionLocal", sessionmaker(bind=engine))
+    repo = TaskRepository()
+    yield repo
+    repo.close()
+    engine.dispose()
+
+
+def stored(repo: TaskRepository, task_id: int) -> BackgroundTask:
+    repo.db.expire_all()
+    return repo.db.get(BackgroundTask, task_id)
+
+
+def test_failures_back_off_exponentially_then_dead_letter(queue):
+    task_id = queue.enqueue("test_record", max_attempts=3, value="secret").task_id
+
+    for attempt, delay in ((1, settings.TASK_RETRY_BASE_DELAY), (2, settings.TASK_RETRY_BASE_DELAY * 2)):
+        stored(queue, task_id).run_after = datetime.datetime.utcnow()
+        queue.db.commit()
+        assert [claimed[0] for claimed in queue.claim_due_tasks(10)] == [task_id]
+        before = datetime.datetime.utcnow()
+        queue.mark_failed(task_id, f"boom {attempt}")
+
+        task = stored(queue, task_id)
+        assert (task.status, task.attempts) == ("Queued", attempt)
+        assert before + datetime.timedelta(seconds=delay - 1) <= task.run_after <= before + datetime.timedelta(seconds=delay + 1)
+        assert queue.claim_due_tasks(10) == []   # not due before the backoff
+
+    stored(queue, task_id).run_after = datetime.datetime.utcnow()
+    queue.db.commit()
+    queue.claim_due_tasks(10)
+    queue.mark_failed(task_id, "boom 3")
+
+    task = stored(queue, task_id)
+    assert (task.status, task.last_error, json.loads(task.payload)) == ("Dead", "boom 3", {})
+
+
+def expire_lease(repo: TaskRepository, task_id: int):
+    stored(repo, task_id).locked_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=settings.TASK_LEASE_TIMEOUT + 1)
+    repo.db.commit()
+
+
+def test_expired_lease_is_claimed_again(queue):
+    task_id = queue.enqueue("test_record", max_attempts=3, value="x").task_id
+    queue.claim_due_tasks(10)
+    assert queue.claim_due_tasks(10) == []   # lease still held
+
+    expire_lease(queue, task_id)
+    assert [claimed[0] for claimed in queue.claim_due_tasks(10)] == [task_id]
+    assert stored(queue, task_id).attempts == 2
+
+
+def test_task_that_keeps_crashing_the_worker_is_dead_lettered(queue):
+    task_id = queue.enqueue("test_record", max_attempts=2, value="secret").task_id
+    assert [claimed[0] for claimed in queue.claim_due_tasks(10)] == [task_id]
+    expire_lease(queue, task_id)   # the worker died while running it
+    assert [claimed[0] for claimed in queue.claim_due_tasks(10)] == [task_id]
+
+    expire_lease(queue, task_id)   # and again, on the last attempt
+    assert queue.claim_due_tasks(10) == []
+    task = stored(queue, task_id)
+    assert (task.status, task.payload) == ("Dead", "{}")
+    assert "Lease expired" in task.last_error
+
+
+def test_worker_runs_a_task_and_drops_its_payload(queue):
+    ran.clear()
+    ran_event.clear()
+    task_id = queue.enqueue("test_record", value="hello").task_id
+
+    worker = TaskWorker(concurrency=1, poll_interval=0.01)
+    try:
+        assert worker.run_once() == 1
+        assert ran_event.wait(5)
+    finally:
+        worker._executor.shutdown(wait=True)
+
+    task = stored(queue, task_id)
+    assert ran == ["hello"]
+    assert (task.status, task.payload) == ("Done", "{}")
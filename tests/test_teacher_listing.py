@@ -0,0 +1,47 @@
+from database import SessionLocal
+from models import Teacher
+from repositories.principal_repository import PrincipalRepository
+
+
+def add_teacher(email: str, class_ids: str) -> str:
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Teacher", email, "x", "Teacher", None)
+        teacher = repo.add_teacher(user)
+        teacher.teacher_class_ids = class_ids
+        repo.db.commit()
+        return user.user_id
+    finally:
+        repo.db.close()
+
+
+def teachers_of(class_name: str) -> set[str]:
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        teachers, _ = repo.get_teachers_page(100, class_name=class_name)
+        return {teacher.user_id for teacher in teachers}
+    finally:
+        repo.db.close()
+
+
+def test_class_filter_matches_whole_class_names_only(migrated_db):
+    maths = add_teacher("listing.maths@example.com", "10A, 10B")
+    science = add_teacher("listing.science@example.com", "10AB")
+
+    assert teachers_of("10A") == {maths}
+    assert teachers_of("10AB") == {science}
+    assert teachers_of("%") == set()
+    assert teachers_of("10_") == set()
+
+
+def test_class_filter_follows_updates(migrated_db):
+    user_id = add_teacher("listing.moved@example.com", "7C")
+    db = SessionLocal()
+    try:
+        db.get(Teacher, user_id).teacher_class_ids = "8C"
+        db.commit()
+    finally:
+        db.close()
+
+    assert user_id not in teachers_of("7C")
+    assert user_id in teachers_of("8C")
@@ -0,0 +1,102 @@
+import json
+import os
+import time
+
+from sqlalchemy import delete
+
+from core.security import create_access_token, create_preauth_ticket
+from database import SessionLocal
+from models.user import User
+from repositories.teacher_respository import TeacherRepository
+from repositories.timetable_repository import Timetable
+from services.teacher_service import TeacherService
+
+PERIOD = {"teacher_id": "t1", "class_name": "10A", "subject": "Maths",
+          "day": "Monday", "start_time": "09:00", "end_time": "09:45"}
+
+
+def write(path, records, mtime):
+    path.write_text(json.dumps(records))
+    os.utime(path, (mtime, mtime))
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+def test_bad_file_at_startup_does_not_raise(tmp_path):
+    path = tmp_path / "periods.json"
+    write(path, [{**PERIOD, "day": None}], 1_000)   # AttributeError while indexing
+
+    timetable = Timetable(str(path), check_interval=60)
+
+    assert timetable.index.teacher_week("t1") == []
+
+
+def test_watcher_keeps_last_good_index_and_survives_bad_records(tmp_path):
+    path = tmp_path / "periods.json"
+    write(path, [PERIOD], 1_000)
+    timetable = Timetable(str(path), check_interval=0.02)
+    good = timetable.index
+
+    for mtime, bad in enumerate(([{**PERIOD, "start_time": 900}], [{**PERIOD, "day": None}], {"not": "a list"}), 2_000):
+        write(path, bad, mtime)   # AttributeError, AttributeError, TypeError
+        time.sleep(0.1)
+        assert timetable.index is good
+
+    write(path, [{**PERIOD, "teacher_id": "t2"}], 3_000)
+    assert wait_for(lambda: timetable.index.teacher_week("t2"))
+
+
+def test_index_lookups(tmp_path):
+    path = tmp_path / "periods.json"
+    write(path, [
+        {**PERIOD, "start_time": "10:00", "end_time": "10:45"},
+        PERIOD,
+        {**PERIOD, "teacher_id": "t2", "class_name": "10B", "subject": "Art"},
+        {**PERIOD, "day": "Tuesday"},
+    ], 1_000)
+    index = Timetable(str(path), check_interval=60).index
+
+    week = index.teacher_week("t1")
+    assert [(p.weekday, p.start) for p in week] == [(0, 540), (0, 600), (1, 540)]
+    assert index.teacher_week("nobody") == []
+
+    assert index.class_period_at("10A", 0, 9 * 60 + 30).start == 540
+    assert index.class_period_at("10A", 0, 10 * 60).start == 600
+    assert index.class_period_at("10A", 0, 9 * 60 + 50) is None   # between periods
+    assert index.class_period_at("10A", 0, 8 * 60) is None
+    assert index.class_period_at("10C", 0, 540) is None
+
+    assert {p.class_name for p in index.slot(0, 540)} == {"10A", "10B"}
+    assert index.slot(2, 540) == []
+
+
+def test_teacher_periods_are_resolved_from_an_access_token(tmp_path, migrated_db):
+    path = tmp_path / "periods.json"
+    write(path, [{**PERIOD, "teacher_id": "timetable-teacher"}, {**PERIOD, "teacher_id": "other"}], 1_000)
+    db = SessionLocal()
+    teacher = User(user_id="timetable-teacher", user_name="Tim", user_email="tim@example.com",
+                   user_password="x", user_role="Teacher")
+    db.add(teacher)
+    db.commit()
+    try:
+        service = TeacherService(TeacherRepository(db), assignments=object(), timetable=Timetable(str(path), 60))
+        access = create_access_token({"sub": "tim@example.com", "role": "Teacher"})
+
+        assert [p["teacher_id"] for p in service.get_periods_from_stored_json_file(access)] == ["timetable-teacher"]
+        # user_id alone is not enough, and tokens with a purpose are refused
+        assert service.get_periods_from_stored_json_file(create_access_token({"user_id": "timetable-teacher"})) == []
+        assert service.get_periods_from_stored_json_file(create_preauth_ticket(teacher)) == []
+        assert service.get_periods_from_stored_json_file(create_access_token(
+            {"sub": "tim@example.com", "user_id": "timetable-teacher", "purpose": "calendar_feed"})) == []
+        assert service.get_periods_from_stored_json_file("not-a-token") == []
+    finally:
+        db.execute(delete(User).where(User.user_id == "timetable-teacher"))
+        db.commit()
+        db.close()
@@ -0,0 +1,85 @@
+import time
+
+from core import security
+from core.security import create_access_token, decode_access_token, revoke_access_token
+from core.token_cache import VerifiedTokenCache
+
+
+def test_entries_are_bounded_lru():
+    cache = VerifiedTokenCache(max_entries=2, max_ttl=300)
+    cache.put("t1", {"sub": "a"})
+    cache.put("t2", {"sub": "b"})
+    assert cache.get("t1") == {"sub": "a"}   # t1 is now the most recent
+    cache.put("t3", {"sub": "c"})
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") == {"sub": "a"}
+    assert cache.get("t3") == {"sub": "c"}
+    assert cache.stats() == {"entries": 2, "revoked": 0, "hits": 3, "misses": 1}
+
+
+def test_entry_lives_until_exp_capped_at_max_ttl(monkeypatch):
+    now = time.time()
+    monkeypatch.setattr("core.token_cache.time.time", lambda: now)
+    cache = VerifiedTokenCache(max_entries=10, max_ttl=60)
+    cache.put("short", {"sub": "a", "exp": now + 10})
+    cache.put("long", {"sub": "b", "exp": now + 3600})
+    cache.put("no-exp", {"sub": "c"})
+
+    monkeypatch.setattr("core.token_cache.time.time", lambda: now + 30)
+    assert cache.get("short") is None
+    assert cache.get("long") is not None
+    monkeypatch.setattr("core.token_cache.time.time", lambda: now + 61)
+    assert cache.get("long") is None
+    assert cache.get("no-exp") is None
+
+
+def test_returned_claims_are_copies():
+    cache = VerifiedTokenCache(max_entries=10, max_ttl=60)
+    cache.put("t", {"sub": "a"})
+    cache.get("t")["sub"] = "changed"
+    assert cache.get("t") == {"sub": "a"}
+
+
+def test_unexpired_revocations_are_never_evicted():
+    cache = VerifiedTokenCache(max_entries=2, max_ttl=60)
+    for token in ("t1", "t2", "t3"):
+        cache.revoke(token)   # access tokens carry no exp
+
+    assert all(cache.is_revoked(token) for token in ("t1", "t2", "t3"))
+
+
+def test_expired_revocations_are_pruned(monkeypatch):
+    now = time.time()
+    monkeypatch.setattr("core.token_cache.time.time", lambda: now)
+    cache = VerifiedTokenCache(max_entries=2, max_ttl=60)
+    cache.revoke("old1", now + 5)
+    cache.revoke("old2", now + 5)
+    cache.revoke("forever")
+
+    monkeypatch.setattr("core.token_cache.time.time", lambda: now + 10)
+    cache.revoke("new", now + 100)
+
+    assert cache.stats()["revoked"] == 2
+    assert cache.is_revoked("forever") and cache.is_revoked("new")
+    assert not cache.is_revoked("old1")
+
+
+def test_decode_is_served_from_cache(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", VerifiedTokenCache(max_entries=10, max_ttl=60))
+    token = create_access_token({"sub": "cached@example.com", "role": "Teacher"})
+
+    assert decode_access_token(token)["sub"] == "cached@example.com"
+    assert decode_access_token(token)["sub"] == "cached@example.com"
+    assert security.token_cache.stats()["hits"] == 1
+    assert decode_access_token(token + "x") is None
+
+
+def test_revoked_token_no_longer_decodes(monkeypatch):
+    monkeypatch.setattr(security, "token_cache", VerifiedTokenCache(max_entries=1, max_ttl=60))
+    tokens = [create_access_token({"sub": f"user{i}@example.com", "role": "Teacher"}) for i in range(3)]
+    for token in tokens:
+        assert decode_access_token(token) is not None
+        revoke_access_token(token)
+
+    assert [decode_access_token(token) for token in tokens] == [None, None, None]
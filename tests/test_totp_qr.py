@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import pyotp
+import pytest
+
+import core.mail
+from core.security import build_pwd_context, create_access_token
+from core.tasks import get_task_handler
+from core.totp_qr import QrImageCache, build_totp_qr_link
+from database import SessionLocal
+from repositories.principal_repository import PrincipalRepository
+
+
+@pytest.fixture(scope="module")
+def qr_principal(migrated_db):
+    repo = PrincipalRepository(SessionLocal())
+    try:
+        user = repo.add_user("Qr", "qr@example.com", build_pwd_context().hash("qr-password"), "Principal", pyotp.random_base32())
+        repo.add_principal(user)
+        return SimpleNamespace(user_id=user.user_id, user_email=user.user_email)
+    finally:
+        repo.db.close()
+
+
+def qr_path(link: str) -> str:
+    parts = urlsplit(link)
+    return f"{parts.path}?{parts.query}"
+
+
+def test_each_format_is_rendered_once():
+    cache = QrImageCache()
+    renders = []
+
+    def render(image_format):
+        return lambda content: renders.append(image_format) or image_format.encode()
+
+    svg_digest, svg = cache.get_or_render("otpauth://totp/x", render("svg"))
+    png_digest, png = cache.get_or_render("otpauth://totp/x", render("png"), "png")
+    cache.get_or_render("otpauth://totp/x", render("png"), "png")
+
+    assert (svg, png) == (b"svg", b"png")
+    assert svg_digest == png_digest
+    assert renders == ["svg", "png"]
+
+
+@pytest.mark.parametrize("image_format, media_type, magic", [
+    ("svg", "image/svg+xml", b"<?xml"),
+    ("png", "image/png", b"\x89PNG"),
+])
+def test_qr_link_serves_the_requested_format(client, qr_principal, image_format, media_type, magic):
+    response = client.get(qr_path(build_totp_qr_link(qr_principal, image_format)))
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == media_type
+    assert response.content.startswith(magic)
+    etag = response.headers["ETag"]
+    assert etag.endswith(f'-{image_format}"')
+    assert client.get(qr_path(build_totp_qr_link(qr_principal, image_format)), headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_qr_link_rejects_other_tokens_and_formats(client, qr_principal):
+    access_token = create_access_token({"sub": qr_principal.user_email, "role": "Principal"})
+    assert client.get("/principal/totp_qr", params={"token": access_token}).status_code == 401
+
+    path = qr_path(build_totp_qr_link(qr_principal))
+    assert client.get(f"{path}&format=gif").status_code == 422
+
+
+def test_principal_welcome_email_embeds_the_png(qr_principal, monkeypatch):
+    sent = []
+    monkeypatch.setattr(core.mail, "send_email_smtp", lambda to_email, subject, html: sent.append(html))
+
+    get_task_handler("send_principal_welcome_email")(
+        to_email=qr_principal.user_email, user_name="Qr", user_role="Principal", user_id=qr_principal.user_id,
+    )
+
+    assert '/principal/totp_qr?token=' in sent[0]
+    assert '&amp;format=png" alt="TOTP QR code"' in sent[0]